@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from datetime import timedelta
 from functools import partial
 from typing import Any
 
@@ -9,9 +10,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import config_entry_oauth2_flow, device_registry as dr
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.typing import ConfigType
-from SharesightAPI.SharesightAPI import SharesightAPI
 
 from .application_credentials import account_type_context
 from .const import (
@@ -22,18 +21,27 @@ from .const import (
     CONF_AUTO_REMOVE_STALE_DEVICES,
     CONF_ENABLE_LTS_BACKFILL,
     CONF_PORTFOLIO_ID,
+    CONF_SNAPSHOT_MAX_AGE,
     CONF_USE_EDGE,
     DEFAULT_ACCOUNT_TYPE,
     DEFAULT_AUTO_REMOVE_STALE_DEVICES,
     DEFAULT_ENABLE_LTS_BACKFILL,
+    DEFAULT_SNAPSHOT_MAX_AGE_HOURS,
     DOMAIN,
     PLATFORMS,
     STALE_DEVICE_POLL_CONFIRMATIONS,
-    TOKEN_URL,
 )
 from .coordinator import SharesightCoordinator
 from .data import SharesightConfigEntry, SharesightRuntimeData
+from .breaker import SharesightBreakers
 from .icons import async_load_entity_icons
+from .cache import async_get_response_cache
+from .ledger import SharesightLedgers
+from .official_costs import SharesightOfficialCosts
+from .snapshot import SharesightSnapshot
+from .stagger import async_get_refresh_queue
+from .ratelimit import async_get_request_budget, request_budget_key
+from .transport import SharesightTransport, async_get_api_session
 from .services import async_setup_services
 from .statistics_import import async_backfill_value_statistics
 
@@ -113,23 +121,48 @@ async def async_setup_entry(hass: HomeAssistant, entry: SharesightConfigEntry) -
 
     portfolio_id = entry.data[CONF_PORTFOLIO_ID]
 
-    api_session = async_get_clientsession(hass)
-
-    client = SharesightAPI(
-        client_id="",
-        client_secret="",
-        authorization_code="",
-        redirect_uri="",
-        token_url=TOKEN_URL[account_type],
-        api_url_base=API_URL_BASE[account_type],
-        use_token_file=False,
-        session=api_session,
+    # Requests go out on the integration's own pooled session, and come back
+    # with the status and headers the coordinator's budget reads (see
+    # transport.py).
+    client = SharesightTransport(
+        async_get_api_session(hass), API_URL_BASE[account_type]
     )
 
+    # Sharesight's rate limits are per OAuth app, so every entry using the
+    # same app shares one request budget (see ratelimit.py).
+    app_key = request_budget_key(account_type, implementation)
+    request_budget = async_get_request_budget(hass, app_key)
+    # Account-level endpoints (portfolio list, cash accounts, watchlist, …) are
+    # fetched once per cycle for every portfolio on a login (see cache.py).
+    response_cache = async_get_response_cache(hass, app_key)
+    # Polls are staggered across the app's portfolios, and Refresh presses
+    # queue behind one another (see stagger.py).
+    refresh_queue = async_get_refresh_queue(hass, app_key)
+
     local_coordinator = SharesightCoordinator(
-        hass, entry, portfolio_id, client=client, oauth_session=oauth_session
+        hass,
+        entry,
+        portfolio_id,
+        client=client,
+        oauth_session=oauth_session,
+        request_budget=request_budget,
+        response_cache=response_cache,
+        refresh_queue=refresh_queue,
+    )
+    # Refresh the token ahead of its expiry margin from now on.
+    entry.async_on_unload(local_coordinator.tokens.async_start())
+    # Warm start: come up on the last good data saved by the previous run and
+    # fetch live data in the background (see snapshot.py); without a recent
+    # enough snapshot, block on the first refresh as before.
+    warm_start = await local_coordinator.async_restore_snapshot(
+        timedelta(
+            hours=entry.options.get(
+                CONF_SNAPSHOT_MAX_AGE, DEFAULT_SNAPSHOT_MAX_AGE_HOURS
+            )
+        )
     )
-    await local_coordinator.async_config_entry_first_refresh()
+    if not warm_start:
+        await local_coordinator.async_config_entry_first_refresh()
 
     # runtime-data (Bronze): store per-entry state on the entry itself.
     # Assigned BEFORE async_forward_entry_setups so every platform's
@@ -180,6 +213,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: SharesightConfigEntry) -
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    if warm_start:
+        entry.async_create_background_task(
+            hass, local_coordinator.async_refresh(), "sharesight_first_refresh"
+        )
+
     # Auto-remove devices for sold holdings / exited markets / closed cash
     # accounts (opt-in).  Registered after the platforms so the first prune
     # scan sees the devices this load created, and detached on unload.
@@ -195,8 +233,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: SharesightConfigEntry) -
         # until the next poll.  Setup only gets this far after a successful
         # first refresh, so it is evidence of the same quality as a poll's —
         # and it means enabling the option (which reloads the entry) starts
-        # the count immediately rather than a full interval later.
-        _async_prune_stale_devices(hass, entry)
+        # the count immediately rather than a full interval later.  Restored
+        # snapshot data is not that evidence; the background refresh's own
+        # update counts instead.
+        if not warm_start:
+            _async_prune_stale_devices(hass, entry)
 
     # Backfill the portfolio-value long-term statistics from inception once at
     # startup (opt-out via options).  Runs in the background so it never blocks
@@ -230,6 +271,14 @@ async def async_unload_entry(hass: HomeAssistant, entry: SharesightConfigEntry)
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: SharesightConfigEntry) -> None:
+    """Delete the entry's persisted ledgers, snapshot and official costs."""
+    await SharesightLedgers(hass, entry.entry_id).async_remove()
+    await SharesightSnapshot(hass, entry.entry_id).async_remove()
+    await SharesightOfficialCosts(hass, entry.entry_id).async_remove()
+    await SharesightBreakers(hass, entry.entry_id).async_remove()
+
+
 async def update_listener(hass: HomeAssistant, entry: SharesightConfigEntry) -> None:
     """Reload only when user-facing options actually change.
 
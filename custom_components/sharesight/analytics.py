@@ -11,7 +11,8 @@ without adding any API requests.
 """
 from __future__ import annotations
 
-from datetime import date, timedelta
+from collections.abc import Callable
+from datetime import date, datetime, time as dt_time, timedelta, tzinfo
 from typing import Any
 
 
@@ -373,25 +374,17 @@ def build_holding_trades(
     return result
 
 
-def build_sector_allocation(
+def _value_breakdown(
     holdings: list[dict[str, Any]],
-    instrument_lookup: dict[str, dict[str, Any]],
-    axis: str = "sector",
+    group_of: Callable[[dict[str, Any]], Any],
 ) -> dict[str, Any]:
-    """Value-weighted sector or industry allocation.
-
-    Joins each holding's value to its FactSet sector/industry classification
-    (from the free user_instruments feed) and returns a diversity-style
-    ``breakdown`` list, so the existing top-N helper can consume it.  ``axis``
-    is "sector" or "industry".  Unclassified holdings land in "Unknown".
-    """
+    """Value-weighted breakdown of holdings by ``group_of`` (None -> "Unknown")."""
     buckets: dict[str, float] = {}
     total = 0.0
     for holding in holdings or []:
         if not isinstance(holding, dict):
             continue
-        instrument = lookup_instrument(instrument_lookup, holding) or {}
-        name = instrument.get(axis) or "Unknown"
+        name = str(group_of(holding) or "Unknown")
         value = _f(holding.get("value")) or 0.0
         buckets[name] = buckets.get(name, 0.0) + value
         total += value
@@ -406,6 +399,80 @@ def build_sector_allocation(
     return {"breakdown": breakdown, "total": round(total, 2)}
 
 
+# Groupings the local diversity engine reproduces, mapped onto the Sharesight
+# grouping vocabulary (``grouping`` on the diversity/performance reports).
+DIVERSITY_AXES = ("market", "sector", "industry", "currency", "country")
+
+
+def build_local_diversity(
+    holdings: list[dict[str, Any]],
+    instrument_lookup: dict[str, dict[str, Any]],
+) -> dict[str, dict[str, Any]]:
+    """Diversity breakdowns on every axis in DIVERSITY_AXES, from the holdings.
+
+    Each is a diversity-style ``{"breakdown": [...], "total": ...}``; market
+    and currency come from the holding itself, sector / industry / country
+    from its user_instruments classification.
+    """
+
+    def instrument(holding: dict[str, Any]) -> dict[str, Any]:
+        return lookup_instrument(instrument_lookup, holding) or {}
+
+    def currency(holding: dict[str, Any]) -> Any:
+        code = (
+            holding.get("currency_code")
+            or (holding.get("instrument") or {}).get("currency_code")
+            or instrument(holding).get("currency_code")
+        )
+        return str(code).upper() if code else None
+
+    def country(holding: dict[str, Any]) -> Any:
+        return instrument(holding).get("country_code") or (
+            holding.get("instrument") or {}
+        ).get("country_code")
+
+    group_of: dict[str, Callable[[dict[str, Any]], Any]] = {
+        "market": holding_market,
+        "sector": lambda holding: instrument(holding).get("sector"),
+        "industry": lambda holding: instrument(holding).get("industry"),
+        "currency": currency,
+        "country": country,
+    }
+    return {axis: _value_breakdown(holdings, group_of[axis]) for axis in DIVERSITY_AXES}
+
+
+def match_diversity_axis(
+    breakdown: list[dict[str, Any]],
+    local_diversity: dict[str, dict[str, Any]],
+) -> str | None:
+    """The local axis whose groups best match an API diversity breakdown.
+
+    Groups are compared by name (case-insensitive, zero-value groups
+    ignored); the best axis must share at least three quarters of the union.
+    None when nothing matches that well, e.g. a custom grouping.
+    """
+
+    def names(rows: list[dict[str, Any]]) -> set[str]:
+        return {
+            str(row.get("group_name") or "").strip().lower()
+            for row in rows or []
+            if isinstance(row, dict) and _f(row.get("value"))
+        }
+
+    api_names = names(breakdown)
+    if not api_names:
+        return None
+    best_axis: str | None = None
+    best_score = 0.0
+    for axis in DIVERSITY_AXES:
+        local_names = names((local_diversity.get(axis) or {}).get("breakdown") or [])
+        union = api_names | local_names
+        score = len(api_names & local_names) / len(union) if union else 0.0
+        if score > best_score:
+            best_axis, best_score = axis, score
+    return best_axis if best_score >= 0.75 else None
+
+
 def portfolio_currency_codes(data: dict[str, Any]) -> list[str]:
     """Distinct currency codes seen across holdings + instruments (upper-case).
 
@@ -447,6 +514,119 @@ def portfolio_currency_codes(data: dict[str, Any]) -> list[str]:
     return sorted(codes)
 
 
+def market_is_open(market: dict[str, Any], now: datetime, tz: tzinfo | None) -> bool | None:
+    """Best-effort open/closed for a Sharesight markets[] entry.
+
+    ``market`` is a markets[] dict (tz_name + trading_start_time +
+    trading_end_time as HH:MM); ``now`` is an aware datetime; ``tz`` is the
+    market's already-resolved tzinfo (resolved off the event loop via
+    ``async_get_time_zone`` so this stays non-blocking).  Returns True/False,
+    or None when the market lacks usable trading-hours metadata so the caller
+    can treat it as unknown rather than closed.  Weekends are treated as
+    closed; public holidays and half-days are not modelled.
+    """
+    hours = _trading_hours(market)
+    if tz is None or hours is None:
+        return None
+    local_now = now.astimezone(tz)
+    if local_now.weekday() >= 5:
+        return False
+    return hours[0] <= local_now.time() <= hours[1]
+
+
+def _trading_hours(market: dict[str, Any]) -> tuple[dt_time, dt_time] | None:
+    """(open, close) local times of a markets[] entry, None when unusable."""
+    start_raw = market.get("trading_start_time")
+    end_raw = market.get("trading_end_time")
+    if not (start_raw and end_raw):
+        return None
+    try:
+        start_h, start_m = (int(x) for x in str(start_raw).split(":")[:2])
+        end_h, end_m = (int(x) for x in str(end_raw).split(":")[:2])
+        return dt_time(start_h, start_m), dt_time(end_h, end_m)
+    except (ValueError, TypeError):
+        return None
+
+
+def held_markets(data: dict[str, Any]) -> list[dict[str, Any]]:
+    """The markets[] entries of markets the portfolio actually holds.
+
+    A global all-markets view would be open almost around the clock, so only
+    held markets count.  Empty when either list is missing.
+    """
+    if not isinstance(data, dict):
+        return []
+    markets_data = data.get("markets")
+    markets = markets_data.get("markets", []) if isinstance(markets_data, dict) else []
+    if not isinstance(markets, list) or not markets:
+        return []
+    held: set[str] = set()
+    for holding in (data.get("holdings") or {}).get("holdings") or []:
+        if isinstance(holding, dict):
+            market_code = holding_market(holding)
+            if market_code:
+                held.add(str(market_code))
+    return [
+        market
+        for market in markets
+        if isinstance(market, dict) and str(market.get("code")) in held
+    ]
+
+
+def held_markets_open(
+    data: dict[str, Any], now: datetime, time_zones: dict[str, tzinfo | None]
+) -> bool | None:
+    """True when any held market is open, False when all known ones are shut.
+
+    ``time_zones`` maps tz_name -> resolved tzinfo.  None when no held market
+    has usable trading hours (or a resolved time zone) yet.
+    """
+    statuses = [
+        status
+        for market in held_markets(data)
+        if (
+            status := market_is_open(market, now, time_zones.get(market.get("tz_name")))
+        )
+        is not None
+    ]
+    if not statuses:
+        return None
+    return any(statuses)
+
+
+def next_market_change(
+    data: dict[str, Any], now: datetime, time_zones: dict[str, tzinfo | None]
+) -> datetime | None:
+    """The next weekday open or close of any held market, after ``now``.
+
+    Same model as ``market_is_open`` (weekends shut, holidays not modelled);
+    None when no held market has usable trading hours and a time zone.
+    """
+    upcoming: list[datetime] = []
+    for market in held_markets(data):
+        tz = time_zones.get(market.get("tz_name"))
+        hours = _trading_hours(market)
+        if tz is None or hours is None:
+            continue
+        local_today = now.astimezone(tz).date()
+        for offset in range(8):
+            day = local_today + timedelta(days=offset)
+            if day.weekday() >= 5:
+                continue
+            changes = [
+                change
+                for change in (
+                    datetime.combine(day, hours[0], tz),
+                    datetime.combine(day, hours[1], tz),
+                )
+                if change > now
+            ]
+            if changes:
+                upcoming.append(min(changes))
+                break
+    return min(upcoming) if upcoming else None
+
+
 def _parse_date(value: Any) -> date | None:
     """Parse a leading ``YYYY-MM-DD`` out of a value into a date (None on fail)."""
     if not value:
@@ -734,7 +914,7 @@ def build_income_forecast(
     return result
 
 
-def _value_series_points(payload: Any) -> list[tuple[str, float]]:
+def value_series_points(payload: Any) -> list[tuple[str, float]]:
     """Normalise a portfolio value-series payload into sorted (date, value) points.
 
     Sharesight's mobile value endpoints are documented loosely (the apiDoc
@@ -819,7 +999,7 @@ def build_value_trend(series: Any) -> dict[str, Any]:
         "change_30d_percent": None,
         "series": [],
     }
-    points = _value_series_points(series)
+    points = value_series_points(series)
     if not points:
         return result
 
@@ -0,0 +1,248 @@
+"""Single-flight access-token management for one config entry.
+
+The poll, the value-history and performance-report services, the sharechecker
+and official-cost lookups, the SSO link and the statistics backfill each used
+to call ``_refresh_token_with_retries`` on their own.  Near expiry several of
+them could refresh at once, each spending the same refresh token against
+Sharesight's token service — the path that historically ended in brute-force
+lockouts.  Worse, ``OAuth2Session.async_ensure_token_valid`` only refreshes
+within seconds of expiry, so the "proactive" margin never actually bought any
+time.
+
+``SharesightTokenManager`` now owns the entry's token:
+
+* the hot path (``async_get_token``) hands back the cached token without
+  suspending whenever it has more than ``_TOKEN_MIN_VALIDITY`` seconds left;
+* a refresh goes out at most once at a time — every caller that needs one
+  awaits the same in-flight task, shielded so a cancelled caller can't abort
+  it for the rest;
+* a timer starts that refresh ``_TOKEN_PROACTIVE_LEAD`` seconds before the
+  token enters its last ``_TOKEN_REFRESH_MARGIN``, and a caller that finds the
+  token inside the margin anyway starts it in the background and carries on
+  with the still-valid token.
+
+Transient failures from the token endpoint are retried with a short backoff,
+as before, and only a clearly permanent one raises ``ConfigEntryAuthFailed``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any
+
+import aiohttp
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SharesightTokenManager:
+    """The access token of one config entry, refreshed single-flight."""
+
+    # Number of retries for token validation before giving up.
+    _TOKEN_RETRIES: int = 2
+    _TOKEN_RETRY_DELAY: float = 3.0
+
+    # Refresh the access token once it has this many seconds or fewer left.
+    # Sharesight's OAuth token lifetime is ~30 minutes; refreshing early
+    # avoids racing a poll against expiry, which is what caused entities to
+    # flap "unavailable" for ~10s every ~31 minutes.
+    _TOKEN_REFRESH_MARGIN: float = 300.0
+    # The timer fires this long before the margin is reached, so the refresh
+    # is normally done before any caller sees the token inside it.
+    _TOKEN_PROACTIVE_LEAD: float = 60.0
+    # Below this much validity a caller waits for the refresh instead of
+    # using the cached token (leaves room for a slow request and clock skew).
+    _TOKEN_MIN_VALIDITY: float = 60.0
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, oauth_session: Any
+    ) -> None:
+        """Wrap the entry's ``OAuth2Session``; ``async_start`` arms the timer."""
+        self._hass = hass
+        self._entry = entry
+        self.oauth_session = oauth_session
+        self._refresh_task: asyncio.Task[str] | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self.refreshes: int = 0
+        self.coalesced: int = 0
+        self.last_refresh: datetime | None = None
+
+    def _expires_in(self) -> float | None:
+        """Seconds of validity left on the cached token (None: unknown)."""
+        token = self.oauth_session.token or {}
+        try:
+            return float(token["expires_at"]) - time.time()
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    async def async_get_token(self) -> str:
+        """A valid access token, refreshing (once, for every caller) if needed."""
+        expires_in = self._expires_in()
+        if expires_in is not None and expires_in > self._TOKEN_MIN_VALIDITY:
+            if expires_in <= self._TOKEN_REFRESH_MARGIN:
+                self._async_start_refresh()
+            return self.oauth_session.token["access_token"]
+        return await asyncio.shield(self._async_start_refresh())
+
+    @callback
+    def _async_start_refresh(self) -> asyncio.Task[str]:
+        """The in-flight refresh, starting one when there is none."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self.coalesced += 1
+            return self._refresh_task
+        self._refresh_task = task = self._entry.async_create_background_task(
+            self._hass,
+            self._async_refresh_with_retries(),
+            "sharesight_token_refresh",
+        )
+        task.add_done_callback(self._refresh_done)
+        return task
+
+    @callback
+    def _refresh_done(self, task: asyncio.Task[str]) -> None:
+        # Retrieving the error here keeps a background refresh that nobody
+        # awaited from logging "exception never retrieved"; the next caller
+        # that needs a token simply tries again.
+        if not task.cancelled() and (err := task.exception()) is not None:
+            _LOGGER.debug("Sharesight token refresh failed: %s", err)
+
+    async def _async_refresh(self) -> None:
+        """Refresh the token and persist it on the entry, as OAuth2Session does.
+
+        Called directly rather than through ``async_ensure_token_valid``,
+        which would do nothing until the token is within seconds of expiry.
+        """
+        new_token = await self.oauth_session.implementation.async_refresh_token(
+            self.oauth_session.token
+        )
+        self._hass.config_entries.async_update_entry(
+            self._entry, data={**self._entry.data, "token": new_token}
+        )
+
+    async def _async_refresh_with_retries(self) -> str:
+        """Refresh the access token, retrying transient refresh failures.
+
+        Home Assistant's OAuth helpers surface any failure from the OAuth
+        token endpoint as ``ConfigEntryAuthFailed``, even when the underlying
+        cause is a transient 5xx/400 from Sharesight's token service.  We
+        therefore retry a handful of times with backoff and only propagate
+        ``ConfigEntryAuthFailed`` once we're confident the credentials really
+        have been revoked.
+
+        Returns the access token string on success.
+        """
+        last_error: Exception | None = None
+        for attempt in range(self._TOKEN_RETRIES + 1):
+            try:
+                _LOGGER.debug(
+                    "Refreshing Sharesight token (attempt %s/%s)",
+                    attempt + 1,
+                    self._TOKEN_RETRIES + 1,
+                )
+                await self._async_refresh()
+                self.refreshes += 1
+                self.last_refresh = dt_util.utcnow()
+                self._async_schedule_proactive_refresh()
+                return self.oauth_session.token["access_token"]
+            except ConfigEntryAuthFailed as auth_err:
+                last_error = auth_err
+                if attempt < self._TOKEN_RETRIES:
+                    _LOGGER.debug(
+                        "Token refresh attempt %s failed (%s), retrying in %ss",
+                        attempt + 1,
+                        auth_err,
+                        self._TOKEN_RETRY_DELAY,
+                    )
+                    await asyncio.sleep(self._TOKEN_RETRY_DELAY)
+                    continue
+                raise
+            except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as transient_err:
+                last_error = transient_err
+                if attempt < self._TOKEN_RETRIES:
+                    _LOGGER.debug(
+                        "Token refresh transient error on attempt %s (%s: %s), retrying in %ss",
+                        attempt + 1,
+                        type(transient_err).__name__,
+                        transient_err,
+                        self._TOKEN_RETRY_DELAY,
+                    )
+                    await asyncio.sleep(self._TOKEN_RETRY_DELAY)
+                    continue
+                raise
+            except HomeAssistantError as ha_err:
+                last_error = ha_err
+                err_msg = str(ha_err).lower()
+                is_permanent_auth = any(
+                    kw in err_msg
+                    for kw in ("invalid_grant", "invalid_client", "access_denied")
+                )
+                if is_permanent_auth:
+                    raise ConfigEntryAuthFailed(
+                        f"Sharesight authentication failed: {ha_err}"
+                    ) from ha_err
+                if attempt < self._TOKEN_RETRIES:
+                    _LOGGER.debug(
+                        "Token refresh HA error on attempt %s (%s), retrying in %ss",
+                        attempt + 1,
+                        ha_err,
+                        self._TOKEN_RETRY_DELAY,
+                    )
+                    await asyncio.sleep(self._TOKEN_RETRY_DELAY)
+                    continue
+                raise
+
+        raise UpdateFailed(f"Exhausted token refresh retries: {last_error}")
+
+    @callback
+    def _async_schedule_proactive_refresh(self) -> None:
+        """Arm the timer for the current token's refresh."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        expires_in = self._expires_in()
+        if expires_in is None:
+            return
+        delay = expires_in - self._TOKEN_REFRESH_MARGIN - self._TOKEN_PROACTIVE_LEAD
+        self._unsub_timer = async_call_later(
+            self._hass, max(0.0, delay), self._async_timer_fired
+        )
+
+    @callback
+    def _async_timer_fired(self, _now: datetime) -> None:
+        self._unsub_timer = None
+        self._async_start_refresh()
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Arm the proactive refresh; returns the callback that disarms it."""
+        self._async_schedule_proactive_refresh()
+        return self._async_stop
+
+    @callback
+    def _async_stop(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Refresh counts and the cached token's remaining validity (no token)."""
+        expires_in = self._expires_in()
+        return {
+            "expires_in": None if expires_in is None else int(expires_in),
+            "refreshes": self.refreshes,
+            "coalesced": self.coalesced,
+            "refresh_in_flight": self._refresh_task is not None
+            and not self._refresh_task.done(),
+            "last_refresh": self.last_refresh.isoformat()
+            if self.last_refresh
+            else None,
+        }
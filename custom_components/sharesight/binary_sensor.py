@@ -8,8 +8,7 @@ no API cost and give users something concrete to automate against.
 from __future__ import annotations
 
 import logging
-import time
-from datetime import time as dt_time, timedelta
+from datetime import timedelta
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
@@ -31,32 +30,6 @@ _LOGGER: logging.Logger = logging.getLogger(__package__)
 PARALLEL_UPDATES = 0
 
 
-def _market_is_open(market, now, tz):
-    """Best-effort open/closed for a Sharesight markets[] entry.
-
-    ``market`` is a markets[] dict (tz_name + trading_start_time +
-    trading_end_time as HH:MM); ``now`` is an aware datetime; ``tz`` is the
-    market's already-resolved tzinfo (resolved off the event loop via
-    ``async_get_time_zone`` so this stays non-blocking).  Returns True/False,
-    or None when the market lacks usable trading-hours metadata so the caller
-    can treat it as unknown rather than closed.  Weekends are treated as
-    closed; public holidays and half-days are not modelled.
-    """
-    start_raw = market.get("trading_start_time")
-    end_raw = market.get("trading_end_time")
-    if tz is None or not (start_raw and end_raw):
-        return None
-    try:
-        start_h, start_m = (int(x) for x in str(start_raw).split(":")[:2])
-        end_h, end_m = (int(x) for x in str(end_raw).split(":")[:2])
-    except (ValueError, TypeError):
-        return None
-    local_now = now.astimezone(tz)
-    if local_now.weekday() >= 5:
-        return False
-    return dt_time(start_h, start_m) <= local_now.time() <= dt_time(end_h, end_m)
-
-
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: SharesightConfigEntry,
@@ -136,11 +109,7 @@ class SharesightAnyMarketOpen(SharesightBaseEntity, BinarySensorEntity):
         )
 
     def _markets(self) -> list:
-        markets_data = (self.coordinator.data or {}).get("markets")
-        if not isinstance(markets_data, dict):
-            return []
-        markets = markets_data.get("markets", [])
-        return markets if isinstance(markets, list) else []
+        return analytics.held_markets(self.coordinator.data or {})
 
     async def async_added_to_hass(self) -> None:
         """Resolve current market time zones before the first state read."""
@@ -169,32 +138,9 @@ class SharesightAnyMarketOpen(SharesightBaseEntity, BinarySensorEntity):
 
     def _status(self) -> bool | None:
         """True/False when at least one held market's hours are known; else None."""
-        data = self.coordinator.data or {}
-        markets = self._markets()
-        if not markets:
-            return None
-        holdings = (data.get("holdings") or {}).get("holdings") or []
-        held: set[str] = set()
-        for holding in holdings:
-            if not isinstance(holding, dict):
-                continue
-            market_code = analytics.holding_market(holding)
-            if market_code:
-                held.add(str(market_code))
-        if not held:
-            return None
-        now = dt_util.now()
-        statuses = []
-        for market in markets:
-            if not isinstance(market, dict) or str(market.get("code")) not in held:
-                continue
-            tz = self._tz_cache.get(market.get("tz_name"))
-            state = _market_is_open(market, now, tz)
-            if state is not None:
-                statuses.append(state)
-        if not statuses:
-            return None
-        return any(statuses)
+        return analytics.held_markets_open(
+            self.coordinator.data or {}, dt_util.now(), self._tz_cache
+        )
 
     @property
     def is_on(self) -> bool | None:
@@ -292,9 +238,11 @@ class SharesightDividendImminent(SharesightBaseEntity, BinarySensorEntity):
 class SharesightApiDegraded(SharesightBaseEntity, BinarySensorEntity):
     """On while the Sharesight API is rejecting us (global cooldown/lockout).
 
-    Reads the coordinator's ``_lockout_until`` deadline, which is set when the
-    API returns a brute-force lockout or a parallel-request rate-limit.  This
-    is a diagnostic flag that stays available even during failures.
+    Reads the coordinator's cooldown deadline, which is set when the API
+    returns a brute-force lockout or a parallel-request rate-limit — including
+    a rate-limit hit by another portfolio on the same OAuth app, which holds
+    this one back too.  This is a diagnostic flag that stays available even
+    during failures.
     """
 
     _attr_device_class = BinarySensorDeviceClass.PROBLEM
@@ -311,11 +259,7 @@ class SharesightApiDegraded(SharesightBaseEntity, BinarySensorEntity):
 
     @property
     def is_on(self) -> bool | None:
-        lockout_until = getattr(self.coordinator, "_lockout_until", 0.0) or 0.0
-        try:
-            return time.monotonic() < float(lockout_until)
-        except (TypeError, ValueError):
-            return False
+        return self.coordinator._in_lockout()
 
     @property
     def available(self) -> bool:
@@ -0,0 +1,215 @@
+"""Persisted circuit breakers for the optional endpoints.
+
+A failed optional endpoint used to be parked for an hour, doubling to six, on
+its first failure whatever the cause: one transient 502 on ``watchlist.json``
+blanked the watchlist for an hour, while an endpoint the token can never reach
+(a 403 on a scope or plan it lacks) was still re-asked every few hours, and
+again on every restart because the cooldowns lived in memory.
+
+Each optional endpoint (keyed on path + extension, see ``breaker_key``) now
+sits behind a breaker that tells the two apart:
+
+* transient failures — timeouts, connection errors, 5xx and other error
+  answers — only open it after ``BREAKER_TRANSIENT_THRESHOLD`` in a row, and
+  then for a short backoff (``BREAKER_TRANSIENT_BACKOFF`` doubling to
+  ``BREAKER_TRANSIENT_MAX_BACKOFF``);
+* a scope denial — a 403 that isn't the rate limit — opens it at once for a
+  long one (``BREAKER_SCOPE_BACKOFF`` doubling to ``BREAKER_SCOPE_MAX_BACKOFF``).
+
+Once the backoff has run out the breaker is half-open: one probe request goes
+out, and until its outcome is recorded (or ``BREAKER_PROBE_TIMEOUT`` passes)
+no other.  A success closes the breaker; a failure opens it again with the
+backoff doubled.  Rate-limit and lockout answers are the app's or the token's
+problem, not the endpoint's, and don't count.  The breakers are kept in a
+Store with wall-clock retry times, so a known-gated endpoint stays parked
+across restarts.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    BREAKER_PROBE_TIMEOUT,
+    BREAKER_SAVE_DELAY,
+    BREAKER_SCOPE_BACKOFF,
+    BREAKER_SCOPE_MAX_BACKOFF,
+    BREAKER_STORAGE_VERSION,
+    BREAKER_TRANSIENT_BACKOFF,
+    BREAKER_TRANSIENT_MAX_BACKOFF,
+    BREAKER_TRANSIENT_THRESHOLD,
+    DOMAIN,
+)
+
+FAILURE_SCOPE = "scope"
+FAILURE_TRANSIENT = "transient"
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+_BACKOFFS: dict[str, tuple[timedelta, timedelta]] = {
+    FAILURE_SCOPE: (BREAKER_SCOPE_BACKOFF, BREAKER_SCOPE_MAX_BACKOFF),
+    FAILURE_TRANSIENT: (BREAKER_TRANSIENT_BACKOFF, BREAKER_TRANSIENT_MAX_BACKOFF),
+}
+
+
+def breaker_key(endpoint: list[Any]) -> str:
+    """``path#extension``: the same path can be polled with different params
+    (e.g. the performance windows), and each must back off on its own."""
+    return f"{endpoint[1]}#{endpoint[3]}"
+
+
+class SharesightBreakers:
+    """Circuit breakers per optional endpoint, persisted in one Store."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Bind to the entry's store; ``async_load`` fills it from disk."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass,
+            BREAKER_STORAGE_VERSION,
+            f"{DOMAIN}.{entry_id}.breakers",
+            private=True,
+        )
+        # breaker key -> {"kind", "failures", "backoff" (seconds), "retry_at"
+        # (ISO, None while closed and counting transient failures)}
+        self.breakers: dict[str, dict[str, Any]] = {}
+        # breaker key -> monotonic start of the half-open probe in flight.
+        self._probes: dict[str, float] = {}
+        self.loaded: bool = False
+        self.trips: int = 0
+
+    @staticmethod
+    def _retry_at(breaker: dict[str, Any]) -> datetime | None:
+        return dt_util.parse_datetime(str(breaker.get("retry_at") or ""))
+
+    def state(self, key: str, now: datetime | None = None) -> str:
+        """Closed, open (backing off) or half-open (due a probe)."""
+        breaker = self.breakers.get(key)
+        retry_at = None if breaker is None else self._retry_at(breaker)
+        if retry_at is None:
+            return STATE_CLOSED
+        if (now or dt_util.utcnow()) < retry_at:
+            return STATE_OPEN
+        return STATE_HALF_OPEN
+
+    def allow(self, key: str) -> bool:
+        """Whether the endpoint may be requested now.
+
+        A half-open breaker lets one probe through and holds back the rest
+        until that probe's outcome is recorded.
+        """
+        state = self.state(key)
+        if state == STATE_CLOSED:
+            return True
+        if state == STATE_OPEN:
+            return False
+        now = time.monotonic()
+        started = self._probes.get(key)
+        if (
+            started is not None
+            and now - started < BREAKER_PROBE_TIMEOUT.total_seconds()
+        ):
+            return False
+        self._probes[key] = now
+        return True
+
+    def record_success(self, key: str) -> bool:
+        """Close the breaker; True when that changed anything."""
+        self._probes.pop(key, None)
+        return self.breakers.pop(key, None) is not None
+
+    def record_failure(self, key: str, kind: str) -> bool:
+        """Count one failure of ``kind``; True when the breaker (re)opened.
+
+        A failed half-open probe reopens the breaker whatever its kind: the
+        previous backoff doubles (up to the previous kind's ceiling) and
+        stands, with its kind, unless the new kind's base is longer.  A
+        transient error probing a scope-denied endpoint therefore doesn't
+        close it again.  Otherwise backoff starts from the kind's base.
+        """
+        self._probes.pop(key, None)
+        previous = self.breakers.get(key) or {}
+        base, ceiling = _BACKOFFS[kind]
+        backoff = base
+        if previous.get("retry_at"):
+            previous_kind = previous["kind"]
+            doubled = min(
+                timedelta(seconds=previous.get("backoff", 0) * 2),
+                _BACKOFFS[previous_kind][1],
+            )
+            if doubled >= base:
+                kind, backoff = previous_kind, doubled
+        failures = 1
+        if previous.get("kind") == kind:
+            failures += previous.get("failures", 0)
+        breaker: dict[str, Any] = {
+            "kind": kind,
+            "failures": failures,
+            "backoff": previous.get("backoff", 0),
+            "retry_at": None,
+        }
+        self.breakers[key] = breaker
+        if (
+            not previous.get("retry_at")
+            and kind == FAILURE_TRANSIENT
+            and failures < BREAKER_TRANSIENT_THRESHOLD
+        ):
+            return False
+        breaker["backoff"] = backoff.total_seconds()
+        breaker["retry_at"] = (dt_util.utcnow() + backoff).isoformat()
+        self.trips += 1
+        return True
+
+    def open_remaining(self) -> dict[str, int]:
+        """``{key: seconds until the probe}`` of the open breakers."""
+        now = dt_util.utcnow()
+        remaining = {}
+        for key, breaker in self.breakers.items():
+            retry_at = self._retry_at(breaker)
+            if retry_at is not None and now < retry_at:
+                remaining[key] = int((retry_at - now).total_seconds())
+        return remaining
+
+    async def async_load(self) -> None:
+        """Restore the breakers saved by a previous run, if any."""
+        self.loaded = True
+        stored = await self._store.async_load()
+        if isinstance(stored, dict) and isinstance(stored.get("breakers"), dict):
+            self.breakers = {
+                str(key): breaker
+                for key, breaker in stored["breakers"].items()
+                if isinstance(breaker, dict) and breaker.get("kind") in _BACKOFFS
+            }
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Write the breakers out shortly, coalescing back-to-back changes."""
+        self._store.async_delay_save(
+            lambda: {"breakers": self.breakers}, BREAKER_SAVE_DELAY
+        )
+
+    async def async_remove(self) -> None:
+        """Delete the stored breakers (the entry is being removed)."""
+        await self._store.async_remove()
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Each non-closed breaker's state, kind, failures and retry time."""
+        now = dt_util.utcnow()
+        return {
+            "trips": self.trips,
+            "breakers": {
+                key: {
+                    "state": self.state(key, now),
+                    "kind": breaker.get("kind"),
+                    "failures": breaker.get("failures"),
+                    "retry_at": breaker.get("retry_at"),
+                }
+                for key, breaker in sorted(self.breakers.items())
+            },
+        }
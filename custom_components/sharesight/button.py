@@ -56,8 +56,8 @@ class SharesightRefreshButton(SharesightBaseEntity, ButtonEntity):
         )
 
     async def async_press(self) -> None:
-        """Trigger a debounced on-demand poll."""
-        await self.coordinator.async_request_refresh()
+        """Queue a debounced on-demand poll, coalesced across portfolios."""
+        self.coordinator.async_request_manual_refresh()
 
 
 class SharesightRebuildValueHistoryButton(SharesightBaseEntity, ButtonEntity):
@@ -0,0 +1,144 @@
+"""Short-lived, single-flight response caches.
+
+A handful of the endpoints every poll requests belong to the Sharesight login,
+not to the portfolio the config entry tracks: the portfolio list, cash
+accounts, user instruments, the user profile, the watchlist, market hours and
+FX rates.  Five portfolios set up from one login used to fetch each of them
+five times a cycle, for five identical answers.
+
+One ``SharesightResponseCache`` exists per OAuth app for the life of the
+process (next to its request budget), keyed by (login, endpoint, params):
+
+* a successful response is kept for a short TTL, so the other portfolios'
+  polls in the same cycle reuse it instead of asking again;
+* concurrent requests for the same key share the one request in flight
+  (single flight), so portfolios that poll in the same instant don't race;
+* errors are never cached — each caller's own backoff handles those.
+
+Each coordinator also keeps a private, size-bounded one for the on-demand
+service requests (sharechecker, official costs, performance reports), so an
+automation asking for the same symbol's fundamentals every morning, or a
+script re-running a report, reuses the answer for that endpoint's TTL
+(``SERVICE_CACHE_TTLS``) instead of spending requests on it.  Past its size the
+least recently used entry is evicted.
+
+Every caller gets its own deep copy, because the coordinator merges responses
+into its data in place.
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from functools import partial
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SharesightResponseCache:
+    """TTL cache with single-flight fetches and optional LRU bound."""
+
+    def __init__(self, max_entries: int | None = None) -> None:
+        """Start empty; ``max_entries`` None means unbounded."""
+        # key -> (monotonic expiry, response), least recently used first.
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future[Any]] = {}
+        self._max_entries = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self.coalesced: int = 0
+        self.evictions: int = 0
+
+    async def async_get(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: float,
+    ) -> Any:
+        """Return the cached response for ``key``, fetching it at most once.
+
+        ``ttl`` is in seconds and applies to the response ``fetch`` produces.
+        The shared fetch runs as its own task, so a caller that times out or is
+        cancelled doesn't take the request away from the others waiting on it.
+        """
+        now = time.monotonic()
+        cached = self._entries.get(key)
+        if cached is not None:
+            if cached[0] > now:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return copy.deepcopy(cached[1])
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._async_fetch_done, key, ttl))
+        else:
+            self.coalesced += 1
+        return copy.deepcopy(await asyncio.shield(task))
+
+    @callback
+    def _async_fetch_done(self, key: Hashable, ttl: float, task: asyncio.Future[Any]) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if isinstance(result, dict) and "error" not in result:
+            now = time.monotonic()
+            self._entries[key] = (now + ttl, result)
+            self._entries.move_to_end(key)
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Keep within ``max_entries``: expired entries first, then the LRU."""
+        if self._max_entries is None or len(self._entries) <= self._max_entries:
+            return
+        expired = [key for key, (expiry, _) in self._entries.items() if expiry <= now]
+        for key in expired:
+            del self._entries[key]
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Point-in-time state for diagnostics."""
+        now = time.monotonic()
+        return {
+            "entries": sum(1 for expiry, _ in self._entries.values() if expiry > now),
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
+
+
+DATA_RESPONSE_CACHES: HassKey[dict[str, SharesightResponseCache]] = HassKey(
+    f"{DOMAIN}_response_caches"
+)
+
+
+@callback
+def async_get_response_cache(hass: HomeAssistant, key: str) -> SharesightResponseCache:
+    """Return the process-wide cache for the OAuth app ``key``.
+
+    ``key`` is the same ``request_budget_key`` the app's budget uses.
+    """
+    caches = hass.data.setdefault(DATA_RESPONSE_CACHES, {})
+    cache = caches.get(key)
+    if cache is None:
+        cache = caches[key] = SharesightResponseCache()
+        _LOGGER.debug("Created Sharesight response cache for a new OAuth app")
+    return cache
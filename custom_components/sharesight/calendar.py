@@ -111,7 +111,6 @@ class SharesightDividendCalendar(SharesightBaseEntity, CalendarEntity):
         )
 
         events: list[CalendarEvent] = []
-        seen: set[tuple] = set()
         for payout in payouts:
             if not isinstance(payout, dict):
                 continue
@@ -124,75 +123,64 @@ class SharesightDividendCalendar(SharesightBaseEntity, CalendarEntity):
             # Payment-date event: the received/announced payout on its pay date.
             day = _payout_date(payout)
             if day is not None:
-                # A payout paid today can appear in both the historic and the
-                # forward window — emit it once.
-                dedupe_key = (payout.get("id"), day, symbol, amount)
-                if dedupe_key not in seen:
-                    seen.add(dedupe_key)
-
-                    summary = f"{symbol} dividend"
-                    if amount:
-                        summary += f" {amount:.2f} {self._currency}"
-
-                    description_parts = [payout.get("company_name") or symbol]
-                    state = payout.get("state") or payout.get("status")
-                    if state:
-                        description_parts.append(f"State: {state}")
-                    goes_ex = payout.get("goes_ex_on") or payout.get("ex_date")
-                    if goes_ex:
-                        description_parts.append(f"Ex-dividend: {str(goes_ex)[:10]}")
-
-                    events.append(
-                        CalendarEvent(
-                            start=day,
-                            end=day + timedelta(days=1),
-                            summary=summary,
-                            description="\n".join(
-                                str(p) for p in description_parts if p
-                            ),
-                        )
+                summary = f"{symbol} dividend"
+                if amount:
+                    summary += f" {amount:.2f} {self._currency}"
+
+                description_parts = [payout.get("company_name") or symbol]
+                state = payout.get("state") or payout.get("status")
+                if state:
+                    description_parts.append(f"State: {state}")
+                goes_ex = payout.get("goes_ex_on") or payout.get("ex_date")
+                if goes_ex:
+                    description_parts.append(f"Ex-dividend: {str(goes_ex)[:10]}")
+
+                events.append(
+                    CalendarEvent(
+                        start=day,
+                        end=day + timedelta(days=1),
+                        summary=summary,
+                        description="\n".join(
+                            str(p) for p in description_parts if p
+                        ),
                     )
+                )
 
             # Ex-dividend event (W5): a distinct calendar entry on the ex date,
-            # so users can automate against "goes ex tomorrow".  It carries its
-            # OWN dedupe key (prefixed so it never clashes with the payment
-            # event's key above, even when both fall on the same day) and a
-            # stable, distinct uid.  Payouts with no ex date are skipped.
+            # so users can automate against "goes ex tomorrow".  It carries a
+            # stable uid distinct from the payment event's, even when both
+            # fall on the same day.  Payouts with no ex date are skipped.
             ex_day = _ex_dividend_date(payout)
             if ex_day is not None:
-                ex_dedupe = ("ex", payout.get("id"), ex_day, symbol, amount)
-                if ex_dedupe not in seen:
-                    seen.add(ex_dedupe)
-
-                    ex_summary = f"{symbol} ex-dividend"
-                    if amount:
-                        ex_summary += f" {amount:.2f} {self._currency}"
-
-                    ex_parts = [
-                        payout.get("company_name") or symbol,
-                        "Ex-dividend date",
-                    ]
-                    pay_on = payout.get("paid_on") or payout.get("date")
-                    if pay_on:
-                        ex_parts.append(f"Pays: {str(pay_on)[:10]}")
-                    ex_state = payout.get("state") or payout.get("status")
-                    if ex_state:
-                        ex_parts.append(f"State: {ex_state}")
-
-                    ident = payout.get("id")
-                    if ident is None:
-                        ident = symbol or "unknown"
-                    uid = f"{self._portfolio_id}_exdiv_{ident}_{ex_day.isoformat()}"
-
-                    events.append(
-                        CalendarEvent(
-                            start=ex_day,
-                            end=ex_day + timedelta(days=1),
-                            summary=ex_summary,
-                            description="\n".join(str(p) for p in ex_parts if p),
-                            uid=uid,
-                        )
+                ex_summary = f"{symbol} ex-dividend"
+                if amount:
+                    ex_summary += f" {amount:.2f} {self._currency}"
+
+                ex_parts = [
+                    payout.get("company_name") or symbol,
+                    "Ex-dividend date",
+                ]
+                pay_on = payout.get("paid_on") or payout.get("date")
+                if pay_on:
+                    ex_parts.append(f"Pays: {str(pay_on)[:10]}")
+                ex_state = payout.get("state") or payout.get("status")
+                if ex_state:
+                    ex_parts.append(f"State: {ex_state}")
+
+                ident = payout.get("id")
+                if ident is None:
+                    ident = symbol or "unknown"
+                uid = f"{self._portfolio_id}_exdiv_{ident}_{ex_day.isoformat()}"
+
+                events.append(
+                    CalendarEvent(
+                        start=ex_day,
+                        end=ex_day + timedelta(days=1),
+                        summary=ex_summary,
+                        description="\n".join(str(p) for p in ex_parts if p),
+                        uid=uid,
                     )
+                )
 
         events.sort(key=lambda ev: ev.start)
         return events
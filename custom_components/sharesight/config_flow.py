@@ -9,8 +9,6 @@ import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry, ConfigFlowResult, OptionsFlow
 from homeassistant.core import callback
 from homeassistant.helpers import config_entry_oauth2_flow
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from SharesightAPI.SharesightAPI import SharesightAPI
 
 from .application_credentials import account_type_context
 from .const import (
@@ -18,19 +16,27 @@ from .const import (
     ACCOUNT_STANDARD,
     API_URL_BASE,
     CONF_ACCOUNT_TYPE,
+    CONF_ADAPTIVE_POLLING,
     CONF_AUTO_REMOVE_STALE_DEVICES,
     CONF_ENABLE_LTS_BACKFILL,
+    CONF_IDLE_SCAN_INTERVAL,
     CONF_PORTFOLIO_ID,
     CONF_SCAN_INTERVAL,
+    CONF_SNAPSHOT_MAX_AGE,
     DEFAULT_ACCOUNT_TYPE,
+    DEFAULT_ADAPTIVE_POLLING,
     DEFAULT_AUTO_REMOVE_STALE_DEVICES,
     DEFAULT_ENABLE_LTS_BACKFILL,
+    DEFAULT_IDLE_SCAN_INTERVAL,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SNAPSHOT_MAX_AGE_HOURS,
     DOMAIN,
+    MAX_IDLE_SCAN_INTERVAL_SECONDS,
     MAX_SCAN_INTERVAL_SECONDS,
+    MAX_SNAPSHOT_MAX_AGE_HOURS,
     MIN_SCAN_INTERVAL_SECONDS,
-    TOKEN_URL,
 )
+from .transport import SharesightTransport, async_get_api_session
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -78,21 +84,14 @@ class SharesightConfigFlow(
             _LOGGER.error("No access token available to fetch portfolios")
             return {}
 
-        client = SharesightAPI(
-            client_id="",
-            client_secret="",
-            authorization_code="",
-            redirect_uri="",
-            token_url=TOKEN_URL[self._account_type],
-            api_url_base=API_URL_BASE[self._account_type],
-            use_token_file=False,
-            session=async_get_clientsession(self.hass),
+        transport = SharesightTransport(
+            async_get_api_session(self.hass), API_URL_BASE[self._account_type]
         )
 
         try:
-            response = await client.get_api_request(
-                ["v3", "portfolios", None, False], access_token
-            )
+            response = (
+                await transport.async_get(["v3", "portfolios", None], access_token)
+            ).data
             _LOGGER.debug("Portfolios response: %s", response)
 
             if not isinstance(response, dict):
@@ -252,7 +251,7 @@ class SharesightConfigFlow(
 
 
 class SharesightOptionsFlow(OptionsFlow):
-    """Options flow: poll interval, statistics backfill, stale-device cleanup.
+    """Options flow: polling, statistics backfill, device cleanup, warm start.
 
     Takes no constructor arguments — ``self.config_entry`` is provided by the
     base class (see ``async_get_options_flow``).
@@ -268,12 +267,24 @@ class SharesightOptionsFlow(OptionsFlow):
                 int(DEFAULT_SCAN_INTERVAL.total_seconds()),
             )
         )
+        current_adaptive = self.config_entry.options.get(
+            CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING
+        )
+        current_idle_seconds = int(
+            self.config_entry.options.get(
+                CONF_IDLE_SCAN_INTERVAL,
+                int(DEFAULT_IDLE_SCAN_INTERVAL.total_seconds()),
+            )
+        )
         current_backfill = self.config_entry.options.get(
             CONF_ENABLE_LTS_BACKFILL, DEFAULT_ENABLE_LTS_BACKFILL
         )
         current_auto_remove = self.config_entry.options.get(
             CONF_AUTO_REMOVE_STALE_DEVICES, DEFAULT_AUTO_REMOVE_STALE_DEVICES
         )
+        current_snapshot_age = self.config_entry.options.get(
+            CONF_SNAPSHOT_MAX_AGE, DEFAULT_SNAPSHOT_MAX_AGE_HOURS
+        )
 
         schema = vol.Schema(
             {
@@ -287,6 +298,20 @@ class SharesightOptionsFlow(OptionsFlow):
                         max=MAX_SCAN_INTERVAL_SECONDS,
                     ),
                 ),
+                vol.Required(
+                    CONF_ADAPTIVE_POLLING,
+                    default=current_adaptive,
+                ): bool,
+                vol.Required(
+                    CONF_IDLE_SCAN_INTERVAL,
+                    default=current_idle_seconds,
+                ): vol.All(
+                    vol.Coerce(int),
+                    vol.Range(
+                        min=MIN_SCAN_INTERVAL_SECONDS,
+                        max=MAX_IDLE_SCAN_INTERVAL_SECONDS,
+                    ),
+                ),
                 vol.Required(
                     CONF_ENABLE_LTS_BACKFILL,
                     default=current_backfill,
@@ -295,6 +320,13 @@ class SharesightOptionsFlow(OptionsFlow):
                     CONF_AUTO_REMOVE_STALE_DEVICES,
                     default=current_auto_remove,
                 ): bool,
+                vol.Required(
+                    CONF_SNAPSHOT_MAX_AGE,
+                    default=current_snapshot_age,
+                ): vol.All(
+                    vol.Coerce(int),
+                    vol.Range(min=0, max=MAX_SNAPSHOT_MAX_AGE_HOURS),
+                ),
             }
         )
         return self.async_show_form(step_id="init", data_schema=schema)
@@ -12,10 +12,65 @@ SCAN_INTERVAL = DEFAULT_SCAN_INTERVAL
 MIN_SCAN_INTERVAL_SECONDS = 60
 MAX_SCAN_INTERVAL_SECONDS = 60 * 60
 
-# Slow-moving performance windows (financial-year / YTD / one-month) only need
-# refreshing occasionally, so the coordinator re-fetches them every Nth poll
-# instead of every poll.  12 polls ≈ hourly at the 5-minute default interval.
-SLOW_PERIOD_REFRESH_EVERY = 12
+# Adaptive polling (opt-in): poll at CONF_SCAN_INTERVAL while any held market
+# trades and at CONF_IDLE_SCAN_INTERVAL (seconds) once all are shut — nights,
+# weekends — plus one poll MARKET_CHANGE_DELAY after each held market opens or
+# closes, so the closing values land promptly.
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+DEFAULT_ADAPTIVE_POLLING = False
+CONF_IDLE_SCAN_INTERVAL = "idle_scan_interval"
+DEFAULT_IDLE_SCAN_INTERVAL = timedelta(hours=1)
+MAX_IDLE_SCAN_INTERVAL_SECONDS = 6 * 60 * 60
+MARKET_CHANGE_DELAY = timedelta(minutes=5)
+
+# Poll staggering across the entries on one OAuth app (see stagger.py).  Each
+# poll gets up to 2 % of its interval (at most 5 s) of jitter; polls aimed at
+# a market open or close spread over the minute after it.  Refresh presses
+# within 2 s of each other are run as one queue.
+POLL_JITTER_SECONDS = 5.0
+POLL_JITTER_SHARE = 0.02
+POLL_STAGGER_ANCHORED_SPREAD = 60.0
+MANUAL_REFRESH_COALESCE_WINDOW = 2.0
+
+# Per-endpoint refresh periods (see scheduler.py), keyed by the endpoint's
+# extension key (or last path segment).  Endpoints not listed refresh every
+# poll.  Slow-moving performance windows and the daily value series go about
+# hourly; near-static account metadata a few times a day.
+ENDPOINT_REFRESH_PERIODS: dict[str, timedelta] = {
+    "financial-year": timedelta(hours=1),
+    "one-month": timedelta(hours=1),
+    "ytd": timedelta(hours=1),
+    "value_series": timedelta(hours=1),
+    "capital_gains": timedelta(hours=1),
+    # Heavy; the breakdown is computed locally every poll (coordinator) and
+    # the report only reconciles it.
+    "diversity_v2": timedelta(hours=6),
+    "user_instruments": timedelta(hours=6),
+    "markets": timedelta(hours=12),
+    "user_setting": timedelta(hours=12),
+    "my_user": timedelta(hours=24),
+}
+# Price-driven reports refresh every poll while any held market is trading
+# and on this period once every held market is shut (nights, weekends).
+ENDPOINT_CLOSED_MARKET_PERIODS: dict[str, timedelta] = {
+    "benchmark": timedelta(hours=1),
+    "totals": timedelta(hours=1),
+    "unrealised_cgt": timedelta(hours=1),
+}
+
+# Local period performance (see performance.py).  These performance windows
+# are rolled forward locally between reports once a report has confirmed the
+# roll-forward; a confirmed window's report then goes out no more often than
+# this, to keep checking it.  A report the roll-forward predicted to within the
+# tolerances (fraction of the window's end value; percentage points) confirms it.
+LOCAL_PERFORMANCE_WINDOWS = ("one-day", "one-week", "one-month", "ytd", "financial-year")
+LOCAL_PERFORMANCE_CHECK_PERIOD = timedelta(hours=1)
+LOCAL_PERFORMANCE_VALUE_TOLERANCE = 0.001
+LOCAL_PERFORMANCE_PERCENT_TOLERANCE = 0.1
+# generate_performance_report windows are answered locally when the value
+# series has a close no more than this many days before each end of the window
+# (weekends and market holidays have none).
+LOCAL_REPORT_MAX_POINT_GAP_DAYS = 5
 
 # Days of daily portfolio value history requested for the value-trend sensors.
 # The sensors only need 30 days; the extra fortnight covers weekends, market
@@ -88,8 +143,179 @@ SHARESIGHT_MAX_REQUESTS_PER_MINUTE = 360
 SHARESIGHT_HEAVY_CONCURRENCY = 3
 SHARESIGHT_LOCKOUT_COOLDOWN = timedelta(minutes=10)
 
-# Retry the same "optional" endpoint after this cooldown rather than disabling
-# it for the lifetime of the process.  Users on plans that briefly return 5xx
-# will recover without restarting HA.
+# All three limits are per consumer app, so every config entry that shares an
+# OAuth app draws on one process-wide budget (see ratelimit.py).  The burst is
+# carved out of the per-minute budget rather than added on top of it, so a
+# full bucket plus a minute of refill never exceeds the 360 ceiling.
+SHARESIGHT_REQUEST_BURST = 60
+# General in-flight cap shared by every portfolio on the app.
+SHARESIGHT_MAX_PARALLEL_REQUESTS = 8
+
+# HTTP transport (see transport.py).  The pool holds the in-flight requests of
+# a couple of apps with room to spare, and idle connections outlive the
+# default 15 s so back-to-back polls of a short interval reuse them.  The API
+# host's address is cached for five minutes rather than aiohttp's ten seconds.
+TRANSPORT_POOL_SIZE = 32
+TRANSPORT_KEEPALIVE_TIMEOUT = 75
+TRANSPORT_DNS_CACHE_TTL = 300
+# 429 / 5xx answers and connection errors are retried with exponential
+# backoff from one second; a 429's Retry-After wins, capped at five minutes
+# and at whatever is left of the endpoint's timeout.
+TRANSPORT_MAX_RETRIES = 3
+TRANSPORT_RETRY_BACKOFF = 1.0
+TRANSPORT_MAX_RETRY_AFTER = 300.0
+
+# Request metrics (see metrics.py): latency, slot-wait and size percentiles are
+# taken over each endpoint's last 50 requests.
+METRICS_WINDOW = 50
+# Per-endpoint request timeouts: four times the endpoint's p95 latency over
+# that window, kept between 10 s and 60 s, or 120 s for the heavy reports,
+# whose FY runs on a large portfolio can legitimately take that long.  An
+# endpoint with fewer than 5 answers gets its ceiling.
+ENDPOINT_TIMEOUT_P95_MULTIPLIER = 4
+ENDPOINT_TIMEOUT_MIN_SAMPLES = 5
+ENDPOINT_TIMEOUT_FLOOR = 10.0
+ENDPOINT_TIMEOUT_CEILING = 60.0
+HEAVY_ENDPOINT_TIMEOUT_CEILING = 120.0
+# A light request still unanswered at its endpoint's p95 (never sooner than a
+# second, and only once 10 answers give a p95 worth trusting) is hedged with
+# one identical request when the budget has room; the first answer wins.
+# "Room" is a free general slot, a calm governor and at least
+# HEDGE_MIN_TOKENS in the app's bucket: a hedge is one extra request, but it
+# must never take the last tokens a poll's remaining requests are counting on.
+HEDGE_MIN_SAMPLES = 10
+HEDGE_MIN_DELAY = 1.0
+HEDGE_MIN_TOKENS = 10
+# Poll phase traces (see tracing.py) kept per portfolio.
+TRACE_MAX_POLLS = 20
+
+# Rate governor.  Every response carries X-MinuteRate-Limit / -Remaining; the
+# shared budget keeps the last reading (trusted for a minute) and never holds
+# more tokens than the API says remain, less a small reserve for the requests
+# of other clients on the same app.  As the remaining share of the minute
+# falls, polls first shed their optional endpoints (carrying the last values
+# forward), then also stretch the poll interval, instead of waiting for the
+# 403 to say the budget is gone.
+RATE_HEADER_TTL_SECONDS = 60
+RATE_GOVERNOR_RESERVE = 10
+RATE_GOVERNOR_SHED_BELOW = 0.25
+RATE_GOVERNOR_THROTTLE_BELOW = 0.10
+RATE_GOVERNOR_THROTTLE_FACTOR = 2
+GOVERNOR_NORMAL = "normal"
+GOVERNOR_SHED = "shed"
+GOVERNOR_THROTTLE = "throttle"
+# Optional endpoints (by extension key) a pressured poll may skip.  All are
+# nice-to-have and safe to carry forward from the previous poll; the holdings,
+# payouts, trades and cash sources feed the activity diff and calendar, so
+# they are never shed.
+RATE_GOVERNOR_SHEDDABLE = frozenset(
+    {
+        "diversity_v2",
+        "exchange_rates",
+        "instrument_news",
+        "markets",
+        "my_user",
+        "totals",
+        "user_instruments",
+        "user_setting",
+        "value_series",
+        "watchlist",
+    }
+)
+
+# Data-sufficiency elision.  Each listed optional endpoint (by extension key)
+# only feeds data another source fetched anyway can supply, given here as a
+# path into the poll's merged data.  Once that source has covered it on
+# ELISION_POLLS polls in a row, the endpoint is skipped; the first poll where
+# the source comes back empty resets the count, so it is back the poll after.
+# V3 holdings: post-processing prefers the combined report's own holdings and
+# only falls back to the separate list when the report has none.
+ELIDABLE_ENDPOINTS: dict[str, tuple[str, ...]] = {
+    "holdings": ("report", "holdings"),
+}
+ELISION_POLLS = 3
+
+# Account-level endpoints answer for the login, not the portfolio, so every
+# entry on the same login shares one fetch per cycle through the app's
+# response cache (see cache.py).  The TTL is kept under one poll interval so
+# each cycle still sees fresh data; an entry polling faster than that caps it
+# at ACCOUNT_CACHE_INTERVAL_SHARE of its own interval.
+ACCOUNT_LEVEL_PATHS = frozenset(
+    {
+        "portfolios",
+        "cash_accounts",
+        "user_instruments",
+        "my_user.json",
+        "watchlist.json",
+        "markets",
+        "exchange_rates",
+    }
+)
+ACCOUNT_CACHE_TTL = timedelta(minutes=4)
+ACCOUNT_CACHE_INTERVAL_SHARE = 0.8
+
+# On-demand service responses are cached per entry (see cache.py), for this
+# long per endpoint (keyed by the path's last segment, ``.json`` dropped), up
+# to SERVICE_CACHE_MAX_ENTRIES.  Fundamentals change at most daily; official
+# costs move with each trade; a report is only reused for a few minutes.
+SERVICE_CACHE_TTLS: dict[str, timedelta] = {
+    "sharechecker": timedelta(hours=12),
+    "average_purchase_price": timedelta(hours=1),
+    "cost_base": timedelta(hours=1),
+    "performance": timedelta(minutes=15),
+}
+SERVICE_CACHE_MAX_ENTRIES = 256
+# Holdings get_holdings_fundamentals works on at once (three light requests
+# each); the request budget paces them beyond that.
+FUNDAMENTALS_BATCH_CONCURRENCY = 4
+
+# Background prefetch of per-holding official costs (see official_costs.py).
+# After each poll up to OFFICIAL_COSTS_PREFETCH_PER_CYCLE holdings (two light
+# requests each) are refreshed, one at a time and only while the app's bucket
+# holds at least OFFICIAL_COSTS_PREFETCH_MIN_TOKENS and the governor is calm.
+OFFICIAL_COSTS_STORAGE_VERSION = 1
+OFFICIAL_COSTS_SAVE_DELAY = 30
+OFFICIAL_COSTS_MAX_AGE = timedelta(hours=24)
+OFFICIAL_COSTS_PREFETCH_PER_CYCLE = 10
+OFFICIAL_COSTS_PREFETCH_MIN_TOKENS = 30
+
+# Local transaction ledgers (see ledger.py).  Polls fetch only the window
+# from the last sync minus the overlap, which absorbs late edits and trades
+# entered a few weeks after their date; a full resync replaces the ledger
+# once a day to catch anything older and deletions outside the window.
+LEDGER_STORAGE_VERSION = 1
+LEDGER_SAVE_DELAY = 10
+LEDGER_FULL_RESYNC_INTERVAL = timedelta(hours=24)
+TRADES_SYNC_OVERLAP = timedelta(days=30)
+# Dividends are usually recorded on or shortly after their pay date, but
+# broker feeds and manual entry can lag by weeks, so payouts get a longer one.
+PAYOUTS_SYNC_OVERLAP = timedelta(days=60)
+# Bank feeds (Xero and the like) post cash transactions a few days late.
+CASH_TX_SYNC_OVERLAP = timedelta(days=14)
+
+# Warm start (see snapshot.py).  The last good data is saved after each
+# successful poll and restored at setup when it is no older than the
+# configured maximum age (hours; 0 turns warm start off).
+CONF_SNAPSHOT_MAX_AGE = "snapshot_max_age"
+DEFAULT_SNAPSHOT_MAX_AGE_HOURS = 24
+MAX_SNAPSHOT_MAX_AGE_HOURS = 168
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30
+
+# Retry a failed cash account's transactions after this cooldown, doubling to
+# the maximum, rather than disabling it for the lifetime of the process.
 OPTIONAL_ENDPOINT_COOLDOWN = timedelta(hours=1)
 OPTIONAL_ENDPOINT_MAX_BACKOFF = timedelta(hours=6)
+
+# Optional endpoint circuit breakers (see breaker.py).  Two transient failures
+# in a row park an endpoint for 5 minutes, doubling to an hour; a scope 403
+# parks it for a day at once, doubling to a week.  A half-open probe that
+# never reports back frees the slot for another after 10 minutes.
+BREAKER_TRANSIENT_THRESHOLD = 2
+BREAKER_TRANSIENT_BACKOFF = timedelta(minutes=5)
+BREAKER_TRANSIENT_MAX_BACKOFF = timedelta(hours=1)
+BREAKER_SCOPE_BACKOFF = timedelta(days=1)
+BREAKER_SCOPE_MAX_BACKOFF = timedelta(days=7)
+BREAKER_PROBE_TIMEOUT = timedelta(minutes=10)
+BREAKER_STORAGE_VERSION = 1
+BREAKER_SAVE_DELAY = 30
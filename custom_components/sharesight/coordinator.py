@@ -5,34 +5,88 @@ import asyncio
 import itertools
 import logging
 import time
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, tzinfo
+from collections.abc import Mapping
 from typing import Any
 
 import aiohttp
 
 from . import analytics
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.helpers.event import async_call_at
 from homeassistant.helpers.update_coordinator import (
     TimestampDataUpdateCoordinator,
     UpdateFailed,
 )
 from homeassistant.util import dt as dt_util
 
+from .cache import SharesightResponseCache
 from .const import (
+    ACCOUNT_CACHE_INTERVAL_SHARE,
+    ACCOUNT_CACHE_TTL,
+    ACCOUNT_LEVEL_PATHS,
+    CASH_TX_SYNC_OVERLAP,
+    CONF_ADAPTIVE_POLLING,
+    CONF_IDLE_SCAN_INTERVAL,
     CONF_SCAN_INTERVAL,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_IDLE_SCAN_INTERVAL,
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
+    ELIDABLE_ENDPOINTS,
+    ELISION_POLLS,
+    ENDPOINT_CLOSED_MARKET_PERIODS,
+    ENDPOINT_REFRESH_PERIODS,
+    GOVERNOR_NORMAL,
+    GOVERNOR_THROTTLE,
+    HEDGE_MIN_TOKENS,
+    LEDGER_FULL_RESYNC_INTERVAL,
+    LOCAL_PERFORMANCE_CHECK_PERIOD,
+    LOCAL_PERFORMANCE_WINDOWS,
+    MARKET_CHANGE_DELAY,
+    MAX_IDLE_SCAN_INTERVAL_SECONDS,
     MAX_SCAN_INTERVAL_SECONDS,
     MIN_SCAN_INTERVAL_SECONDS,
+    OFFICIAL_COSTS_PREFETCH_MIN_TOKENS,
+    OFFICIAL_COSTS_PREFETCH_PER_CYCLE,
     OPTIONAL_ENDPOINT_COOLDOWN,
     OPTIONAL_ENDPOINT_MAX_BACKOFF,
-    SHARESIGHT_HEAVY_CONCURRENCY,
+    PAYOUTS_SYNC_OVERLAP,
+    RATE_GOVERNOR_SHEDDABLE,
+    RATE_GOVERNOR_THROTTLE_FACTOR,
+    SERVICE_CACHE_MAX_ENTRIES,
+    SERVICE_CACHE_TTLS,
     SHARESIGHT_LOCKOUT_COOLDOWN,
-    SLOW_PERIOD_REFRESH_EVERY,
+    TRADES_SYNC_OVERLAP,
+    TRANSPORT_MAX_RETRIES,
     VALUE_TREND_LOOKBACK_DAYS,
 )
+from .ledger import SharesightLedgers
+from .auth import SharesightTokenManager
+from .breaker import (
+    FAILURE_SCOPE,
+    FAILURE_TRANSIENT,
+    SharesightBreakers,
+    breaker_key,
+)
+from .metrics import SharesightMetrics, metrics_key
+from .official_costs import SharesightOfficialCosts, holding_marker
+from .performance import LocalPerformance, window_performance
+from .snapshot import SharesightSnapshot, compact_data
+from .stagger import SharesightRefreshQueue, poll_delay
+from .tracing import SharesightTracer
+from .ratelimit import SharesightRequestBudget
+from .scheduler import EndpointScheduler, schedule_key
+from .transport import (
+    RETRYABLE_STATUSES,
+    SharesightResponse,
+    SharesightTransport,
+    parse_holding_limit,
+    parse_minute_rate,
+    retry_delay,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -81,6 +135,27 @@ def _get_scan_interval(entry: ConfigEntry | None) -> timedelta:
     return timedelta(seconds=seconds)
 
 
+def _discard_tasks(tasks: list[asyncio.Task[Any]]) -> None:
+    """Cancel poll tasks still in flight; mark finished ones' errors as seen."""
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
+
+
+def _get_idle_scan_interval(entry: ConfigEntry | None) -> timedelta:
+    """Adaptive polling's all-markets-shut interval, clamped like the scan interval."""
+    if entry is None:
+        return DEFAULT_IDLE_SCAN_INTERVAL
+    try:
+        seconds = int(entry.options[CONF_IDLE_SCAN_INTERVAL])
+    except (KeyError, TypeError, ValueError):
+        return DEFAULT_IDLE_SCAN_INTERVAL
+    seconds = max(MIN_SCAN_INTERVAL_SECONDS, min(MAX_IDLE_SCAN_INTERVAL_SECONDS, seconds))
+    return timedelta(seconds=seconds)
+
+
 class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
     """Coordinate polling of the Sharesight API for a single portfolio.
 
@@ -92,20 +167,6 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
     after every successful poll and is otherwise identical.
     """
 
-    # Per-endpoint timeout (seconds).
-    _ENDPOINT_TIMEOUT: int = 60
-
-    # Number of retries for token validation before giving up.
-    _TOKEN_RETRIES: int = 2
-    _TOKEN_RETRY_DELAY: float = 3.0
-
-    # Proactively refresh the access token when it has this many seconds or
-    # fewer remaining before expiry.  Sharesight's OAuth token lifetime is
-    # ~30 minutes; refreshing early avoids racing a poll against expiry,
-    # which is what caused entities to flap "unavailable" for ~10s every
-    # ~31 minutes.
-    _TOKEN_REFRESH_MARGIN: float = 300.0
-
     # Cap on activity events emitted per type per poll, so the first poll
     # after a long outage (which sees a large backlog of "new" records) can
     # never produce an unbounded event payload.
@@ -121,10 +182,20 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
         hass: HomeAssistant,
         entry: ConfigEntry,
         portfolio_id: Any,
-        client: Any,
+        client: SharesightTransport,
         oauth_session: Any,
+        request_budget: SharesightRequestBudget | None = None,
+        response_cache: SharesightResponseCache | None = None,
+        refresh_queue: SharesightRefreshQueue | None = None,
     ) -> None:
-        """Initialise the coordinator."""
+        """Initialise the coordinator.
+
+        ``request_budget``, ``response_cache`` and ``refresh_queue`` are the
+        process-wide budget, account-level response cache and on-demand
+        refresh queue of the OAuth app this entry authenticates through (see
+        ratelimit.py, cache.py and stagger.py); private ones are made when
+        none are given, which only a lone portfolio can safely use.
+        """
         super().__init__(
             hass,
             _LOGGER,
@@ -133,8 +204,9 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
             update_interval=_get_scan_interval(entry),
         )
         self.entry = entry
-        self.sharesight = client
-        self.oauth_session = oauth_session
+        self.transport = client
+        # Every request path takes its token from here (see auth.py).
+        self.tokens = SharesightTokenManager(hass, entry, oauth_session)
         self.data: dict[str, Any] = {}
         self.portfolio_id = portfolio_id
         self.startup_endpoint = ["v3", f"portfolios/{self.portfolio_id}", None, False]
@@ -147,32 +219,109 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
         # attribute, exactly as before.
         self.entity_icons: dict[str, dict[str, str]] = {}
 
-        # Cooldowns (monotonic timestamps) for optional endpoints.  Each entry
-        # maps endpoint path -> { "next_retry": float, "backoff": timedelta }.
-        self._optional_endpoint_cooldowns: dict[str, dict[str, Any]] = {}
+        # Circuit breakers of the optional endpoints, persisted (breaker.py).
+        self.breakers = SharesightBreakers(hass, entry.entry_id)
+        # Cooldowns (monotonic timestamps) for cash accounts' transactions.
+        # Each maps account id -> { "next_retry": float, "backoff": timedelta }.
         self._cash_tx_account_cooldowns: dict[int, dict[str, Any]] = {}
 
         # Global "don't hit the API" deadline, used when Sharesight returns a
         # 10-minute brute-force lockout or a 403 parallel-request error.
         self._lockout_until: float = 0.0
 
-        # Sharesight limits intensive report endpoints to 3 concurrent requests.
-        self._heavy_request_semaphore = asyncio.Semaphore(SHARESIGHT_HEAVY_CONCURRENCY)
-        # General cap to avoid request bursts across many portfolios.
-        self._request_semaphore = asyncio.Semaphore(8)
+        # Sharesight's per-minute budget, its 3-concurrent heavy-report cap
+        # and our general in-flight cap are all per consumer app, so they live
+        # on a budget shared by every portfolio using the same OAuth app.
+        self._request_budget = request_budget or SharesightRequestBudget()
+        self._request_budget.consumers.add(entry.entry_id)
+        self._refresh_queue = refresh_queue or SharesightRefreshQueue()
+        # Per-endpoint latency / size / failure metrics and the last poll's
+        # totals (see metrics.py).
+        self.metrics = SharesightMetrics()
+        # Phase traces of the last few polls (see tracing.py).
+        self.tracer = SharesightTracer()
+
+        # Rate governor state.  The configured interval is kept so a throttled
+        # poll can stretch update_interval and later put it back; the shed list
+        # is the optional endpoints the latest poll skipped under pressure.
+        self._base_update_interval: timedelta = _get_scan_interval(entry)
+        self.governor_level: str = GOVERNOR_NORMAL
+
+        # Adaptive polling.  _cadence_interval is what the market hours call
+        # for (the configured interval when adaptive polling is off); the
+        # governor's throttle stretches it further.
+        self._adaptive_polling: bool = bool(
+            entry.options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)
+        )
+        self._idle_update_interval: timedelta = _get_idle_scan_interval(entry)
+        self._cadence_interval: timedelta = self._base_update_interval
+        # Whether the cadence is aimed just past a market open or close, so
+        # staggering must not bring the poll forward.
+        self._cadence_anchored: bool = False
+        self.shed_endpoints: list[str] = []
+        # Data-sufficiency elision (ELIDABLE_ENDPOINTS): consecutive polls on
+        # which each endpoint's data came from its cheaper source, and how
+        # many requests skipping it has saved.
+        self._coverage_streaks: dict[str, int] = {}
+        self.elided_requests: dict[str, int] = {}
+
+        # Account-level endpoints are shared through the app's response cache,
+        # keyed by the Sharesight user the token belongs to.  That id is only
+        # known once my_user.json has answered, so the first poll fetches
+        # everything itself.
+        self._response_cache = response_cache or SharesightResponseCache()
+        # On-demand service responses (sharechecker, official costs, reports).
+        self.service_cache = SharesightResponseCache(SERVICE_CACHE_MAX_ENTRIES)
+        self._account_id: Any = None
+
+        # Persisted transaction history (see ledger.py): polls fetch only a
+        # trailing window and the full history is published from here.
+        self.ledgers = SharesightLedgers(hass, entry.entry_id)
+
+        # Official per-holding costs, topped up in the background after each
+        # poll (see official_costs.py).
+        self.official_costs = SharesightOfficialCosts(hass, entry.entry_id)
+        self._prefetch_task: asyncio.Task[None] | None = None
+
+        # Warm start (see snapshot.py).  data_from_snapshot stays True from a
+        # restore until the first live poll lands.
+        self._snapshot = SharesightSnapshot(hass, entry.entry_id)
+        self.data_from_snapshot: bool = False
+
+        # X-HoldingLimit-* from the latest plan-capped report, or None when
+        # the last performance report came back uncapped.
+        self.holding_limit: dict[str, Any] | None = None
 
         # Financial year caching - seeded on first successful startup fetch.
         self.start_financial_year: str = ""
         self.end_financial_year: str = ""
         self._portfolio_detail: dict[str, Any] = {}
-
-        # Tiered polling (Feature 4).  Incremented once per successful poll;
-        # the slow performance windows only re-fetch every
-        # SLOW_PERIOD_REFRESH_EVERY polls.  _slow_window_fy_bounds records the
-        # financial-year bounds used the last time they were fetched so a FY
-        # rollover forces an immediate refresh.
-        self._poll_count: int = 0
-        self._slow_window_fy_bounds: tuple[str, str] | None = None
+        # Set by a warm start, which skips the first refresh and with it
+        # _async_setup; the polls then run it until it succeeds.
+        self._setup_pending: bool = False
+
+        # Per-endpoint refresh periods (see scheduler.py).  _scheduled_fy_bounds
+        # records the financial-year bounds the FY-scoped reports were last
+        # requested with, so a rollover makes them due at once.  Market time
+        # zones are resolved once per name and reused.
+        self._scheduler = EndpointScheduler(
+            ENDPOINT_REFRESH_PERIODS, ENDPOINT_CLOSED_MARKET_PERIODS
+        )
+        self._scheduled_fy_bounds: tuple[str, str] | None = None
+        self._market_time_zones: dict[str, tzinfo | None] = {}
+        self.markets_open: bool | None = None
+
+        # Local diversity engine: the analytics.DIVERSITY_AXES grouping that
+        # reproduced the last diversity report, None until one has matched.
+        self._diversity_axis: str | None = None
+
+        # Local period performance: per-window anchors on the last report and
+        # whether the roll-forward from them has been confirmed.
+        self.local_performance = LocalPerformance()
+        # Daily value points of the last inception-to-today history fetch
+        # (statistics backfill), so on-demand reports can reach past the
+        # poll's VALUE_TREND_LOOKBACK_DAYS series.
+        self._value_history_points: list[tuple[str, float]] = []
 
         # Activity diff (Feature 2).  "Seen" keys per record type so only
         # genuinely new records fire events; seeded silently on the first
@@ -200,93 +349,6 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
         self._seen_news_ids: set[Any] = set()
         self._news_seeded: bool = False
 
-    # ------------------------------------------------------------------
-    # OAuth token handling
-    # ------------------------------------------------------------------
-
-    async def _refresh_token_with_retries(self) -> str:
-        """Ensure a valid access token, retrying transient refresh failures.
-
-        Home Assistant's ``OAuth2Session`` surfaces any failure from the OAuth
-        token endpoint as ``ConfigEntryAuthFailed``, even when the underlying
-        cause is a transient 5xx/400 from Sharesight's token service.  We
-        therefore retry a handful of times with backoff and only propagate
-        ``ConfigEntryAuthFailed`` once we're confident the credentials really
-        have been revoked.
-
-        Returns the access token string on success.
-        """
-        last_error: Exception | None = None
-        for attempt in range(self._TOKEN_RETRIES + 1):
-            try:
-                token = self.oauth_session.token or {}
-                expires_at = token.get("expires_at")
-                needs_refresh = True
-                if expires_at is not None:
-                    try:
-                        needs_refresh = (
-                            float(expires_at) - time.time()
-                        ) <= self._TOKEN_REFRESH_MARGIN
-                    except (TypeError, ValueError):
-                        needs_refresh = True
-
-                if needs_refresh:
-                    _LOGGER.debug(
-                        "Proactively refreshing Sharesight token (attempt %s/%s)",
-                        attempt + 1,
-                        self._TOKEN_RETRIES + 1,
-                    )
-                await self.oauth_session.async_ensure_token_valid()
-                return self.oauth_session.token["access_token"]
-            except ConfigEntryAuthFailed as auth_err:
-                last_error = auth_err
-                if attempt < self._TOKEN_RETRIES:
-                    _LOGGER.debug(
-                        "Token refresh attempt %s failed (%s), retrying in %ss",
-                        attempt + 1,
-                        auth_err,
-                        self._TOKEN_RETRY_DELAY,
-                    )
-                    await asyncio.sleep(self._TOKEN_RETRY_DELAY)
-                    continue
-                raise
-            except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as transient_err:
-                last_error = transient_err
-                if attempt < self._TOKEN_RETRIES:
-                    _LOGGER.debug(
-                        "Token refresh transient error on attempt %s (%s: %s), retrying in %ss",
-                        attempt + 1,
-                        type(transient_err).__name__,
-                        transient_err,
-                        self._TOKEN_RETRY_DELAY,
-                    )
-                    await asyncio.sleep(self._TOKEN_RETRY_DELAY)
-                    continue
-                raise
-            except HomeAssistantError as ha_err:
-                last_error = ha_err
-                err_msg = str(ha_err).lower()
-                is_permanent_auth = any(
-                    kw in err_msg
-                    for kw in ("invalid_grant", "invalid_client", "access_denied")
-                )
-                if is_permanent_auth:
-                    raise ConfigEntryAuthFailed(
-                        f"Sharesight authentication failed: {ha_err}"
-                    ) from ha_err
-                if attempt < self._TOKEN_RETRIES:
-                    _LOGGER.debug(
-                        "Token refresh HA error on attempt %s (%s), retrying in %ss",
-                        attempt + 1,
-                        ha_err,
-                        self._TOKEN_RETRY_DELAY,
-                    )
-                    await asyncio.sleep(self._TOKEN_RETRY_DELAY)
-                    continue
-                raise
-
-        raise UpdateFailed(f"Exhausted token refresh retries: {last_error}")
-
     # ------------------------------------------------------------------
     # Low-level request plumbing
     # ------------------------------------------------------------------
@@ -297,6 +359,14 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
         heavy_markers = ("/performance", "/diversity", "/valuation")
         return any(marker in path for marker in heavy_markers)
 
+    @staticmethod
+    def _is_metered_endpoint(path: str) -> bool:
+        """Whether this endpoint counts against the 360/minute budget.
+
+        Single sign-on is documented as exempt, so it never waits on a token.
+        """
+        return not path.startswith("single_sign_on")
+
     @staticmethod
     def _response_status(response: Any) -> int | None:
         """Best-effort extraction of an HTTP status code from a response dict."""
@@ -326,47 +396,335 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
         reason = str(response.get("reason") or response.get("error") or "").lower()
         return status == 401 and "locked out" in reason
 
-    def _register_lockout(self, duration: timedelta) -> None:
-        """Suppress further API calls until ``duration`` from now."""
+    def _register_lockout(self, duration: timedelta, *, app_wide: bool = False) -> None:
+        """Suppress further API calls until ``duration`` from now.
+
+        ``app_wide`` also holds back every other portfolio on the same OAuth
+        app — right for a rate-limit 403, which Sharesight counts against the
+        app, but not for a brute-force lockout, which is about this entry's
+        token.
+        """
         self._lockout_until = max(self._lockout_until, time.monotonic() + duration.total_seconds())
+        if app_wide:
+            self._request_budget.register_cooldown(duration)
         _LOGGER.warning(
             "Sharesight API cooldown active — suppressing requests for %s",
             duration,
         )
 
+    def _lockout_deadline(self) -> float:
+        """Monotonic end of the cooldown covering this portfolio, if any."""
+        return max(self._lockout_until, self._request_budget.cooldown_until)
+
     def _in_lockout(self) -> bool:
         """Whether we are currently inside a global cooldown window."""
-        return time.monotonic() < self._lockout_until
+        return time.monotonic() < self._lockout_deadline()
+
+    async def async_shutdown(self) -> None:
+        """Stop polling and stop counting this entry against the shared budget."""
+        await super().async_shutdown()
+        self._request_budget.consumers.discard(self.entry.entry_id)
+        self._refresh_queue.async_discard(self.entry.entry_id)
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next poll on this entry's slot of the interval.
+
+        Replaces the base class's timer (one interval from now) with one at
+        the delay ``poll_delay`` picks among the entries on the same OAuth
+        app.  It is kept in ``_unsub_refresh`` like the base class's, so
+        shutdown and manual refreshes cancel it as usual.
+        """
+        if self.update_interval is None or self.entry.pref_disable_polling:
+            return
+        delay = poll_delay(
+            self.entry.entry_id,
+            self._request_budget.consumers,
+            self.update_interval.total_seconds(),
+            time.time(),
+            anchored=self._cadence_anchored,
+        )
+        self._async_unsub_refresh()
+        self._unsub_refresh = async_call_at(
+            self.hass, self._async_poll_slot_reached, self.hass.loop.time() + delay
+        )
+
+    @callback
+    def _async_poll_slot_reached(self, _now: datetime) -> None:
+        self.entry.async_create_background_task(
+            self.hass,
+            self._handle_refresh_interval(),
+            f"sharesight_poll_{self.entry.entry_id}",
+        )
+
+    @callback
+    def async_request_manual_refresh(self) -> None:
+        """Queue an on-demand poll behind the app's other portfolios' (see
+        stagger.py) rather than starting it alongside them."""
+        self._refresh_queue.async_request(
+            self.hass, self.entry.entry_id, self.async_request_refresh
+        )
+
+    def _observe_response_headers(
+        self, path: str, headers: Mapping[str, str]
+    ) -> None:
+        """Feed the budget and holding-limit headers of one response."""
+        minute_rate = parse_minute_rate(headers)
+        if minute_rate is not None:
+            self._request_budget.observe_minute_rate(*minute_rate)
+        holding_limit = parse_holding_limit(headers)
+        # The headers are only sent while capped, so an uncapped performance
+        # report is what clears a previous reading (e.g. after a plan upgrade).
+        if holding_limit is not None or "/performance" in path:
+            self.holding_limit = holding_limit
+
+    def _apply_rate_governor(self) -> str:
+        """Read the shared budget's governor level and set the poll interval.
+
+        Under throttle the interval stretches by RATE_GOVERNOR_THROTTLE_FACTOR
+        (capped at the maximum scan interval); otherwise the market cadence's
+        one is restored.
+        """
+        level = self._request_budget.governor_level()
+        if level != self.governor_level:
+            _LOGGER.info(
+                "Sharesight rate governor %s -> %s (%s requests left this minute)",
+                self.governor_level,
+                level,
+                self._request_budget.server_remaining,
+            )
+        self.governor_level = level
+        self._set_update_interval()
+        return level
+
+    def _set_update_interval(self) -> None:
+        """Apply the market cadence, stretched while the governor throttles."""
+        interval = self._cadence_interval
+        if self.governor_level == GOVERNOR_THROTTLE:
+            interval = min(
+                interval * RATE_GOVERNOR_THROTTLE_FACTOR,
+                max(interval, timedelta(seconds=MAX_SCAN_INTERVAL_SECONDS)),
+            )
+        if self.update_interval != interval:
+            self.update_interval = interval
+
+    async def _async_apply_market_cadence(self) -> None:
+        """Adaptive polling: set the next interval from held markets' hours.
+
+        The configured interval while any held market trades, the idle one once
+        all are shut, and never past the next open or close (plus
+        MARKET_CHANGE_DELAY), so every session gets a poll just after it ends.
+        Without usable market hours the configured interval stands.
+        """
+        if not self._adaptive_polling:
+            return
+        now = dt_util.now()
+        self.markets_open = await self._async_held_markets_open(now)
+        cadence = self._base_update_interval
+        if self.markets_open is False:
+            cadence = self._idle_update_interval
+        anchored = False
+        change = analytics.next_market_change(self.data, now, self._market_time_zones)
+        if change is not None:
+            until_change = max(
+                change + MARKET_CHANGE_DELAY - now,
+                timedelta(seconds=MIN_SCAN_INTERVAL_SECONDS),
+            )
+            if until_change < cadence:
+                cadence = until_change
+                anchored = True
+        self._cadence_anchored = anchored
+        if cadence != self._cadence_interval:
+            _LOGGER.debug(
+                "Adaptive polling: next Sharesight poll in %s (markets open: %s)",
+                cadence,
+                self.markets_open,
+            )
+        self._cadence_interval = cadence
+        self._set_update_interval()
 
     async def _call_endpoint(self, endpoint: list[Any], access_token: str) -> Any:
-        """Call one API endpoint with concurrency controls and a timeout."""
-        version, path, params, _ = endpoint
+        """Call one API endpoint with concurrency controls and a timeout.
+
+        The timeout is the endpoint's own, derived from its recent latency
+        (``SharesightMetrics.timeout``), and covers every attempt and the
+        backoff between them.  429 / 5xx answers and connection errors are
+        retried up to ``TRANSPORT_MAX_RETRIES`` times, each attempt taking
+        its own budget slot and token, so no slot is held while backing off;
+        a delay that wouldn't fit in what's left of the timeout ends the
+        retries instead.
+        """
+        version, path, params, extension = endpoint
+        key = metrics_key(path, extension)
+        heavy = self._is_heavy_endpoint(path)
+        metered = self._is_metered_endpoint(path)
+        timeout = self.metrics.timeout(key, heavy)
+        remaining = timeout
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                result = await self._async_attempt(
+                    key,
+                    [version, path, params],
+                    access_token,
+                    heavy,
+                    metered,
+                    remaining,
+                )
+            except asyncio.TimeoutError:
+                _LOGGER.warning("Endpoint %s timed out after %.0fs", path, timeout)
+                raise
+            except (aiohttp.ClientError, OSError) as err:
+                remaining -= time.monotonic() - started
+                delay = retry_delay(None, {}, attempt)
+                if attempt >= TRANSPORT_MAX_RETRIES or delay >= remaining:
+                    _LOGGER.warning(
+                        "Endpoint %s connection error: %s: %s",
+                        path,
+                        type(err).__name__,
+                        err,
+                    )
+                    raise
+                _LOGGER.debug(
+                    "%s: %s: %s; retrying in %ss", path, type(err).__name__, err, delay
+                )
+            else:
+                self._observe_response_headers(path, result.headers)
+                if result.status not in RETRYABLE_STATUSES:
+                    return result.data
+                remaining -= time.monotonic() - started
+                delay = retry_delay(result.status, result.headers, attempt)
+                if attempt >= TRANSPORT_MAX_RETRIES or delay >= remaining:
+                    return result.data
+                _LOGGER.debug(
+                    "%s: HTTP %s; retrying in %ss", path, result.status, delay
+                )
+            remaining -= delay
+            attempt += 1
+            await asyncio.sleep(delay)
 
+    async def _async_attempt(
+        self,
+        key: str,
+        request: list[Any],
+        access_token: str,
+        heavy: bool,
+        metered: bool,
+        timeout: float,
+    ) -> SharesightResponse:
+        """One request in its own budget slot, light metered ones hedged.
+
+        The slot wait, latency, size and outcome go to ``self.metrics``.
+        """
+        queued = time.monotonic()
+        wait = 0.0
         try:
-            async with self._request_semaphore:
-                if self._is_heavy_endpoint(path):
-                    async with self._heavy_request_semaphore:
-                        async with asyncio.timeout(self._ENDPOINT_TIMEOUT):
-                            return await self.sharesight.get_api_request(
-                                [version, path, params, False], access_token
-                            )
-                async with asyncio.timeout(self._ENDPOINT_TIMEOUT):
-                    return await self.sharesight.get_api_request(
-                        [version, path, params, False], access_token
-                    )
+            async with self._request_budget.async_slot(heavy, metered):
+                wait = time.monotonic() - queued
+                async with asyncio.timeout(timeout):
+                    if heavy or not metered:
+                        result = await self.transport.async_get(request, access_token)
+                    else:
+                        result = await self._async_get_hedged(
+                            key, request, access_token
+                        )
         except asyncio.TimeoutError:
-            _LOGGER.warning(
-                "Endpoint %s timed out after %ss", path, self._ENDPOINT_TIMEOUT
-            )
+            self.tracer.record_request(key, queued + wait, time.monotonic(), None)
+            self.metrics.record_failure(key, wait=wait, timeout=True)
             raise
-        except (aiohttp.ClientError, OSError) as err:
-            _LOGGER.warning(
-                "Endpoint %s connection error: %s: %s",
-                path,
-                type(err).__name__,
-                err,
-            )
+        except (aiohttp.ClientError, OSError):
+            self.tracer.record_request(key, queued + wait, time.monotonic(), None)
+            self.metrics.record_failure(key, wait=wait, timeout=False)
             raise
+        self.tracer.record_request(key, queued + wait, time.monotonic(), result.status)
+        self.metrics.record(
+            key,
+            wait=wait,
+            latency=result.elapsed,
+            size=result.size,
+            status=result.status,
+        )
+        return result
+
+    async def _async_get_hedged(
+        self, key: str, request: list[Any], access_token: str
+    ) -> SharesightResponse:
+        """GET a light endpoint, hedging it once it outlasts its p95.
+
+        When the request is still unanswered at the endpoint's hedge delay and
+        the app's budget has a free slot and tokens to spare, an identical
+        second request goes out and whichever answers first is used; the
+        other is cancelled.  Heavy reports never come here: a duplicate would
+        take one of the three heavy slots.
+        """
+        delay = self.metrics.hedge_delay(key)
+        if delay is None:
+            return await self.transport.async_get(request, access_token)
+        started = time.monotonic()
+        first = asyncio.create_task(self.transport.async_get(request, access_token))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            budget = self._request_budget
+            if (
+                done
+                or budget.request_semaphore.locked()
+                or not self._has_spare_budget(HEDGE_MIN_TOKENS)
+            ):
+                return await first
+            async with budget.async_slot(False, True):
+                hedge = asyncio.create_task(
+                    self.transport.async_get(request, access_token)
+                )
+                tasks.add(hedge)
+                pending: set[asyncio.Task[SharesightResponse]] = set(tasks)
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    # Checking each task's exception also marks it retrieved.
+                    answered = [task for task in done if task.exception() is None]
+                    if answered:
+                        winner = first if first in answered else hedge
+                        self.metrics.record_hedge(key, winner is hedge)
+                        result = winner.result()
+                        # The caller waited from the first request on.
+                        result.elapsed = time.monotonic() - started
+                        return result
+                # Both failed: raise the first request's error.
+                self.metrics.record_hedge(key, False)
+                return first.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_endpoint(self, endpoint: list[Any], access_token: str) -> Any:
+        """Call one poll endpoint, sharing account-level ones across portfolios.
+
+        Endpoints in ACCOUNT_LEVEL_PATHS answer the same for every portfolio
+        on a login, so once the login is known they go through the app's
+        response cache: one request per cycle however many portfolios ask.
+        """
+        version, path, params, _ = endpoint
+        if self._account_id is None or path not in ACCOUNT_LEVEL_PATHS:
+            return await self._call_endpoint(endpoint, access_token)
+        key = (self._account_id, version, path, tuple(sorted((params or {}).items())))
+        ttl = min(
+            ACCOUNT_CACHE_TTL.total_seconds(),
+            self._base_update_interval.total_seconds() * ACCOUNT_CACHE_INTERVAL_SHARE,
+        )
+        return await self._response_cache.async_get(
+            key, lambda: self._call_endpoint(endpoint, access_token), ttl
+        )
+
+    def _note_account(self, my_user: dict[str, Any]) -> None:
+        """Record which Sharesight user this entry's token belongs to."""
+        user = my_user.get("user")
+        user_id = (user if isinstance(user, dict) else my_user).get("id")
+        if user_id is not None and user_id != self._account_id:
+            _LOGGER.debug("Sharing account-level endpoints for Sharesight user %s", user_id)
+            self._account_id = user_id
 
     async def async_get_value_history(self) -> Any:
         """Fetch the inception-to-today portfolio value series.
@@ -376,7 +734,7 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
         response (or an ``{"error": ...}`` dict on failure) — the caller must
         tolerate a gated/absent endpoint.
         """
-        token = await self._refresh_token_with_retries()
+        token = await self.tokens.async_get_token()
         params: dict[str, Any] | None = None
         inception = self._portfolio_detail.get("inception_date")
         if inception:
@@ -387,7 +745,10 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
             params,
             False,
         ]
-        return await self._call_endpoint(endpoint, token)
+        response = await self._call_endpoint(endpoint, token)
+        if not (isinstance(response, dict) and "error" in response):
+            self._value_history_points = analytics.value_series_points(response)
+        return response
 
     async def async_generate_performance_report(
         self,
@@ -399,13 +760,22 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
     ) -> Any:
         """Generate an on-demand performance report for an arbitrary window.
 
-        Modelled on ``async_get_value_history``: refresh the token then call
-        the V3 performance endpoint directly, bypassing the poll cadence.
-        Returns the raw API response (including an ``{"error": ...}`` dict on
-        an API-level failure) — the caller must tolerate a gated/absent
-        endpoint and never assume success.
+        A window with no grouping, consolidation or sales override that the
+        value series and ledgers cover is answered locally
+        (``performance.window_performance``) with no request at all.  Anything
+        else goes to the V3 performance endpoint through the service cache
+        (``_async_service_call``), bypassing the poll cadence.  Either way
+        the response carries ``source`` ("local" / "api"); an API-level
+        failure is the raw ``{"error": ...}`` dict — the caller must tolerate a
+        gated/absent endpoint and never assume success.
         """
-        token = await self._refresh_token_with_retries()
+        # The local engine has no notion of excluding sales, so an explicit
+        # include_sales always goes to the API.
+        if not grouping and consolidated is None and include_sales is None:
+            report = self._local_performance_report(start_date, end_date)
+            if report is not None:
+                return {"report": report, "source": "local"}
+
         params: dict[str, Any] = {
             "start_date": start_date,
             "end_date": end_date,
@@ -422,20 +792,70 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
             params,
             False,
         ]
-        return await self._call_endpoint(endpoint, token)
+        response = await self._async_service_call(endpoint)
+        if isinstance(response, dict) and "error" not in response:
+            return {**response, "source": "api"}
+        return response
+
+    def _local_performance_report(
+        self, start_date: str, end_date: str
+    ) -> dict[str, Any] | None:
+        """The window computed from held data, or None when it isn't covered."""
+        data = self.data or {}
+        # The ledgers must have synced once, or a missing trade would read as
+        # a capital gain.
+        if None in (self.ledgers.trades.synced_on, self.ledgers.payouts.synced_on):
+            return None
+        # Trade values and payout amounts are summed as they stand, which only
+        # holds when they're all in the portfolio's currency.
+        if len(analytics.portfolio_currency_codes(data)) >= 2:
+            return None
+        points = dict(self._value_history_points)
+        points.update(analytics.value_series_points(data.get("value_series")))
+        try:
+            live_value = float(data.get("report", {}).get("value"))
+        except (TypeError, ValueError):
+            live_value = None
+        return window_performance(
+            sorted(points.items()),
+            start_date,
+            end_date,
+            f"{dt_util.now().date()}",
+            live_value,
+            self.ledgers.trades.as_list(),
+            self.ledgers.payouts.as_list(),
+        )
 
     async def async_get_sharechecker(self, instrument_id: Any) -> Any:
         """One-shot V3 sharechecker fetch for an instrument (W3 fundamentals).
 
-        Modelled on ``async_get_value_history``: refresh the token then call
-        the V3 sharechecker endpoint directly, bypassing the poll cadence.
-        Returns the raw API response (including an ``{"error": ...}`` dict on an
-        API-level failure) — the caller must tolerate a gated/absent endpoint
-        (this endpoint is mobile-scoped and may 403) and never assume success.
+        Goes through the service cache (``_async_service_call``), bypassing
+        the poll cadence.  Returns the raw API response (including an
+        ``{"error": ...}`` dict on an API-level failure) — the caller must
+        tolerate a gated/absent endpoint (this endpoint is mobile-scoped and
+        may 403) and never assume success.
         """
-        token = await self._refresh_token_with_retries()
         endpoint = ["v3", f"instruments/{instrument_id}/sharechecker", None, False]
-        return await self._call_endpoint(endpoint, token)
+        return await self._async_service_call(endpoint)
+
+    async def _async_service_call(self, endpoint: list[Any]) -> Any:
+        """One on-demand service request, answered from the service cache if fresh.
+
+        Keyed by endpoint and params; the TTL is the SERVICE_CACHE_TTLS entry
+        of the path's last segment.  The token is only refreshed on a miss.
+        Errors are never cached.
+        """
+        version, path, params, _ = endpoint
+        kind = path.rsplit("/", 1)[-1].removesuffix(".json")
+        key = (version, path, tuple(sorted((params or {}).items())))
+
+        async def _fetch() -> Any:
+            token = await self.tokens.async_get_token()
+            return await self._call_endpoint(endpoint, token)
+
+        return await self.service_cache.async_get(
+            key, _fetch, SERVICE_CACHE_TTLS[kind].total_seconds()
+        )
 
     async def async_get_official_costs(self, holding_id: Any) -> dict[str, Any]:
         """One-shot fetch of a holding's official cost figures (W3 fundamentals).
@@ -445,9 +865,9 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
         ``{"average_purchase_price": <resp>, "cost_base": <resp>}`` where each
         value is the raw API response (or an ``{"error": ...}`` dict on
         failure).  Never raises for an API-level error, so the caller can
-        surface whichever leg succeeded.
+        surface whichever leg succeeded.  Both legs go through the service
+        cache.
         """
-        token = await self._refresh_token_with_retries()
         app_endpoint = [
             "v3",
             f"holdings/{holding_id}/average_purchase_price.json",
@@ -461,8 +881,8 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
             False,
         ]
         app_result, cost_result = await asyncio.gather(
-            self._call_endpoint(app_endpoint, token),
-            self._call_endpoint(cost_endpoint, token),
+            self._async_service_call(app_endpoint),
+            self._async_service_call(cost_endpoint),
             return_exceptions=True,
         )
 
@@ -476,6 +896,104 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
             "cost_base": _normalise(cost_result),
         }
 
+    def official_cost_targets(self) -> dict[str, str]:
+        """Holding id -> ``holding_marker`` of every open position."""
+        data = self.data or {}
+        holdings_data = data.get("holdings")
+        if not isinstance(holdings_data, dict):
+            return {}
+        holding_trades = data.get("holding_trades") or {}
+        targets: dict[str, str] = {}
+        for holding in holdings_data.get("holdings") or []:
+            if not isinstance(holding, dict) or holding.get("id") is None:
+                continue
+            if not analytics.is_open_position(holding):
+                continue
+            trades = holding_trades.get(analytics.holding_symbol(holding)) or {}
+            targets[str(holding["id"])] = holding_marker(
+                holding, trades.get("last_date")
+            )
+        return targets
+
+    def fresh_official_costs(self, holding_id: Any) -> dict[str, Any] | None:
+        """Prefetched official costs of a holding, if they still hold."""
+        marker = self.official_cost_targets().get(str(holding_id))
+        if marker is None or not self.official_costs.is_fresh(
+            holding_id, marker, dt_util.utcnow()
+        ):
+            return None
+        return self.official_costs.get(holding_id)
+
+    @callback
+    def _async_schedule_official_costs_prefetch(self) -> None:
+        """Start a background prefetch pass unless one is still running."""
+        if self._prefetch_task is not None and not self._prefetch_task.done():
+            return
+        self._prefetch_task = self.entry.async_create_background_task(
+            self.hass,
+            self._async_prefetch_official_costs(),
+            "sharesight_official_costs_prefetch",
+        )
+
+    def _has_spare_budget(self, min_tokens: int) -> bool:
+        """Whether a low-priority request may go out without crowding polls.
+
+        ``min_tokens`` is what the caller needs left in the app's bucket.
+        """
+        budget = self._request_budget
+        return (
+            self._lockout_deadline() <= time.monotonic()
+            and budget.governor_level() == GOVERNOR_NORMAL
+            and budget.tokens_available >= min_tokens
+        )
+
+    async def _async_prefetch_official_costs(self) -> None:
+        """Refresh the stalest official costs while the budget has room.
+
+        One holding at a time, re-checking the budget before each, and at
+        most OFFICIAL_COSTS_PREFETCH_PER_CYCLE per pass: the next poll always
+        comes first.  Failures leave the stored figures as they were.
+        """
+        if not self.official_costs.loaded:
+            await self.official_costs.async_load()
+        targets = self.official_cost_targets()
+        if not targets:
+            return
+        changed = self.official_costs.prune(set(targets))
+        now = dt_util.utcnow()
+        stale = [
+            holding_id
+            for holding_id, marker in targets.items()
+            if not self.official_costs.is_fresh(holding_id, marker, now)
+        ]
+        refreshed = 0
+        for holding_id in stale[:OFFICIAL_COSTS_PREFETCH_PER_CYCLE]:
+            if not self._has_spare_budget(OFFICIAL_COSTS_PREFETCH_MIN_TOKENS):
+                break
+            try:
+                response = await self.async_get_official_costs(holding_id)
+            except (
+                aiohttp.ClientError,
+                OSError,
+                asyncio.TimeoutError,
+                HomeAssistantError,
+            ) as err:
+                _LOGGER.debug("Official cost prefetch stopped: %s", err)
+                break
+            if self.official_costs.store(
+                holding_id, targets[holding_id], response, dt_util.utcnow()
+            ):
+                refreshed += 1
+        if refreshed:
+            _LOGGER.debug(
+                "Prefetched official costs for %s of %s stale holdings",
+                refreshed,
+                len(stale),
+            )
+            self.async_update_listeners()
+        if refreshed or changed:
+            self.official_costs.async_schedule_save()
+
     async def async_get_sso_link(self) -> Any:
         """One-shot Single Sign-On login-link fetch (W4).
 
@@ -485,34 +1003,196 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
         not either.  Returns the raw API response (an ``{"error": ...}`` dict on
         failure); this endpoint is documented rate-limit exempt.
         """
-        token = await self._refresh_token_with_retries()
+        token = await self.tokens.async_get_token()
         endpoint = ["v2", "single_sign_on.json", None, False]
         return await self._call_endpoint(endpoint, token)
 
     # ------------------------------------------------------------------
-    # Optional endpoint cooldown bookkeeping
+    # Optional endpoint circuit breakers
     # ------------------------------------------------------------------
 
-    def _endpoint_on_cooldown(self, path: str) -> bool:
-        info = self._optional_endpoint_cooldowns.get(path)
-        if not info:
+    def endpoint_metrics(self) -> dict[str, Any]:
+        """Request metrics per endpoint, with the cooldown left on parked ones."""
+        cooldowns: dict[str, int] = {}
+        for key, remaining in self.breakers.open_remaining().items():
+            path, _, extension = key.partition("#")
+            cooldowns[
+                metrics_key(path, None if extension == "False" else extension)
+            ] = remaining
+        return self.metrics.as_dict(cooldowns)
+
+    def _note_optional_failure(self, key: str, kind: str) -> None:
+        """Count a failure against the endpoint's breaker, saving any change."""
+        if self.breakers.record_failure(key, kind):
+            breaker = self.breakers.breakers[key]
+            _LOGGER.info(
+                "Optional endpoint %s parked (%s) until %s",
+                key.partition("#")[0],
+                kind,
+                breaker["retry_at"],
+            )
+        self.breakers.async_schedule_save()
+
+    def _note_optional_success(self, key: str) -> None:
+        if self.breakers.record_success(key):
+            self.breakers.async_schedule_save()
+
+    def _reconcile_diversity(
+        self,
+        api_breakdown: list[dict[str, Any]],
+        local_diversity: dict[str, dict[str, Any]],
+    ) -> None:
+        """Match a fresh diversity report to the local grouping that reproduces it."""
+        axis = analytics.match_diversity_axis(api_breakdown, local_diversity)
+        if axis != self._diversity_axis:
+            _LOGGER.debug(
+                "Diversity report grouping matched locally as %s", axis or "nothing"
+            )
+        self._diversity_axis = axis
+
+    def _endpoint_due(self, endpoint: list[Any], now: datetime) -> bool:
+        """Whether an endpoint goes out this poll under its refresh period."""
+        key = schedule_key(endpoint)
+        if key in LOCAL_PERFORMANCE_WINDOWS and not self.local_performance.is_anchored(
+            key, (endpoint[2] or {}).get("start_date")
+        ):
+            # A new start date (rollover) needs a report to roll forward from.
+            return True
+        if not self._scheduler.is_scheduled(key):
+            return True
+        return self._scheduler.is_due(key, now, have_data=key in self.data)
+
+    def _endpoint_elided(self, endpoint: list[Any]) -> bool:
+        """Whether a cheaper source has covered this endpoint's data lately."""
+        key = schedule_key(endpoint)
+        if self._coverage_streaks.get(key, 0) < ELISION_POLLS:
             return False
-        return time.monotonic() < info["next_retry"]
+        self.elided_requests[key] = self.elided_requests.get(key, 0) + 1
+        return True
+
+    def _note_coverage(self, combined_dict: dict[str, Any]) -> None:
+        """Count the polls on which each elidable endpoint's source delivered."""
+        for key, path in ELIDABLE_ENDPOINTS.items():
+            source: Any = combined_dict
+            for part in path:
+                source = source.get(part) if isinstance(source, dict) else None
+            if source:
+                self._coverage_streaks[key] = self._coverage_streaks.get(key, 0) + 1
+            else:
+                if self._coverage_streaks.get(key, 0) >= ELISION_POLLS:
+                    _LOGGER.debug("%s no longer covered; fetching it again", key)
+                self._coverage_streaks[key] = 0
+
+    async def _async_held_markets_open(self, now: datetime) -> bool | None:
+        """Whether any held market trades now, per the last poll's data."""
+        for market in analytics.held_markets(self.data or {}):
+            tz_name = market.get("tz_name")
+            if tz_name and tz_name not in self._market_time_zones:
+                self._market_time_zones[tz_name] = await dt_util.async_get_time_zone(
+                    tz_name
+                )
+        return analytics.held_markets_open(
+            self.data or {}, now, self._market_time_zones
+        )
 
-    def _note_optional_failure(self, path: str) -> None:
-        """Schedule exponential backoff before retrying this optional endpoint."""
-        info = self._optional_endpoint_cooldowns.get(path)
-        if info is None:
-            backoff = OPTIONAL_ENDPOINT_COOLDOWN
-        else:
-            backoff = min(info["backoff"] * 2, OPTIONAL_ENDPOINT_MAX_BACKOFF)
-        self._optional_endpoint_cooldowns[path] = {
-            "next_retry": time.monotonic() + backoff.total_seconds(),
-            "backoff": backoff,
-        }
+    def _own_cash_account_ids(self, cash_accounts_data: Any) -> list[Any]:
+        """Ids of this portfolio's accounts in a cash_accounts response."""
+        if not isinstance(cash_accounts_data, dict):
+            return []
+        return [
+            account["id"]
+            for account in cash_accounts_data.get("cash_accounts") or []
+            if isinstance(account, dict)
+            and account.get("id") is not None
+            and str(account.get("portfolio_id")) == str(self.portfolio_id)
+        ]
+
+    async def _async_sync_cash_transactions(
+        self,
+        accounts_task: asyncio.Task[Any] | None,
+        access_token: str,
+        now: datetime,
+    ) -> bool:
+        """Sync each cash account's ledger; returns whether any ledger changed.
+
+        Starts at once on the accounts the previous poll saw, then adds any
+        new ones when this poll's cash_accounts response (``accounts_task``)
+        lands; that fresh list also prunes the ledgers of closed accounts.
+        Each account has its own ledger (see ledger.py): only the from/to
+        window since its last sync is fetched, or the full history when its
+        daily resync is due.
+        """
+        tx_work: list[tuple[Any, str | None, asyncio.Task[Any]]] = []
+        started: set[str] = set()
+
+        def start(account_ids: list[Any]) -> None:
+            for account_id in account_ids:
+                if str(account_id) in started or self._cash_tx_on_cooldown(account_id):
+                    continue
+                started.add(str(account_id))
+                tx_window = self.ledgers.cash_account(account_id).window_start(
+                    now, CASH_TX_SYNC_OVERLAP, LEDGER_FULL_RESYNC_INTERVAL
+                )
+                endpoint = [
+                    "v2",
+                    f"cash_accounts/{account_id}/cash_account_transactions",
+                    {"from": tx_window, "to": f"{now.date()}"} if tx_window else None,
+                    False,
+                ]
+                tx_work.append(
+                    (
+                        account_id,
+                        tx_window,
+                        asyncio.create_task(self._call_endpoint(endpoint, access_token)),
+                    )
+                )
+
+        start(self._own_cash_account_ids((self.data or {}).get("cash_accounts_v2")))
+        live_account_ids: list[Any] | None = None
+        try:
+            if accounts_task is not None:
+                try:
+                    accounts_response = await accounts_task
+                except Exception:  # noqa: BLE001 - the optional stage reports it
+                    accounts_response = None
+                if isinstance(accounts_response, dict) and "error" not in accounts_response:
+                    live_account_ids = self._own_cash_account_ids(accounts_response)
+                    start(live_account_ids)
+
+            tx_results = await asyncio.gather(
+                *(task for _, _, task in tx_work), return_exceptions=True
+            )
+        finally:
+            _discard_tasks([task for _, _, task in tx_work])
+
+        ledgers_changed = False
+        for (account_id, tx_window, _), tx_response in zip(tx_work, tx_results):
+            if isinstance(tx_response, Exception):
+                _LOGGER.info(
+                    "Optional cash account transactions endpoint for account %s "
+                    "failed: %s",
+                    account_id,
+                    tx_response,
+                )
+                self._note_cash_tx_failure(account_id)
+                continue
+            if not isinstance(tx_response, dict) or "error" in tx_response:
+                self._note_cash_tx_failure(account_id)
+                continue
+            tx_list = tx_response.get("cash_account_transactions", [])
+            if isinstance(tx_list, list):
+                ledgers_changed |= self.ledgers.cash_account(account_id).reconcile(
+                    tx_list, tx_window, now
+                )
+            self._note_cash_tx_success(account_id)
 
-    def _note_optional_success(self, path: str) -> None:
-        self._optional_endpoint_cooldowns.pop(path, None)
+        # Without a fresh account list (it failed or sat out on cooldown) the
+        # ledgers are left as they are rather than pruned on stale data.
+        if live_account_ids is not None:
+            ledgers_changed |= self.ledgers.prune_cash_accounts(
+                {str(account_id) for account_id in live_account_ids}
+            )
+        return ledgers_changed
 
     def _cash_tx_on_cooldown(self, account_id: int) -> bool:
         info = self._cash_tx_account_cooldowns.get(account_id)
@@ -896,10 +1576,18 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
         ``started_up`` gate.  A transient failure raises ``UpdateFailed`` so the
         base surfaces a retriable ``ConfigEntryNotReady``; a 404 (portfolio
         deleted or access lost) raises ``ConfigEntryAuthFailed`` to trigger a
-        reauth/reconfigure.
+        reauth/reconfigure.  After a warm start the polls call it instead
+        (see ``_setup_pending``).
         """
+        if not self.ledgers.loaded:
+            await self.ledgers.async_load()
+        if not self.official_costs.loaded:
+            await self.official_costs.async_load()
+        if not self.breakers.loaded:
+            await self.breakers.async_load()
+
         try:
-            access_token = await self._refresh_token_with_retries()
+            access_token = await self.tokens.async_get_token()
         except ConfigEntryAuthFailed:
             raise
         except (
@@ -933,14 +1621,83 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
         )
         self._portfolio_detail = local_data.get("portfolio", {}) or {}
 
+    async def async_restore_snapshot(self, max_age: timedelta) -> bool:
+        """Serve the last good data saved by a previous run, if recent enough.
+
+        Restores the portfolio detail (and so the financial-year bounds) and
+        the data the entities read, re-attaching the ledger-backed histories,
+        and stamps ``last_update_success_time`` with the snapshot's own time
+        so the Last Successful Update sensor stays truthful.  Returns False —
+        and setup then blocks on a live first refresh as usual — when there is
+        no usable snapshot or it is older than ``max_age``.
+        """
+        await self.ledgers.async_load()
+        await self.official_costs.async_load()
+        await self.breakers.async_load()
+        if max_age <= timedelta(0):
+            return False
+        snapshot = await self._snapshot.async_load(self.portfolio_id)
+        if snapshot is None:
+            return False
+        saved_at, data = snapshot
+        age = dt_util.utcnow() - saved_at
+        if age > max_age:
+            _LOGGER.info(
+                "Saved Sharesight data is %s old (limit %s); waiting for a live refresh",
+                age,
+                max_age,
+            )
+            return False
+
+        detail = data.get("portfolio_detail")
+        self._portfolio_detail = detail if isinstance(detail, dict) else {}
+        self.start_financial_year, self.end_financial_year = get_financial_year_dates(
+            self._portfolio_detail.get("financial_year_end")
+        )
+        data["trades"] = {"trades": self.ledgers.trades.as_list()}
+        payouts = self.ledgers.payouts.as_list()
+        data["payouts"] = {"payouts": payouts}
+        if isinstance(data.get("income_report"), dict):
+            data["income_report"]["payouts"] = payouts
+        data["cash_account_transactions"] = {
+            "cash_account_transactions": self.ledgers.cash_transaction_list()
+        }
+        self.data = data
+        self.last_update_success_time = saved_at
+        self.data_from_snapshot = True
+        self._setup_pending = True
+        _LOGGER.debug("Warm-started Sharesight portfolio %s from data %s old", self.portfolio_id, age)
+        return True
+
     # ------------------------------------------------------------------
     # Main update loop
     # ------------------------------------------------------------------
 
     async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch the latest data from Sharesight."""
+        """Fetch the latest data from Sharesight, timing and tracing the poll."""
+        self.tracer.begin_poll()
+        try:
+            with self.metrics.poll():
+                return await self._async_poll()
+        except BaseException:
+            # No listener fan-out follows to close a failed poll's trace.
+            self.tracer.end_poll()
+            raise
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update every listener; after a poll, as its traced last phase."""
+        if not self.tracer.in_poll():
+            super().async_update_listeners()
+            return
+        self.tracer.phase("listeners")
+        super().async_update_listeners()
+        self.tracer.end_poll()
+
+    async def _async_poll(self) -> dict[str, Any]:
+        """One poll: every due endpoint, then the derived data."""
         if self._in_lockout():
-            remaining = int(self._lockout_until - time.monotonic())
+            remaining = int(self._lockout_deadline() - time.monotonic())
             _LOGGER.info(
                 "Skipping Sharesight poll — %ss remaining in cooldown", remaining
             )
@@ -950,10 +1707,26 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                 f"Sharesight API is on cooldown for {remaining}s"
             )
 
+        if self._setup_pending:
+            # Warm start: refresh the snapshot's portfolio detail (inception
+            # date, country, financial-year end) and catch a deleted
+            # portfolio's 404, which raises ConfigEntryAuthFailed from here.
+            self.tracer.phase("setup")
+            try:
+                await self._async_setup()
+            except UpdateFailed as err:
+                _LOGGER.debug(
+                    "Startup fetch failed (%s); keeping the saved portfolio detail",
+                    err,
+                )
+            else:
+                self._setup_pending = False
+
         combined_dict: dict[str, Any] = {}
 
+        self.tracer.phase("token")
         try:
-            access_token = await self._refresh_token_with_retries()
+            access_token = await self.tokens.async_get_token()
         except ConfigEntryAuthFailed:
             raise
         except (aiohttp.ClientError, OSError, asyncio.TimeoutError, HomeAssistantError) as token_error:
@@ -966,7 +1739,9 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                 f"Error validating Sharesight token: {token_error}"
             ) from token_error
 
-        today = dt_util.now().date()
+        self.tracer.phase("dispatch")
+        now = dt_util.now()
+        today = now.date()
         self.current_date = today
         self.start_of_week = (today - timedelta(days=today.weekday())).strftime("%Y-%m-%d")
         self.end_of_week = (today + timedelta(days=6 - today.weekday())).strftime("%Y-%m-%d")
@@ -1001,63 +1776,67 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
             ],
         ]
 
-        # Feature 4 — tiered polling.  The financial-year / one-month / YTD
-        # windows move slowly, so only re-fetch them every
-        # SLOW_PERIOD_REFRESH_EVERY polls (≈hourly at the 5-min default), on a
-        # cold start (their key is absent from self.data), or when the
-        # financial-year bounds roll over.  Skipped windows are carried
-        # forward from self.data below so their period sensors never flap.
-        slow_windows: list[list[Any]] = [
-            [
-                "v2",
-                f"portfolios/{self.portfolio_id}/performance",
-                {
-                    "start_date": self.start_financial_year,
-                    "end_date": self.end_financial_year,
-                },
-                "financial-year",
-            ],
-            [
-                "v2",
-                f"portfolios/{self.portfolio_id}/performance",
-                {"start_date": self.start_of_month, "end_date": f"{today}"},
-                "one-month",
-            ],
+        # The financial-year / one-month / YTD windows move slowly and refresh
+        # on their own period (ENDPOINT_REFRESH_PERIODS); the scheduler filter
+        # below drops them on the polls where they aren't due.
+        endpoint_list.extend(
             [
-                "v2",
-                f"portfolios/{self.portfolio_id}/performance",
-                {"start_date": self.start_of_year, "end_date": f"{today}"},
-                "ytd",
-            ],
-        ]
-        current_fy_bounds = (self.start_financial_year, self.end_financial_year)
-        refresh_slow_windows = (
-            self._poll_count % SLOW_PERIOD_REFRESH_EVERY == 0
-            or self._slow_window_fy_bounds != current_fy_bounds
-            or any(endpoint[3] not in self.data for endpoint in slow_windows)
+                [
+                    "v2",
+                    f"portfolios/{self.portfolio_id}/performance",
+                    {
+                        "start_date": self.start_financial_year,
+                        "end_date": self.end_financial_year,
+                    },
+                    "financial-year",
+                ],
+                [
+                    "v2",
+                    f"portfolios/{self.portfolio_id}/performance",
+                    {"start_date": self.start_of_month, "end_date": f"{today}"},
+                    "one-month",
+                ],
+                [
+                    "v2",
+                    f"portfolios/{self.portfolio_id}/performance",
+                    {"start_date": self.start_of_year, "end_date": f"{today}"},
+                    "ytd",
+                ],
+            ]
         )
-        if refresh_slow_windows:
-            endpoint_list.extend(slow_windows)
-            self._slow_window_fy_bounds = current_fy_bounds
 
+        trades_window = self.ledgers.trades.window_start(
+            now, TRADES_SYNC_OVERLAP, LEDGER_FULL_RESYNC_INTERVAL
+        )
+        payouts_window = self.ledgers.payouts.window_start(
+            now, PAYOUTS_SYNC_OVERLAP, LEDGER_FULL_RESYNC_INTERVAL
+        )
+        # One payouts request covers both the paid dividends (incremental like
+        # trades, see ledger.py) and the announced-but-unpaid ones of the year
+        # ahead that feed the next-dividend sensors and the dividend calendar.
+        # The API defaults end_date to today, so it is always set; start_date
+        # is the ledger window, or inception on a full resync.
+        payouts_params = {"end_date": f"{today + timedelta(days=365)}"}
+        payouts_start = payouts_window or self._portfolio_detail.get("inception_date")
+        if payouts_start:
+            payouts_params["start_date"] = payouts_start
         optional_endpoint_list: list[list[Any]] = [
             ["v3", f"portfolios/{self.portfolio_id}/holdings", None, "holdings"],
-            ["v2", f"portfolios/{self.portfolio_id}/payouts", None, "payouts"],
-            # Announced-but-not-yet-paid dividends.  The default payouts call
-            # only covers inception→today, so future payouts never show up in
-            # it; this second window feeds the next-dividend sensors and the
-            # dividend calendar.
             [
                 "v2",
                 f"portfolios/{self.portfolio_id}/payouts",
-                {
-                    "start_date": f"{today}",
-                    "end_date": f"{today + timedelta(days=365)}",
-                },
-                "upcoming_payouts",
+                payouts_params,
+                "payouts",
             ],
             ["v2", f"portfolios/{self.portfolio_id}/diversity", None, "diversity_v2"],
-            ["v2", f"portfolios/{self.portfolio_id}/trades", None, "trades"],
+            # Incremental: only the window since the last ledger sync, or
+            # the full history when a resync is due (see ledger.py).
+            [
+                "v2",
+                f"portfolios/{self.portfolio_id}/trades",
+                {"start_date": trades_window} if trades_window else None,
+                "trades",
+            ],
             ["v2", "cash_accounts", None, "cash_accounts_v2"],
             ["v3", f"portfolios/{self.portfolio_id}/user_setting", None, "user_setting"],
             ["v2", "user_instruments", None, "user_instruments"],
@@ -1117,23 +1896,22 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
         # parks via backoff for tokens that can't reach it.
         #
         # One point per day and a trend nobody needs at 5-minute resolution, so
-        # fetch it on the slow tier (like the FY/month/YTD windows) and carry
-        # the last series forward on the polls that skip it.  The window is
-        # bounded to keep the payload small while still spanning 30 days with
-        # weekend/holiday slack.
-        if refresh_slow_windows or "value_series" not in self.data:
-            optional_endpoint_list.append(
-                [
-                    "v3",
-                    f"portfolios/{self.portfolio_id}/portfolio_value_data.json",
-                    {
-                        "start_date": (
-                            f"{today - timedelta(days=VALUE_TREND_LOOKBACK_DAYS)}"
-                        )
-                    },
-                    "value_series",
-                ]
-            )
+        # it refreshes on its own period (like the FY/month/YTD windows) and
+        # the last series is carried forward on the polls that skip it.  The
+        # window is bounded to keep the payload small while still spanning 30
+        # days with weekend/holiday slack.
+        optional_endpoint_list.append(
+            [
+                "v3",
+                f"portfolios/{self.portfolio_id}/portfolio_value_data.json",
+                {
+                    "start_date": (
+                        f"{today - timedelta(days=VALUE_TREND_LOOKBACK_DAYS)}"
+                    )
+                },
+                "value_series",
+            ]
+        )
 
         # Live FX rates — only worth requesting for multi-currency portfolios.
         # Codes are derived from the previous poll's holdings/instruments (the
@@ -1174,14 +1952,106 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                 ]
             )
 
-        try:
-            _LOGGER.debug(
-                "Calling %s required endpoints in parallel", len(endpoint_list)
-            )
-            required_tasks = [
-                self._call_endpoint(endpoint, access_token) for endpoint in endpoint_list
+        # Per-endpoint scheduling: drop what isn't due this poll.  Market
+        # state comes from the previous poll's holdings; a financial-year
+        # rollover makes the FY-scoped reports due at once.
+        self.markets_open = await self._async_held_markets_open(now)
+        current_fy_bounds = (self.start_financial_year, self.end_financial_year)
+        if self._scheduled_fy_bounds != current_fy_bounds:
+            self._scheduler.force("financial-year", "capital_gains")
+            self._scheduled_fy_bounds = current_fy_bounds
+        performance_starts = {
+            endpoint[3]: endpoint[2]["start_date"]
+            for endpoint in endpoint_list
+            if endpoint[3] in LOCAL_PERFORMANCE_WINDOWS
+        }
+        endpoint_list = [
+            endpoint for endpoint in endpoint_list if self._endpoint_due(endpoint, now)
+        ]
+        optional_endpoint_list = [
+            endpoint
+            for endpoint in optional_endpoint_list
+            if self._endpoint_due(endpoint, now)
+        ]
+        elided = [
+            endpoint[3]
+            for endpoint in optional_endpoint_list
+            if self._endpoint_elided(endpoint)
+        ]
+        optional_endpoint_list = [
+            endpoint
+            for endpoint in optional_endpoint_list
+            if endpoint[3] not in elided
+        ]
+        scheduled_fetched: list[str] = []
+
+        # Rate governor: under pressure the sheddable extras sit this poll out
+        # and keep last poll's values.  The reading is the app-wide one, kept
+        # fresh by every portfolio's responses; judged again once this poll's
+        # own responses are in, to set the next interval.
+        shed: list[str] = []
+        if self._apply_rate_governor() != GOVERNOR_NORMAL:
+            shed = [
+                endpoint[3]
+                for endpoint in optional_endpoint_list
+                if endpoint[3] in RATE_GOVERNOR_SHEDDABLE
             ]
+            optional_endpoint_list = [
+                endpoint
+                for endpoint in optional_endpoint_list
+                if endpoint[3] not in RATE_GOVERNOR_SHEDDABLE
+            ]
+        self.shed_endpoints = shed
+
+        # Optional endpoints each sit behind a circuit breaker.  Asked after
+        # shedding, so a half-open breaker's one probe actually goes out.
+        active_optional = [
+            endpoint
+            for endpoint in optional_endpoint_list
+            if self.breakers.allow(breaker_key(endpoint))
+        ]
+        on_cooldown = len(optional_endpoint_list) - len(active_optional)
+
+        # Every request of the poll starts now: nothing in the optional list
+        # depends on a required response, and the cash transaction sync
+        # starts from the previous poll's account list and then follows
+        # cash_accounts_v2 as soon as that lands.  The stages below only
+        # consume results, so the poll takes about as long as its slowest
+        # request.  The request budget's semaphores are FIFO and the required
+        # requests are queued first.
+        _LOGGER.debug(
+            "Starting %s required and %s optional endpoints "
+            "(%s on cooldown, %s shed)",
+            len(endpoint_list),
+            len(active_optional),
+            on_cooldown,
+            len(shed),
+        )
+        required_tasks = [
+            asyncio.create_task(self._fetch_endpoint(endpoint, access_token))
+            for endpoint in endpoint_list
+        ]
+        optional_tasks = [
+            asyncio.create_task(self._fetch_endpoint(endpoint, access_token))
+            for endpoint in active_optional
+        ]
+        cash_accounts_task = next(
+            (
+                task
+                for endpoint, task in zip(active_optional, optional_tasks)
+                if endpoint[3] == "cash_accounts_v2"
+            ),
+            None,
+        )
+        cash_tx_task = asyncio.create_task(
+            self._async_sync_cash_transactions(cash_accounts_task, access_token, now)
+        )
+        poll_tasks = [*required_tasks, *optional_tasks, cash_tx_task]
+
+        try:
+            self.tracer.phase("await_required")
             required_results = await asyncio.gather(*required_tasks, return_exceptions=True)
+            self.tracer.phase("merge_required")
 
             required_failures: list[str] = []
             critical_failed = False
@@ -1222,7 +2092,15 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                         )
                     if self._is_rate_limited(response):
                         # Back off for a minute when we hit the parallel limit.
-                        self._register_lockout(timedelta(minutes=1))
+                        # The 403 is the app's budget, not the credentials':
+                        # it must not reach the auth check below.
+                        self._register_lockout(timedelta(minutes=1), app_wide=True)
+                        required_failures.append(
+                            f"{endpoint_path}: {response.get('error')}"
+                        )
+                        if is_critical:
+                            critical_failed = True
+                        continue
 
                     error_msg = str(response.get("error", "")).lower()
                     status_code = self._response_status(response)
@@ -1247,6 +2125,7 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                     endpoint_path,
                     list(response.keys()) if isinstance(response, dict) else type(response),
                 )
+                scheduled_fetched.append(schedule_key(endpoint))
                 extension = endpoint[3]
                 if extension:
                     response = {extension: response}
@@ -1279,50 +2158,29 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                     failure_preview,
                 )
 
-            # Carry forward slow-cadence performance windows that were skipped
-            # this poll (Feature 4) or failed to fetch, using the proven
-            # diversity carry-forward idiom so period sensors never flap.
-            for slow_key in ("financial-year", "one-month", "ytd"):
-                if slow_key not in combined_dict and slow_key in self.data:
-                    combined_dict[slow_key] = self.data[slow_key]
-
-            # --- Optional endpoints (with per-endpoint cooldown) ----------
-            # Cooldowns are keyed on path + extension because the same path
-            # can be polled twice with different params (e.g. past vs
-            # upcoming payouts) and must back off independently.
-            active_optional = [
-                endpoint
-                for endpoint in optional_endpoint_list
-                if not self._endpoint_on_cooldown(f"{endpoint[1]}#{endpoint[3]}")
-            ]
-            _LOGGER.debug(
-                "Calling %s optional endpoints in parallel (%s on cooldown)",
-                len(active_optional),
-                len(optional_endpoint_list) - len(active_optional),
-            )
-            optional_tasks = [
-                self._call_endpoint(endpoint, access_token) for endpoint in active_optional
-            ]
+            # --- Optional endpoints (each behind its circuit breaker) ------
+            self.tracer.phase("await_optional")
             optional_results = await asyncio.gather(*optional_tasks, return_exceptions=True)
+            self.tracer.phase("merge_optional")
 
             for endpoint, result in zip(active_optional, optional_results):
                 endpoint_path = endpoint[1]
                 extension = endpoint[3]
-                cooldown_key = f"{endpoint_path}#{extension}"
+                cooldown_key = breaker_key(endpoint)
 
                 if isinstance(result, Exception):
                     _LOGGER.info(
-                        "Optional endpoint %s failed: %s, backing off",
+                        "Optional endpoint %s failed: %s",
                         endpoint_path,
                         result,
                     )
-                    self._note_optional_failure(cooldown_key)
+                    self._note_optional_failure(cooldown_key, FAILURE_TRANSIENT)
                     continue
 
                 response = result
                 # The value-data series can answer with a bare top-level array.
                 # Wrap it under a "data" key so it clears the dict-shape guard
-                # below and its normaliser (_value_series_points) can peel it
+                # below and its normaliser (value_series_points) can peel it
                 # like the nested-list shapes; otherwise a valid list response
                 # would be discarded here and the value-trend sensors would
                 # never come online.
@@ -1330,97 +2188,65 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                     response = {"data": response}
                 if response is None or not isinstance(response, dict):
                     _LOGGER.info(
-                        "Optional endpoint %s returned %s, backing off",
+                        "Optional endpoint %s returned %s",
                         endpoint_path,
                         type(response).__name__,
                     )
-                    self._note_optional_failure(cooldown_key)
+                    self._note_optional_failure(cooldown_key, FAILURE_TRANSIENT)
                     continue
                 if "error" in response:
-                    if self._is_lockout(response):
-                        self._register_lockout(SHARESIGHT_LOCKOUT_COOLDOWN)
-                    elif self._is_rate_limited(response):
-                        self._register_lockout(timedelta(minutes=1))
                     _LOGGER.info(
-                        "Optional endpoint %s returned error %s, backing off",
+                        "Optional endpoint %s returned error %s",
                         endpoint_path,
                         response.get("error"),
                     )
-                    self._note_optional_failure(cooldown_key)
+                    # The lockout and the rate limit are the token's and the
+                    # app's, not the endpoint's: they leave its breaker alone.
+                    if self._is_lockout(response):
+                        self._register_lockout(SHARESIGHT_LOCKOUT_COOLDOWN)
+                    elif self._is_rate_limited(response):
+                        self._register_lockout(timedelta(minutes=1), app_wide=True)
+                    elif self._response_status(response) == 403:
+                        self._note_optional_failure(cooldown_key, FAILURE_SCOPE)
+                    else:
+                        self._note_optional_failure(cooldown_key, FAILURE_TRANSIENT)
                     continue
 
                 self._note_optional_success(cooldown_key)
+                scheduled_fetched.append(schedule_key(endpoint))
+                if extension == "my_user":
+                    self._note_account(response)
                 if extension:
                     response = {extension: response}
                 combined_dict = merge_dicts(combined_dict, response)
 
-            # Carry the slow-cadence value series forward on the polls that
-            # skip it (see the tiered fetch above) or where it failed, so the
-            # value-trend sensors hold their reading instead of flapping to
-            # unknown between refreshes.  Same idiom as the FY/month/YTD
-            # windows; the derived-analytics block below gates on this key.
-            if "value_series" not in combined_dict and "value_series" in self.data:
-                combined_dict["value_series"] = self.data["value_series"]
+            # Carry scheduled endpoints forward on the polls that skip them (not
+            # due) or where they failed, so period, value-trend and the other
+            # slow sensors hold their reading instead of flapping to unknown
+            # between refreshes.  The derived-analytics block below gates on
+            # some of these keys (value_series).
+            for key in self._scheduler.keys():
+                if key not in combined_dict and key in self.data:
+                    combined_dict[key] = self.data[key]
+            for extension in shed:
+                if extension not in combined_dict and extension in self.data:
+                    combined_dict[extension] = self.data[extension]
 
             # --- Per-account cash transactions (optional) ----------------
-            cash_accounts_data = combined_dict.get("cash_accounts_v2", {})
-            cash_accounts: list[dict[str, Any]] = []
-            if isinstance(cash_accounts_data, dict):
-                cash_accounts = cash_accounts_data.get("cash_accounts", []) or []
-
-            cash_account_transactions: list[dict[str, Any]] = []
-            if cash_accounts:
-                tx_work: list[tuple[int, list[Any]]] = []
-                for account in cash_accounts:
-                    account_id = account.get("id")
-                    account_portfolio_id = account.get("portfolio_id")
-                    if (
-                        account_id is None
-                        or str(account_portfolio_id) != str(self.portfolio_id)
-                    ):
-                        continue
-                    if self._cash_tx_on_cooldown(account_id):
-                        continue
-                    endpoint = [
-                        "v2",
-                        f"cash_accounts/{account_id}/cash_account_transactions",
-                        None,
-                        False,
-                    ]
-                    tx_work.append((account_id, endpoint))
-
-                if tx_work:
-                    tx_tasks = [
-                        self._call_endpoint(endpoint, access_token)
-                        for _, endpoint in tx_work
-                    ]
-                    tx_results = await asyncio.gather(*tx_tasks, return_exceptions=True)
-
-                    for (account_id, endpoint), tx_result in zip(tx_work, tx_results):
-                        tx_endpoint_path = endpoint[1]
-                        if isinstance(tx_result, Exception):
-                            _LOGGER.info(
-                                "Optional cash account transactions endpoint %s failed: %s",
-                                tx_endpoint_path,
-                                tx_result,
-                            )
-                            self._note_cash_tx_failure(account_id)
-                            continue
-
-                        tx_response = tx_result
-                        if not isinstance(tx_response, dict) or "error" in tx_response:
-                            self._note_cash_tx_failure(account_id)
-                            continue
-                        tx_list = tx_response.get("cash_account_transactions", [])
-                        if isinstance(tx_list, list):
-                            cash_account_transactions.extend(tx_list)
-                        self._note_cash_tx_success(account_id)
-
+            self.tracer.phase("await_cash_transactions")
+            ledgers_changed = await cash_tx_task
+            self.tracer.phase("cash_transactions")
+            self._apply_rate_governor()
+            if ledgers_changed:
+                self.ledgers.async_schedule_save()
+            # Same shape as the API's, now spanning every account's ledger, so
+            # accounts that failed or sat out on cooldown still contribute.
             combined_dict["cash_account_transactions"] = {
-                "cash_account_transactions": cash_account_transactions
+                "cash_account_transactions": self.ledgers.cash_transaction_list()
             }
 
             # --- Post-process merged data --------------------------------
+            self.tracer.phase("dedup")
             _LOGGER.debug("Data keys available: %s", list(combined_dict.keys()))
 
             if self._portfolio_detail:
@@ -1433,6 +2259,7 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
             # transactions) agree with the holdings key derived below.
             if isinstance(report_data, dict) and "holdings" in report_data:
                 report_data["holdings"] = report_holdings
+            self._note_coverage(combined_dict)
 
             sub_totals = report_data.get("sub_totals", [])
             if sub_totals:
@@ -1464,6 +2291,10 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                     "holdings": report_holdings,
                     "value": report_data.get("value", 0),
                 }
+            elif "holdings" in elided and (self.data or {}).get("holdings"):
+                # Skipped as covered, yet the report came back without
+                # holdings: hold the last list; the request resumes next poll.
+                combined_dict["holdings"] = self.data["holdings"]
             elif isinstance(holdings_from_api, dict) and "error" not in holdings_from_api:
                 api_holdings_list = self._open_positions(
                     holdings_from_api.get("holdings", [])
@@ -1482,11 +2313,37 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
             else:
                 combined_dict["holdings"] = {"holdings": [], "value": 0}
 
-            # Build income_report from payouts when available; else fallback.
+            # Build income_report from the payout ledger: split this poll's
+            # response on the pay date — paid ones fold into the ledger,
+            # future ones are the upcoming list — then use the whole history,
+            # so every consumer downstream sees the same lists it always did,
+            # each payout in exactly one of them.  A poll without a response
+            # keeps the previous upcoming list.
+            self.tracer.phase("income")
+            upcoming_list = (
+                ((self.data or {}).get("income_report") or {}).get("upcoming_payouts")
+                or []
+            )
             payouts_data = combined_dict.get("payouts", {})
-            payouts: list[dict[str, Any]] = []
-            if isinstance(payouts_data, dict):
-                payouts = payouts_data.get("payouts", []) or []
+            if (
+                isinstance(payouts_data, dict)
+                and "error" not in payouts_data
+                and isinstance(payouts_data.get("payouts"), list)
+            ):
+                today_iso = f"{today}"
+                paid_list: list[dict[str, Any]] = []
+                upcoming_list = []
+                for payout in payouts_data["payouts"]:
+                    if not isinstance(payout, dict):
+                        continue
+                    if str(payout.get("paid_on") or "")[:10] > today_iso:
+                        upcoming_list.append(payout)
+                    else:
+                        paid_list.append(payout)
+                if self.ledgers.payouts.reconcile(paid_list, payouts_window, now):
+                    self.ledgers.async_schedule_save()
+            payouts = self.ledgers.payouts.as_list()
+            combined_dict["payouts"] = {"payouts": payouts}
 
             if payouts:
                 combined_dict["income_report"] = {
@@ -1503,22 +2360,33 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                     "payouts": [],
                 }
 
-            # Announced-but-unpaid dividends from the forward payouts window.
-            upcoming_data = combined_dict.get("upcoming_payouts", {})
-            upcoming_list: list[dict[str, Any]] = []
-            if isinstance(upcoming_data, dict):
-                upcoming_list = upcoming_data.get("payouts", []) or []
-            combined_dict["income_report"]["upcoming_payouts"] = [
-                p for p in upcoming_list if isinstance(p, dict)
-            ]
+            combined_dict["income_report"]["upcoming_payouts"] = upcoming_list
+
+            # Build diversity breakdown.  The heavy diversity_v2 report only
+            # goes out on its slow period (ENDPOINT_REFRESH_PERIODS); every
+            # poll the same breakdown is computed locally from the holdings.
+            # A freshly fetched report wins and reconciles the local engine:
+            # it shows which grouping the portfolio's report uses.  Until that
+            # is known (or when no local grouping matches, e.g. a custom
+            # group) the last report's breakdown stands.  Like the derived
+            # analytics below, a bad row here must never sink the poll: the
+            # local engine is skipped and the report's breakdown stands.
+            self.tracer.phase("diversity")
+            instrument_lookup: dict[str, Any] = {}
+            local_diversity: dict[str, dict[str, Any]] | None = None
+            try:
+                instrument_lookup = analytics.build_instrument_lookup(
+                    combined_dict.get("user_instruments", {})
+                )
+                local_diversity = analytics.build_local_diversity(
+                    combined_dict.get("holdings", {}).get("holdings", []),
+                    instrument_lookup,
+                )
+                combined_dict["local_diversity"] = local_diversity
+            except (ValueError, TypeError, KeyError, AttributeError) as diversity_err:
+                _LOGGER.debug("Local diversity build failed: %s", diversity_err)
 
-            # Build diversity breakdown.  Sharesight's diversity_v2 endpoint
-            # occasionally returns an empty/partial payload (especially when
-            # a poll coincides with a token refresh), which would otherwise
-            # collapse the breakdown to [] and flap dependent sensors to
-            # "unavailable" for one cycle.  Carry the previous breakdown
-            # forward whenever the freshly built one is empty.
-            breakdown: list[dict[str, Any]] = []
+            api_breakdown: list[dict[str, Any]] = []
             diversity_v2 = combined_dict.get("diversity_v2", {})
             if isinstance(diversity_v2, dict) and "groups" in diversity_v2:
                 for group_entry in diversity_v2.get("groups", []):
@@ -1527,7 +2395,7 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                     for group_name, group_payload in group_entry.items():
                         if not isinstance(group_payload, dict):
                             continue
-                        breakdown.append(
+                        api_breakdown.append(
                             {
                                 "group_name": group_name,
                                 "percentage": group_payload.get("percentage"),
@@ -1535,6 +2403,21 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                             }
                         )
 
+            if local_diversity is None:
+                breakdown = api_breakdown
+            elif api_breakdown and "diversity_v2" in scheduled_fetched:
+                self._reconcile_diversity(api_breakdown, local_diversity)
+                breakdown = api_breakdown
+            elif self._diversity_axis is not None:
+                breakdown = local_diversity[self._diversity_axis]["breakdown"]
+            else:
+                breakdown = api_breakdown
+
+            # Sharesight's payloads occasionally come back empty/partial
+            # (especially when a poll coincides with a token refresh), which
+            # would otherwise collapse the breakdown to [] and flap dependent
+            # sensors to "unavailable" for one cycle.  Fall back to the
+            # report's sub-totals, then carry the previous breakdown forward.
             if not breakdown:
                 sub_totals = report_data.get("sub_totals", [])
                 if sub_totals:
@@ -1567,15 +2450,44 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
             else:
                 combined_dict["diversity"] = {"breakdown": breakdown}
 
+            # Trades are published from the local ledger: fold in this poll's
+            # window when it arrived, then hand on the whole history.  When the
+            # fetch failed or is on cooldown the ledger still answers.
+            self.tracer.phase("trades")
             trades_data = combined_dict.get("trades", {})
-            if not (
-                trades_data
-                and isinstance(trades_data, dict)
+            if (
+                isinstance(trades_data, dict)
                 and "error" not in trades_data
+                and isinstance(trades_data.get("trades"), list)
             ):
-                combined_dict["trades"] = {"trades": []}
+                if self.ledgers.trades.reconcile(
+                    trades_data["trades"], trades_window, now
+                ):
+                    self.ledgers.async_schedule_save()
+            combined_dict["trades"] = {"trades": self.ledgers.trades.as_list()}
+
+            # --- Local period performance (performance.py) ---------------
+            self.tracer.phase("local_performance")
+            # Windows fetched this poll check the roll-forward and re-anchor;
+            # confirmed ones that sat out are rolled forward over the carried
+            # report.  A confirmed window's report is stretched to the check
+            # period, an unconfirmed one goes back to its own schedule.
+            try:
+                self.local_performance.apply(
+                    combined_dict, performance_starts, set(scheduled_fetched), f"{today}"
+                )
+            except (ValueError, TypeError, KeyError, AttributeError) as perf_err:
+                _LOGGER.debug("Local performance roll-forward failed: %s", perf_err)
+            for window, start_date in performance_starts.items():
+                self._scheduler.set_min_period(
+                    window,
+                    LOCAL_PERFORMANCE_CHECK_PERIOD
+                    if self.local_performance.is_confirmed(window, start_date)
+                    else None,
+                )
 
             # --- Activity events (Feature 2, no extra API calls) ---------
+            self.tracer.phase("activity_events")
             # Diff this poll's records against the previous poll and stage HA
             # events for the event platform to emit.  A diff error must never
             # sink the poll, so guard it defensively.
@@ -1585,15 +2497,13 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                 _LOGGER.debug("Activity event diff failed: %s", activity_err)
 
             # --- Derived analytics (no extra API calls) ------------------
+            self.tracer.phase("analytics")
             # These mine data already fetched this poll into per-holding and
             # portfolio-level maps that many sensors consume.  Failures here
             # must never sink the whole poll, so guard defensively.
             try:
                 holdings_list = combined_dict.get("holdings", {}).get("holdings", [])
 
-                instrument_lookup = analytics.build_instrument_lookup(
-                    combined_dict.get("user_instruments", {})
-                )
                 combined_dict["instrument_lookup"] = instrument_lookup
 
                 combined_dict["holding_income"] = analytics.build_holding_income(
@@ -1605,12 +2515,9 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                     combined_dict.get("trades", {}).get("trades", []),
                     holdings_list,
                 )
-                combined_dict["sector_allocation"] = analytics.build_sector_allocation(
-                    holdings_list, instrument_lookup, axis="sector"
-                )
-                combined_dict["industry_allocation"] = analytics.build_sector_allocation(
-                    holdings_list, instrument_lookup, axis="industry"
-                )
+                if local_diversity is not None:
+                    combined_dict["sector_allocation"] = local_diversity["sector"]
+                    combined_dict["industry_allocation"] = local_diversity["industry"]
                 combined_dict["portfolio_analytics"] = analytics.build_portfolio_analytics(
                     holdings_list,
                     instrument_lookup,
@@ -1650,6 +2557,7 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                 _LOGGER.debug("Derived analytics failed: %s", analytics_err)
 
             # Refresh the financial year bounds if the portfolio list has it.
+            self.tracer.phase("finalize")
             portfolios_list = combined_dict.get("portfolios", [])
             if isinstance(portfolios_list, list) and portfolios_list:
                 fy_end = (portfolios_list[0] or {}).get("financial_year_end")
@@ -1658,10 +2566,17 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                     self.end_financial_year = eofy_date
                     self.start_financial_year = sofy_date
 
-            # Count only genuinely successful polls so the slow-window cadence
-            # (Feature 4) advances once per fetch, never on kept-last-good paths.
-            self._poll_count += 1
+            # Schedules advance only on genuinely successful polls, never on
+            # the kept-last-good paths.
+            for key in scheduled_fetched:
+                self._scheduler.mark_fetched(key, now, self.markets_open)
             self.data = combined_dict
+            await self._async_apply_market_cadence()
+            self.data_from_snapshot = False
+            self._snapshot.async_schedule_save(
+                self.portfolio_id, lambda: compact_data(self.data)
+            )
+            self._async_schedule_official_costs_prefetch()
             return self.data
 
         except ConfigEntryAuthFailed:
@@ -1683,3 +2598,7 @@ class SharesightCoordinator(TimestampDataUpdateCoordinator[dict[str, Any]]):
                 return self.data
             _LOGGER.error("Error in coordinator update: %s", err, exc_info=True)
             raise UpdateFailed(f"Error fetching Sharesight data: {err}") from err
+        finally:
+            # A kept-last-good return or a raise leaves later stages running;
+            # their results would only be thrown away.
+            _discard_tasks(poll_tasks)
@@ -82,12 +82,31 @@ async def async_get_config_entry_diagnostics(
             "setup_complete": bool(getattr(coordinator, "_portfolio_detail", None)),
             "start_financial_year": getattr(coordinator, "start_financial_year", None),
             "end_financial_year": getattr(coordinator, "end_financial_year", None),
-            "optional_endpoints_on_cooldown": _active_cooldowns(
-                getattr(coordinator, "_optional_endpoint_cooldowns", None)
-            ),
+            "optional_endpoints_on_cooldown": coordinator.breakers.open_remaining(),
+            "endpoint_breakers": coordinator.breakers.diagnostics(),
             "cash_accounts_on_cooldown": _active_cooldowns(
                 getattr(coordinator, "_cash_tx_account_cooldowns", None)
             ),
+            # Shared by every portfolio on the same OAuth app.
+            "request_budget": coordinator._request_budget.as_dict(),
+            "response_cache": coordinator._response_cache.as_dict(),
+            "refresh_queue": coordinator._refresh_queue.as_dict(),
+            "service_cache": coordinator.service_cache.as_dict(),
+            "account_level_sharing": coordinator._account_id is not None,
+            "ledgers": coordinator.ledgers.diagnostics(),
+            "official_costs": coordinator.official_costs.diagnostics(),
+            "data_from_snapshot": coordinator.data_from_snapshot,
+            "shed_endpoints": list(coordinator.shed_endpoints),
+            "elided_requests": dict(coordinator.elided_requests),
+            "holding_limit": coordinator.holding_limit,
+            "token": coordinator.tokens.as_dict(),
+            "request_metrics": coordinator.endpoint_metrics(),
+            "poll_traces": coordinator.tracer.as_dict(),
+            "adaptive_polling": coordinator._adaptive_polling,
+            "markets_open": coordinator.markets_open,
+            "endpoint_next_due": coordinator._scheduler.as_dict(),
+            "diversity_axis": coordinator._diversity_axis,
+            "local_performance": coordinator.local_performance.as_dict(),
             "data_keys": sorted(list((coordinator.data or {}).keys())),
             "data": _redact_coordinator_data(coordinator.data or {}),
         }
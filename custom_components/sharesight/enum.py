@@ -739,6 +739,11 @@ SENSOR_DESCRIPTIONS: list[SharesightSensorDescription] = [
     SharesightSensorDescription(translation_key="last_successful_update", key="last_update_timestamp", sub_key="_integration", extension_key=None, name="Last Successful Update", native_unit_of_measurement=None, device_class=SensorDeviceClass.TIMESTAMP, state_class=None, entity_category=EntityCategory.DIAGNOSTIC, suggested_display_precision=None),
     SharesightSensorDescription(translation_key="update_interval_s", key="update_interval_seconds", sub_key="_integration", extension_key=None, name="Update Interval (s)", native_unit_of_measurement="s", device_class=SensorDeviceClass.DURATION, state_class=SensorStateClass.MEASUREMENT, entity_category=EntityCategory.DIAGNOSTIC, suggested_display_precision=0),
     SharesightSensorDescription(translation_key="endpoints_on_cooldown", key="optional_endpoints_on_cooldown", sub_key="_integration", extension_key=None, name="Endpoints on Cooldown", native_unit_of_measurement="endpoints", device_class=None, state_class=SensorStateClass.MEASUREMENT, entity_category=EntityCategory.DIAGNOSTIC, suggested_display_precision=0),
+    SharesightSensorDescription(translation_key="api_requests_remaining", key="minute_rate_remaining", sub_key="_integration", extension_key=None, name="API Requests Remaining", native_unit_of_measurement="requests", device_class=None, state_class=SensorStateClass.MEASUREMENT, entity_category=EntityCategory.DIAGNOSTIC, suggested_display_precision=0),
+    SharesightSensorDescription(translation_key="holding_limit", key="holding_limit", sub_key="_integration", extension_key=None, name="Holding Limit", native_unit_of_measurement="holdings", device_class=None, state_class=None, entity_category=EntityCategory.DIAGNOSTIC, suggested_display_precision=0),
+    SharesightSensorDescription(translation_key="poll_duration", key="poll_duration", sub_key="_integration", extension_key=None, name="Poll Duration", native_unit_of_measurement="s", device_class=SensorDeviceClass.DURATION, state_class=SensorStateClass.MEASUREMENT, entity_category=EntityCategory.DIAGNOSTIC, suggested_display_precision=1),
+    SharesightSensorDescription(translation_key="requests_per_poll", key="poll_requests", sub_key="_integration", extension_key=None, name="Requests per Poll", native_unit_of_measurement="requests", device_class=None, state_class=SensorStateClass.MEASUREMENT, entity_category=EntityCategory.DIAGNOSTIC, suggested_display_precision=0),
+    SharesightSensorDescription(translation_key="slowest_endpoint", key="slowest_endpoint", sub_key="_integration", extension_key=None, name="Slowest Endpoint", native_unit_of_measurement=None, device_class=None, state_class=None, entity_category=EntityCategory.DIAGNOSTIC, suggested_display_precision=None),
 ]
 
 # Capital gains tax sensors — only created for Australian portfolios, because
@@ -832,12 +837,20 @@ HOLDING_TRADE_DESCRIPTIONS: list[SharesightSensorDescription] = [
     SharesightSensorDescription(translation_key="holding_net_shares", key="holding_trade", sub_key="net_shares", name="HOLDING net shares traded", native_unit_of_measurement="shares", device_class=None, state_class=SensorStateClass.MEASUREMENT, suggested_display_precision=4, device_group="holding"),
 ]
 
+# Sharesight's official per-holding cost figures, prefetched in the background
+# (see official_costs.py; key="holding_official_cost").
+HOLDING_OFFICIAL_COST_DESCRIPTIONS: list[SharesightSensorDescription] = [
+    SharesightSensorDescription(translation_key="holding_official_average_price", key="holding_official_cost", sub_key="official_average_price", name="HOLDING official average price", native_unit_of_measurement=CURRENCY_DOLLAR, device_class=SensorDeviceClass.MONETARY, state_class=SensorStateClass.MEASUREMENT, suggested_display_precision=4, device_group="holding"),
+    SharesightSensorDescription(translation_key="holding_official_cost_base", key="holding_official_cost", sub_key="official_cost_base", name="HOLDING official cost base", native_unit_of_measurement=CURRENCY_DOLLAR, device_class=SensorDeviceClass.MONETARY, state_class=SensorStateClass.TOTAL, suggested_display_precision=2, device_group="holding"),
+]
+
 # Combined per-holding description set iterated once per holding in sensor.py.
 ALL_HOLDING_DESCRIPTIONS: list[SharesightSensorDescription] = (
     HOLDING_SENSOR_DESCRIPTIONS
     + HOLDING_FUNDAMENTAL_DESCRIPTIONS
     + HOLDING_INCOME_DESCRIPTIONS
     + HOLDING_TRADE_DESCRIPTIONS
+    + HOLDING_OFFICIAL_COST_DESCRIPTIONS
 )
 
 # Portfolio sector / industry allocation — a diversification lens the
@@ -0,0 +1,256 @@
+"""Persisted local ledgers of a portfolio's transaction history.
+
+The trades, payouts and cash account transaction feeds have no cursor:
+without a date range every poll downloaded the whole inception-to-today
+history — for a portfolio near Sharesight's ~3,000-trade design ceiling, or a
+Xero-linked cash account with thousands of rows, the biggest payloads of the
+cycle — and every sensor built from them then re-walked the lot.
+
+Each portfolio now keeps its history in a ``Store`` (``.storage``, private) and
+polls only a trailing window:
+
+* an incremental poll asks for ``start_date = last sync - overlap`` (``from``
+  / ``to`` for cash transactions, one ledger per account) and
+  reconciles that window by record id — new and edited records are merged in,
+  ledger records inside the window that the API no longer returns were deleted
+  upstream and are dropped;
+* a full resync on a slow schedule (and whenever the ledger is empty) replaces
+  the ledger outright, which catches what a window can't: records back-dated
+  to before it, and deletions outside it.
+
+The window is keyed on the record's own date (``transaction_date`` for
+trades, ``paid_on`` for payouts, the day of ``date_time`` for cash
+transactions), because that is what the API's date filters apply to.  A window that comes back unchanged leaves the
+ledger — and its sorted list — untouched, so a quiet poll costs one small
+request and no re-sort or write.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, LEDGER_SAVE_DELAY, LEDGER_STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+# Store key prefix of the per-cash-account ledgers.
+_CASH_ACCOUNT_PREFIX = "cash_account:"
+
+
+class RecordLedger:
+    """One id-keyed record family plus its sync bookkeeping."""
+
+    def __init__(self, date_field: str, *fallback_fields: str) -> None:
+        """Start empty; the first sync is a full one.
+
+        Records are keyed by ``id``; ``fallback_fields`` build a synthetic key
+        for the odd record without one, like the activity diff does.
+        """
+        self.date_field = date_field
+        self._fallback_fields = fallback_fields
+        self.records: dict[str, dict[str, Any]] = {}
+        # ISO date of the last successful sync (full or incremental).
+        self.synced_on: str | None = None
+        # ISO timestamp (UTC) of the last full resync.
+        self.full_synced_at: str | None = None
+        self._ordered: list[dict[str, Any]] | None = None
+
+    def _record_date(self, record: dict[str, Any]) -> str:
+        return str(record.get(self.date_field) or "")
+
+    def _record_day(self, record: dict[str, Any]) -> str:
+        # Windows are whole days; cash transactions carry a full timestamp.
+        return self._record_date(record)[:10]
+
+    def _record_key(self, record: dict[str, Any]) -> str | None:
+        if record.get("id") is not None:
+            return str(record["id"])
+        if not self._fallback_fields:
+            return None
+        return "|".join(str(record.get(field)) for field in self._fallback_fields)
+
+    def window_start(
+        self, now: datetime, overlap: timedelta, full_every: timedelta
+    ) -> str | None:
+        """Start date of the next incremental fetch, or None when a full one is due."""
+        if not self.records or self.synced_on is None or self.full_synced_at is None:
+            return None
+        try:
+            last_full = datetime.fromisoformat(self.full_synced_at)
+            synced_on = date.fromisoformat(self.synced_on)
+        except ValueError:
+            return None
+        if now - last_full >= full_every:
+            return None
+        return f"{synced_on - overlap}"
+
+    def reconcile(
+        self, fetched: list[Any], window_start: str | None, now: datetime
+    ) -> bool:
+        """Fold one fetched window (``window_start`` None = full history) in.
+
+        Returns whether anything needs saving: the records changed, or a full
+        resync (which always moves ``full_synced_at``) just ran.
+        """
+        incoming: dict[str, dict[str, Any]] = {}
+        for record in fetched:
+            if not isinstance(record, dict):
+                continue
+            key = self._record_key(record)
+            if key is not None:
+                incoming[key] = record
+
+        if window_start is None:
+            records = incoming
+            self.full_synced_at = now.isoformat()
+        else:
+            # Anything the ledger holds inside the window must be in the
+            # response; if it isn't, it was deleted upstream.  The window ends
+            # today, so future-dated records are left for the full resync.
+            today = f"{now.date()}"
+            records = {
+                key: record
+                for key, record in self.records.items()
+                if key in incoming
+                or not window_start <= self._record_day(record) <= today
+            }
+            records.update(incoming)
+        self.synced_on = f"{now.date()}"
+        if records == self.records:
+            return window_start is None
+        self.records = records
+        self._ordered = None
+        return True
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Records oldest first (by date, then id); cached until the next change."""
+        if self._ordered is None:
+            self._ordered = sorted(
+                self.records.values(),
+                key=lambda record: (self._record_date(record), str(record.get("id"))),
+            )
+        return self._ordered
+
+    def as_dict(self) -> dict[str, Any]:
+        """Serialisable form for the Store."""
+        return {
+            "records": list(self.records.values()),
+            "synced_on": self.synced_on,
+            "full_synced_at": self.full_synced_at,
+        }
+
+    def load(self, stored: Any) -> None:
+        """Restore from ``as_dict`` output; anything malformed starts empty."""
+        if not isinstance(stored, dict):
+            return
+        records = stored.get("records")
+        if not isinstance(records, list):
+            return
+        self.records = {}
+        for record in records:
+            if not isinstance(record, dict):
+                continue
+            key = self._record_key(record)
+            if key is not None:
+                self.records[key] = record
+        self.synced_on = stored.get("synced_on")
+        self.full_synced_at = stored.get("full_synced_at")
+        self._ordered = None
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Counts and sync marks only — never the records themselves."""
+        return {
+            "records": len(self.records),
+            "synced_on": self.synced_on,
+            "full_synced_at": self.full_synced_at,
+        }
+
+
+class SharesightLedgers:
+    """Every ledger of one config entry, persisted together in one Store."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Set up empty ledgers; ``async_load`` fills them from disk."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass,
+            LEDGER_STORAGE_VERSION,
+            f"{DOMAIN}.{entry_id}.ledger",
+            private=True,
+        )
+        self.trades = RecordLedger("transaction_date")
+        self.payouts = RecordLedger("paid_on", "symbol", "paid_on", "amount")
+        # One ledger per cash account id (str), each with its own sync marks —
+        # the per-account high-water mark behind the from/to window.
+        self.cash_transactions: dict[str, RecordLedger] = {}
+        self.loaded: bool = False
+
+    def _ledgers(self) -> dict[str, RecordLedger]:
+        ledgers = {"trades": self.trades, "payouts": self.payouts}
+        ledgers.update(
+            (f"{_CASH_ACCOUNT_PREFIX}{account_id}", ledger)
+            for account_id, ledger in self.cash_transactions.items()
+        )
+        return ledgers
+
+    def cash_account(self, account_id: Any) -> RecordLedger:
+        """The transaction ledger of one cash account, created on first use."""
+        ledger = self.cash_transactions.get(str(account_id))
+        if ledger is None:
+            ledger = self.cash_transactions[str(account_id)] = RecordLedger(
+                "date_time", "date_time", "amount", "description"
+            )
+        return ledger
+
+    def prune_cash_accounts(self, live_ids: set[str]) -> bool:
+        """Drop the ledgers of accounts no longer in the portfolio."""
+        stale = set(self.cash_transactions) - live_ids
+        for account_id in stale:
+            del self.cash_transactions[account_id]
+        return bool(stale)
+
+    def cash_transaction_list(self) -> list[dict[str, Any]]:
+        """Every account's transactions, in the shape the API returns them."""
+        return [
+            record
+            for ledger in self.cash_transactions.values()
+            for record in ledger.as_list()
+        ]
+
+    async def async_load(self) -> None:
+        """Restore the ledgers saved by a previous run, if any."""
+        self.loaded = True
+        stored = await self._store.async_load()
+        if not isinstance(stored, dict):
+            return
+        self.trades.load(stored.get("trades"))
+        self.payouts.load(stored.get("payouts"))
+        for name, stored_ledger in stored.items():
+            if name.startswith(_CASH_ACCOUNT_PREFIX):
+                self.cash_account(name.removeprefix(_CASH_ACCOUNT_PREFIX)).load(
+                    stored_ledger
+                )
+        _LOGGER.debug(
+            "Loaded Sharesight ledgers: %s",
+            {name: len(ledger.records) for name, ledger in self._ledgers().items()},
+        )
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Write the ledgers out shortly, coalescing back-to-back changes."""
+        self._store.async_delay_save(self._data_to_save, LEDGER_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {name: ledger.as_dict() for name, ledger in self._ledgers().items()}
+
+    async def async_remove(self) -> None:
+        """Delete the stored ledgers (the entry is being removed)."""
+        await self._store.async_remove()
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Per-ledger counts and sync marks."""
+        return {name: ledger.diagnostics() for name, ledger in self._ledgers().items()}
@@ -0,0 +1,242 @@
+"""Rolling per-endpoint request metrics and per-poll totals.
+
+A slow poll used to be a mystery: ``_call_endpoint`` only logged timeouts and
+connection errors, so nothing said which of the twenty-odd requests held it
+up.  Every request now records, under its endpoint's name, how long it waited
+for a slot on the shared budget (the heavy-report semaphore for the
+performance / diversity / valuation reports), how long the transport took and
+how many bytes came back, over the last ``METRICS_WINDOW`` requests, plus
+running error and timeout counts.
+
+The same window sets each endpoint's request timeout (``timeout``): a multiple
+of its p95 between a floor and a ceiling, so a hung light call gives its slot
+back in seconds while the heavy reports keep a higher ceiling.  A timed-out
+request enters the window at the time it was allowed, so an endpoint that has
+turned slow raises its own timeout rather than timing out on the old one.
+``hedge_delay`` says when a light request has outlasted its p95 and is worth a
+second, hedged copy.
+
+Requests made inside ``SharesightMetrics.poll`` — the coordinator's poll and
+the tasks it spawns, which inherit the context — also count towards that
+poll's totals: duration, request count, bytes and the slowest endpoint.
+Service calls and background fetches made meanwhile don't.
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from .const import (
+    ENDPOINT_TIMEOUT_CEILING,
+    ENDPOINT_TIMEOUT_FLOOR,
+    ENDPOINT_TIMEOUT_MIN_SAMPLES,
+    ENDPOINT_TIMEOUT_P95_MULTIPLIER,
+    HEAVY_ENDPOINT_TIMEOUT_CEILING,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    METRICS_WINDOW,
+)
+
+
+def metrics_key(path: str, extension: Any) -> str:
+    """The name an endpoint's metrics are kept under.
+
+    Its extension key, else the last path segment that isn't an id, so the
+    per-account and per-holding requests pool under one name.
+    """
+    if extension:
+        return str(extension)
+    segments = [segment for segment in path.split("/") if not segment.isdigit()]
+    return segments[-1] if segments else path
+
+
+def _percentile(values: list[float], fraction: float) -> float | None:
+    """Nearest-rank percentile of ``values`` (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _rounded(value: float | None) -> float | None:
+    return None if value is None else round(value, 3)
+
+
+class EndpointMetrics:
+    """Rolling samples and running counts of one endpoint."""
+
+    def __init__(self) -> None:
+        """Start with no samples."""
+        self.latencies: deque[float] = deque(maxlen=METRICS_WINDOW)
+        self.waits: deque[float] = deque(maxlen=METRICS_WINDOW)
+        self.sizes: deque[int] = deque(maxlen=METRICS_WINDOW)
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.last_status: int | None = None
+        # Seconds allowed to the endpoint's latest request.
+        self.timeout: float | None = None
+
+    def percentile(self, fraction: float) -> float | None:
+        """Latency percentile over the window, in seconds."""
+        return _percentile(list(self.latencies), fraction)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Latency and wait percentiles (s), sizes (bytes) and counts."""
+        latencies = list(self.latencies)
+        waits = list(self.waits)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "last_status": self.last_status,
+            "timeout": _rounded(self.timeout),
+            "latency_p50": _rounded(_percentile(latencies, 0.5)),
+            "latency_p95": _rounded(_percentile(latencies, 0.95)),
+            "latency_max": _rounded(max(latencies, default=None)),
+            "wait_p95": _rounded(_percentile(waits, 0.95)),
+            "wait_max": _rounded(max(waits, default=None)),
+            "bytes_last": self.sizes[-1] if self.sizes else None,
+            "bytes_max": max(self.sizes, default=None),
+        }
+
+
+@dataclass
+class _PollTotals:
+    requests: int = 0
+    bytes: int = 0
+    slowest_endpoint: str | None = None
+    slowest_latency: float = 0.0
+
+
+_current_poll: ContextVar[_PollTotals | None] = ContextVar(
+    "sharesight_current_poll", default=None
+)
+
+
+class SharesightMetrics:
+    """Request metrics of one config entry."""
+
+    def __init__(self) -> None:
+        """Start empty; ``last_poll`` is None until a poll has finished."""
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        # {"poll_duration", "poll_requests", "poll_bytes", "slowest_endpoint",
+        # "slowest_latency"} of the last finished poll.
+        self.last_poll: dict[str, Any] | None = None
+
+    def _endpoint(self, key: str) -> EndpointMetrics:
+        metrics = self.endpoints.get(key)
+        if metrics is None:
+            metrics = self.endpoints[key] = EndpointMetrics()
+        return metrics
+
+    def record(
+        self, key: str, *, wait: float, latency: float, size: int, status: int
+    ) -> None:
+        """One answered request; a 4xx/5xx status also counts as an error."""
+        metrics = self._endpoint(key)
+        metrics.requests += 1
+        metrics.waits.append(wait)
+        metrics.latencies.append(latency)
+        metrics.sizes.append(size)
+        metrics.last_status = status
+        if status >= 400:
+            metrics.errors += 1
+        totals = _current_poll.get()
+        if totals is not None:
+            totals.requests += 1
+            totals.bytes += size
+            if latency >= totals.slowest_latency:
+                totals.slowest_endpoint = key
+                totals.slowest_latency = latency
+
+    def record_failure(self, key: str, *, wait: float, timeout: bool) -> None:
+        """One request that got no answer: timed out, or a connection error."""
+        metrics = self._endpoint(key)
+        metrics.requests += 1
+        metrics.waits.append(wait)
+        if timeout:
+            metrics.timeouts += 1
+            if metrics.timeout is not None:
+                metrics.latencies.append(metrics.timeout)
+        else:
+            metrics.errors += 1
+        totals = _current_poll.get()
+        if totals is not None:
+            totals.requests += 1
+
+    def timeout(self, key: str, heavy: bool) -> float:
+        """Seconds to allow the endpoint's next request.
+
+        ``ENDPOINT_TIMEOUT_P95_MULTIPLIER`` times its p95 latency, between the
+        floor and the ceiling (the heavy reports' is higher); the ceiling
+        until the endpoint has a few answers.
+        """
+        metrics = self._endpoint(key)
+        ceiling = HEAVY_ENDPOINT_TIMEOUT_CEILING if heavy else ENDPOINT_TIMEOUT_CEILING
+        p95 = metrics.percentile(0.95)
+        if p95 is None or len(metrics.latencies) < ENDPOINT_TIMEOUT_MIN_SAMPLES:
+            metrics.timeout = ceiling
+        else:
+            metrics.timeout = min(
+                ceiling,
+                max(ENDPOINT_TIMEOUT_FLOOR, p95 * ENDPOINT_TIMEOUT_P95_MULTIPLIER),
+            )
+        return metrics.timeout
+
+    def hedge_delay(self, key: str) -> float | None:
+        """Seconds after which a request of the endpoint is worth hedging.
+
+        Its p95 latency (at least ``HEDGE_MIN_DELAY``); None while there are
+        too few answers to trust it.
+        """
+        metrics = self.endpoints.get(key)
+        if metrics is None or len(metrics.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(HEDGE_MIN_DELAY, metrics.percentile(0.95) or 0.0)
+
+    def record_hedge(self, key: str, won: bool) -> None:
+        """A hedged second request went out; ``won``: it answered first."""
+        metrics = self._endpoint(key)
+        metrics.hedges += 1
+        if won:
+            metrics.hedge_wins += 1
+
+    @contextmanager
+    def poll(self) -> Iterator[None]:
+        """Time one poll and total the requests made inside it."""
+        totals = _PollTotals()
+        token = _current_poll.set(totals)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            _current_poll.reset(token)
+            self.last_poll = {
+                "poll_duration": round(time.monotonic() - started, 3),
+                "poll_requests": totals.requests,
+                "poll_bytes": totals.bytes,
+                "slowest_endpoint": totals.slowest_endpoint,
+                "slowest_latency": _rounded(totals.slowest_latency)
+                if totals.slowest_endpoint
+                else None,
+            }
+
+    def as_dict(self, cooldowns: Mapping[str, int] | None = None) -> dict[str, Any]:
+        """Per-endpoint metrics (with seconds of cooldown left, when parked)
+        and the last poll's totals, for diagnostics."""
+        cooldowns = cooldowns or {}
+        endpoints = {}
+        for key, metrics in sorted(self.endpoints.items()):
+            endpoints[key] = metrics.as_dict()
+            endpoints[key]["cooldown_remaining"] = cooldowns.get(key)
+        return {"last_poll": self.last_poll, "endpoints": endpoints}
@@ -0,0 +1,165 @@
+"""Persisted per-holding official cost figures, prefetched in the background.
+
+Sharesight's own average purchase price and cost base
+(``holdings/{id}/average_purchase_price.json`` and ``cost_base.json``) were
+only fetched on demand by ``get_instrument_fundamentals``; the holding devices
+made do with the ``vwap_buy_price`` approximation built from the trades list.
+
+After each successful poll the coordinator now tops this store up in the
+background, a few holdings at a time and only while the app's request budget
+has room to spare, so the regular poll always comes first.  A holding is
+refetched when its figures are missing, when its quantity or last trade date
+has moved since they were fetched (a trade changes both figures), or once they
+are ``OFFICIAL_COSTS_MAX_AGE`` old (corporate actions).  The per-holding
+official cost sensors and the fundamentals services read from here at no
+request cost.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    OFFICIAL_COSTS_MAX_AGE,
+    OFFICIAL_COSTS_SAVE_DELAY,
+    OFFICIAL_COSTS_STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def currency_code(obj: Any) -> Any:
+    """3-letter code from a Sharesight currency object (or a bare string)."""
+    if isinstance(obj, dict):
+        return obj.get("code")
+    return obj
+
+
+def extract_average_purchase_price(resp: Any) -> Any:
+    """Curate the V3 average-purchase-price payload; pass errors through."""
+    if not isinstance(resp, dict):
+        return None
+    if "error" in resp:
+        return resp
+    inner = resp.get("average_purchase_price")
+    if not isinstance(inner, dict):
+        return None
+    return {
+        "value": inner.get("value"),
+        "currency": currency_code(inner.get("currency")),
+    }
+
+
+def extract_cost_base(resp: Any) -> Any:
+    """Curate the V3 cost-base payload; pass errors through."""
+    if not isinstance(resp, dict):
+        return None
+    if "error" in resp:
+        return resp
+    inner = resp.get("cost_base")
+    if not isinstance(inner, dict):
+        return None
+    return {
+        "total_value": inner.get("total_value"),
+        "value_per_share": inner.get("value_per_share"),
+        "currency": currency_code(inner.get("currency")),
+    }
+
+
+def holding_marker(holding: dict[str, Any], last_trade_date: Any) -> str:
+    """What a holding's official costs depend on: its quantity and last trade."""
+    return f"{holding.get('quantity')}|{last_trade_date}"
+
+
+class SharesightOfficialCosts:
+    """Official cost figures per holding id, persisted in one Store."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Bind to the entry's store; ``async_load`` fills it from disk."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass,
+            OFFICIAL_COSTS_STORAGE_VERSION,
+            f"{DOMAIN}.{entry_id}.official_costs",
+            private=True,
+        )
+        # holding id (str) -> {"average_purchase_price", "cost_base",
+        # "marker", "fetched_at"}
+        self.costs: dict[str, dict[str, Any]] = {}
+        self.loaded: bool = False
+        self.fetches: int = 0
+
+    def is_fresh(self, holding_id: Any, marker: str, now: datetime) -> bool:
+        """Whether the stored figures still hold for this marker and age."""
+        entry = self.costs.get(str(holding_id))
+        if entry is None or entry.get("marker") != marker:
+            return False
+        fetched_at = dt_util.parse_datetime(str(entry.get("fetched_at") or ""))
+        return fetched_at is not None and now - fetched_at < OFFICIAL_COSTS_MAX_AGE
+
+    def get(self, holding_id: Any) -> dict[str, Any] | None:
+        """Stored figures of one holding, however old."""
+        return self.costs.get(str(holding_id))
+
+    def store(
+        self, holding_id: Any, marker: str, response: dict[str, Any], now: datetime
+    ) -> bool:
+        """Keep the curated figures of one ``async_get_official_costs`` answer.
+
+        Returns False (and keeps what was stored) when neither leg succeeded.
+        """
+        average = extract_average_purchase_price(response.get("average_purchase_price"))
+        cost_base = extract_cost_base(response.get("cost_base"))
+        ok = [
+            figure
+            for figure in (average, cost_base)
+            if isinstance(figure, dict) and "error" not in figure
+        ]
+        if not ok:
+            return False
+        self.costs[str(holding_id)] = {
+            "average_purchase_price": average if average in ok else None,
+            "cost_base": cost_base if cost_base in ok else None,
+            "marker": marker,
+            "fetched_at": now.isoformat(),
+        }
+        self.fetches += 1
+        return True
+
+    def prune(self, live_ids: set[str]) -> bool:
+        """Drop the figures of holdings no longer in the portfolio."""
+        stale = set(self.costs) - live_ids
+        for holding_id in stale:
+            del self.costs[holding_id]
+        return bool(stale)
+
+    async def async_load(self) -> None:
+        """Restore the figures saved by a previous run, if any."""
+        self.loaded = True
+        stored = await self._store.async_load()
+        if isinstance(stored, dict) and isinstance(stored.get("costs"), dict):
+            self.costs = {
+                str(holding_id): entry
+                for holding_id, entry in stored["costs"].items()
+                if isinstance(entry, dict)
+            }
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Write the figures out shortly, coalescing back-to-back changes."""
+        self._store.async_delay_save(
+            lambda: {"costs": self.costs}, OFFICIAL_COSTS_SAVE_DELAY
+        )
+
+    async def async_remove(self) -> None:
+        """Delete the stored figures (the entry is being removed)."""
+        await self._store.async_remove()
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Counts only."""
+        return {"holdings": len(self.costs), "fetches": self.fetches}
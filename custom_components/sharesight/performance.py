@@ -0,0 +1,433 @@
+"""Local period performance, rolled forward between Sharesight reports.
+
+Every poll spent two heavy ``performance`` reports on the one-day and one-week
+windows, and the slow tier three more on the month, YTD and financial year —
+while the combined V3 report fetched every poll already carries the live
+portfolio value, and the trade and payout ledgers hold every flow.
+
+Each window is anchored on its last report.  Between reports it is rolled
+forward from what changed since: the move in the live value, less the money
+traded in (buys, opening balances) or out (sells, capital returns) by trades
+the anchor hadn't seen, plus dividends it hadn't seen.  Currency gain stays
+at the anchor's (splitting it out would need per-holding FX history), and the
+percentages use the anchor's capital base.
+
+A roll-forward is only published once a report has confirmed it: when a
+window's report comes in, the roll-forward's prediction for that same moment
+is compared with it first.  A confirmed window's report then only goes out on
+``LOCAL_PERFORMANCE_CHECK_PERIOD`` to keep checking; a miss, or a new start
+date (day / week / month / year rollover), sends it back to the report until
+the next match.
+
+A chain-linked time-weighted return is added to every window from the daily
+value series and the same flows.
+
+``window_performance`` answers an arbitrary window from scratch instead (the
+``generate_performance_report`` service): start and end values straight from
+the value series, the same flows, and a Modified Dietz return.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, timedelta
+import logging
+from typing import Any
+
+from .analytics import value_series_points
+from .const import (
+    LOCAL_PERFORMANCE_PERCENT_TOLERANCE,
+    LOCAL_PERFORMANCE_VALUE_TOLERANCE,
+    LOCAL_REPORT_MAX_POINT_GAP_DAYS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Trade types that move money into (+1) or out of (-1) the portfolio.
+_FLOW_SIGNS = {
+    "BUY": 1,
+    "OPENING BALANCE": 1,
+    "OPENING_BALANCE": 1,
+    "SELL": -1,
+    "CAPITAL_RETURN": -1,
+}
+
+_GAIN_FIELDS = ("capital_gain", "payout_gain", "currency_gain")
+
+
+def _float(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _record_key(record: dict[str, Any], *fallback_fields: str) -> str:
+    if record.get("id") is not None:
+        return str(record["id"])
+    return "|".join(str(record.get(field)) for field in fallback_fields)
+
+
+def _trade_day(trade: dict[str, Any]) -> str:
+    return str(trade.get("transaction_date") or trade.get("date") or "")[:10]
+
+
+def _payout_day(payout: dict[str, Any]) -> str:
+    return str(payout.get("paid_on") or "")[:10]
+
+
+def trade_flow(trade: dict[str, Any]) -> float | None:
+    """Money a trade moved into (+) or out of (-) the portfolio, if any."""
+    sign = _FLOW_SIGNS.get(str(trade.get("transaction_type") or "").upper())
+    if sign is None:
+        return None
+    value = _float(trade.get("value"))
+    if value is None:
+        quantity = _float(trade.get("quantity"))
+        price = _float(trade.get("price"))
+        if quantity is None or price is None:
+            return None
+        value = quantity * price
+    return sign * abs(value)
+
+
+def _trades_from(trades: Iterable[Any], start_date: str) -> list[dict[str, Any]]:
+    return [
+        trade
+        for trade in trades
+        if isinstance(trade, dict) and _trade_day(trade) >= start_date
+    ]
+
+
+def _payouts_from(payouts: Iterable[Any], start_date: str) -> list[dict[str, Any]]:
+    return [
+        payout
+        for payout in payouts
+        if isinstance(payout, dict) and _payout_day(payout) >= start_date
+    ]
+
+
+def time_weighted_return(
+    points: list[tuple[str, float]],
+    start_date: str,
+    value: float,
+    today: str,
+    trades: list[Any],
+    payouts: list[Any],
+) -> float | None:
+    """Chain-linked daily time-weighted return (%) from ``start_date`` to now.
+
+    Each leg's growth is (close - net trade flow + dividends paid) / previous
+    close, with the flows of any days between two points booked on the later
+    one; the last leg runs from the latest point to the live ``value``.  None
+    when the series doesn't reach back before ``start_date``.
+    """
+    before = [point for point in points if point[0] < start_date]
+    if not before:
+        return None
+    flows: dict[str, float] = {}
+    for trade in _trades_from(trades, start_date):
+        flow = trade_flow(trade)
+        if flow:
+            flows[_trade_day(trade)] = flows.get(_trade_day(trade), 0.0) + flow
+    for payout in _payouts_from(payouts, start_date):
+        amount = _float(payout.get("amount"))
+        if amount:
+            day = _payout_day(payout)
+            flows[day] = flows.get(day, 0.0) - amount
+
+    legs = [point for point in points if start_date <= point[0] < today]
+    legs.append((today, value))
+    previous_day, previous_close = before[-1]
+    growth = 1.0
+    for day, close in legs:
+        if previous_close <= 0:
+            return None
+        leg_flow = sum(
+            flow for flow_day, flow in flows.items() if previous_day < flow_day <= day
+        )
+        growth *= (close - leg_flow) / previous_close
+        previous_day, previous_close = day, close
+    return round((growth - 1) * 100, 2)
+
+
+def _close_on_or_before(
+    points: list[tuple[str, float]], day: str
+) -> tuple[str, float] | None:
+    """Latest point dated ``day`` or earlier, if it's recent enough to stand in."""
+    earlier = [point for point in points if point[0] <= day]
+    if not earlier:
+        return None
+    point_day, _ = earlier[-1]
+    gap = date.fromisoformat(day) - date.fromisoformat(point_day)
+    return earlier[-1] if gap.days <= LOCAL_REPORT_MAX_POINT_GAP_DAYS else None
+
+
+def window_performance(
+    points: list[tuple[str, float]],
+    start_date: str,
+    end_date: str,
+    today: str,
+    live_value: float | None,
+    trades: list[Any],
+    payouts: list[Any],
+) -> dict[str, Any] | None:
+    """Performance report for ``start_date``..``end_date``, or None if not covered.
+
+    The start value is the close before ``start_date`` and the end value the
+    close on ``end_date`` (the live value for a window running to today); both
+    must sit within ``LOCAL_REPORT_MAX_POINT_GAP_DAYS`` of their day, and a
+    window ending after today isn't covered at all.  Currency
+    moves can't be told apart from prices here, so they stay in
+    ``capital_gain`` and ``currency_gain`` is None.  Percentages are Modified
+    Dietz: gains over the start value plus each trade flow weighted by the
+    share of the window it was invested for.
+    """
+    try:
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date)
+        if end > date.fromisoformat(today):
+            return None
+    except ValueError:
+        return None
+    if end < start:
+        return None
+    before = _close_on_or_before(points, f"{start - timedelta(days=1)}")
+    if before is None:
+        return None
+    start_value = before[1]
+    if f"{end}" == today and live_value is not None:
+        end_value = live_value
+    else:
+        closing = _close_on_or_before(points, f"{end}")
+        if closing is None or closing[0] < start_date:
+            return None
+        end_value = closing[1]
+
+    window_days = (end - start).days + 1
+    flow = weighted_flow = 0.0
+    for trade in _trades_from(trades, start_date):
+        trade_day = _trade_day(trade)
+        amount = trade_flow(trade)
+        if not amount or trade_day > f"{end}":
+            continue
+        flow += amount
+        held_days = window_days - (date.fromisoformat(trade_day) - start).days
+        weighted_flow += amount * held_days / window_days
+    paid = sum(
+        _float(payout.get("amount")) or 0.0
+        for payout in _payouts_from(payouts, start_date)
+        if _payout_day(payout) <= f"{end}"
+    )
+
+    capital_gain = end_value - start_value - flow
+    total_gain = capital_gain + paid
+    base = start_value + weighted_flow
+    return {
+        "start_date": start_date,
+        "end_date": f"{end}",
+        "start_value": round(start_value, 2),
+        "value": round(end_value, 2),
+        "capital_gain": round(capital_gain, 2),
+        "capital_gain_percent": _percent(capital_gain, base),
+        "payout_gain": round(paid, 2),
+        "payout_gain_percent": _percent(paid, base),
+        "currency_gain": None,
+        "currency_gain_percent": None,
+        "total_gain": round(total_gain, 2),
+        "total_gain_percent": _percent(total_gain, base),
+        "time_weighted_return_percent": time_weighted_return(
+            points, start_date, end_value, f"{end}", trades, payouts
+        ),
+    }
+
+
+def _capital_base(report: dict[str, Any]) -> float | None:
+    """The amount the report's percentages are taken against."""
+    total_gain = _float(report.get("total_gain"))
+    total_percent = _float(report.get("total_gain_percent"))
+    if total_gain and total_percent:
+        return total_gain / total_percent * 100
+    value = _float(report.get("value"))
+    if value is None or total_gain is None:
+        return None
+    return value - total_gain or None
+
+
+def _percent(gain: float, base: float | None) -> float | None:
+    return round(gain / base * 100, 2) if base else None
+
+
+@dataclass
+class _Anchor:
+    """The last report of one window plus what it already accounted for."""
+
+    start_date: str
+    report: dict[str, Any]
+    # Live portfolio value (combined report) when the report was fetched.
+    live_value: float
+    trade_keys: frozenset[str]
+    payout_keys: frozenset[str]
+    confirmed: bool = False
+
+
+class LocalPerformance:
+    """Anchors and confirmation state of every locally rolled window."""
+
+    def __init__(self) -> None:
+        """Start with nothing anchored; every window needs a report first."""
+        self._anchors: dict[str, _Anchor] = {}
+
+    def is_anchored(self, window: str, start_date: str | None) -> bool:
+        """Whether ``window`` has a report for this start date to roll from."""
+        anchor = self._anchors.get(window)
+        return anchor is not None and anchor.start_date == start_date
+
+    def is_confirmed(self, window: str, start_date: str | None) -> bool:
+        """Whether the roll-forward of ``window`` has matched its last report."""
+        anchor = self._anchors.get(window)
+        return (
+            anchor is not None and anchor.start_date == start_date and anchor.confirmed
+        )
+
+    def apply(
+        self,
+        data: dict[str, Any],
+        starts: dict[str, str],
+        fetched: set[str],
+        today: str,
+    ) -> None:
+        """Check and re-anchor fetched windows, roll the others forward in place.
+
+        ``starts`` maps each window to its current start date; ``data`` must
+        already hold the ledger-backed trades and payouts.
+        """
+        value = _float((data.get("report") or {}).get("value"))
+        if value is None:
+            return
+        trades = (data.get("trades") or {}).get("trades") or []
+        payouts = (data.get("payouts") or {}).get("payouts") or []
+        points = value_series_points(data.get("value_series"))
+        for window, start_date in starts.items():
+            if window in fetched and isinstance(data.get(window), dict):
+                self._check_and_anchor(
+                    window, data[window], start_date, value, trades, payouts
+                )
+                result = data[window]
+            else:
+                if not self.is_confirmed(window, start_date):
+                    continue
+                rolled = self._roll_forward(
+                    self._anchors[window], value, trades, payouts
+                )
+                if rolled is None:
+                    continue
+                result = data[window] = rolled
+            result["time_weighted_return_percent"] = time_weighted_return(
+                points, start_date, value, today, trades, payouts
+            )
+
+    def _check_and_anchor(
+        self,
+        window: str,
+        report: dict[str, Any],
+        start_date: str,
+        value: float,
+        trades: list[Any],
+        payouts: list[Any],
+    ) -> None:
+        confirmed = False
+        anchor = self._anchors.get(window)
+        if anchor is not None and anchor.start_date == start_date:
+            predicted = self._roll_forward(anchor, value, trades, payouts)
+            confirmed = predicted is not None and _matches(predicted, report)
+            if confirmed != anchor.confirmed:
+                _LOGGER.debug(
+                    "Local %s performance %s (predicted total gain %s, reported %s)",
+                    window,
+                    "confirmed" if confirmed else "no longer matches",
+                    predicted.get("total_gain") if predicted else None,
+                    report.get("total_gain"),
+                )
+        self._anchors[window] = _Anchor(
+            start_date=start_date,
+            report=dict(report),
+            live_value=value,
+            trade_keys=frozenset(
+                _record_key(trade, "transaction_date", "symbol", "quantity")
+                for trade in _trades_from(trades, start_date)
+            ),
+            payout_keys=frozenset(
+                _record_key(payout, "paid_on", "symbol", "amount")
+                for payout in _payouts_from(payouts, start_date)
+            ),
+            confirmed=confirmed,
+        )
+
+    @staticmethod
+    def _roll_forward(
+        anchor: _Anchor,
+        value: float,
+        trades: list[Any],
+        payouts: list[Any],
+    ) -> dict[str, Any] | None:
+        report = anchor.report
+        report_value = _float(report.get("value"))
+        if report_value is None or report.get("percentages_annualised"):
+            return None
+        flow = 0.0
+        for trade in _trades_from(trades, anchor.start_date):
+            key = _record_key(trade, "transaction_date", "symbol", "quantity")
+            if key not in anchor.trade_keys:
+                flow += trade_flow(trade) or 0.0
+        paid = 0.0
+        for payout in _payouts_from(payouts, anchor.start_date):
+            key = _record_key(payout, "paid_on", "symbol", "amount")
+            if key not in anchor.payout_keys:
+                paid += _float(payout.get("amount")) or 0.0
+
+        moved = value - anchor.live_value
+        gains = {field: _float(report.get(field)) or 0.0 for field in _GAIN_FIELDS}
+        gains["capital_gain"] += moved - flow
+        gains["payout_gain"] += paid
+        total = sum(gains.values())
+        base = _capital_base(report)
+        if base is not None:
+            base += flow
+
+        rolled = dict(report)
+        rolled["value"] = round(report_value + moved, 2)
+        rolled["total_gain"] = round(total, 2)
+        rolled["total_gain_percent"] = _percent(total, base)
+        for field, gain in gains.items():
+            rolled[field] = round(gain, 2)
+            rolled[f"{field}_percent"] = _percent(gain, base)
+        rolled["source"] = "local"
+        return rolled
+
+    def as_dict(self) -> dict[str, Any]:
+        """Per-window anchor start and confirmation, for diagnostics."""
+        return {
+            window: {"start_date": anchor.start_date, "confirmed": anchor.confirmed}
+            for window, anchor in sorted(self._anchors.items())
+        }
+
+
+def _matches(predicted: dict[str, Any], report: dict[str, Any]) -> bool:
+    """Whether a roll-forward landed within tolerance of the real report."""
+    reported_gain = _float(report.get("total_gain"))
+    if reported_gain is None:
+        return False
+    scale = max(abs(_float(report.get("value")) or 0.0), 1.0)
+    gain_miss = abs(predicted["total_gain"] - reported_gain)
+    if gain_miss > LOCAL_PERFORMANCE_VALUE_TOLERANCE * scale:
+        return False
+    reported_percent = _float(report.get("total_gain_percent"))
+    if reported_percent is None:
+        return True
+    predicted_percent = predicted.get("total_gain_percent")
+    return (
+        predicted_percent is not None
+        and abs(predicted_percent - reported_percent)
+        <= LOCAL_PERFORMANCE_PERCENT_TOLERANCE
+    )
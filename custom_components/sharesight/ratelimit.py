@@ -0,0 +1,244 @@
+"""Account-wide request budget for the Sharesight integration.
+
+Sharesight enforces its limits per consumer app (the OAuth client), not per
+portfolio: 360 requests a minute and three concurrent heavy reports across
+everything the app has in flight.  Each config entry used to carry its own
+semaphores, so four portfolios polling in the same minute each believed they
+had the whole budget to themselves and together tripped the 403 "Too many
+parallel requests" path.
+
+One ``SharesightRequestBudget`` now exists per OAuth app for the life of the
+process, and every coordinator using that app sends its requests through it:
+
+* a token bucket for the per-minute budget,
+* the shared heavy-report semaphore (performance / diversity / valuation), and
+* the general in-flight cap that used to be per portfolio.
+
+A rate-limit 403 seen by any coordinator is also recorded here, so the other
+portfolios on the same app sit the cooldown out instead of hitting the same
+wall one after another.
+
+The budget also keeps the API's own count: the ``X-MinuteRate-*`` headers of
+the latest response.  The bucket never holds more than they say remain, and
+``governor_level`` turns the remaining share into the poll-side response —
+shed optional endpoints, then stretch the interval — before a 403 forces it.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    DOMAIN,
+    GOVERNOR_NORMAL,
+    GOVERNOR_SHED,
+    GOVERNOR_THROTTLE,
+    RATE_GOVERNOR_RESERVE,
+    RATE_GOVERNOR_SHED_BELOW,
+    RATE_GOVERNOR_THROTTLE_BELOW,
+    RATE_HEADER_TTL_SECONDS,
+    SHARESIGHT_HEAVY_CONCURRENCY,
+    SHARESIGHT_MAX_PARALLEL_REQUESTS,
+    SHARESIGHT_MAX_REQUESTS_PER_MINUTE,
+    SHARESIGHT_REQUEST_BURST,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SharesightRequestBudget:
+    """Token bucket plus concurrency caps shared by one OAuth app.
+
+    The bucket holds ``burst`` tokens and refills at
+    ``(requests_per_minute - burst) / 60`` per second, so a full bucket
+    drained at once and refilled over the following minute still adds up to
+    exactly ``requests_per_minute`` in any 60-second window.  Sizing it as a
+    plain 360-token bucket refilling at 6/s would allow up to 720 in a
+    sliding minute — twice the ceiling — which is why the burst is carved out
+    of the budget rather than added on top of it.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = SHARESIGHT_MAX_REQUESTS_PER_MINUTE,
+        burst: int = SHARESIGHT_REQUEST_BURST,
+        heavy_concurrency: int = SHARESIGHT_HEAVY_CONCURRENCY,
+        max_parallel: int = SHARESIGHT_MAX_PARALLEL_REQUESTS,
+    ) -> None:
+        """Initialise a full bucket and the shared semaphores."""
+        self._capacity = float(max(1, min(burst, requests_per_minute - 1)))
+        self._refill_per_second = (requests_per_minute - self._capacity) / 60.0
+        self._tokens = self._capacity
+        self._refilled_at = time.monotonic()
+        # Waiters queue on the lock, so tokens are handed out first come,
+        # first served across every portfolio on the app.
+        self._lock = asyncio.Lock()
+        self.heavy_semaphore = asyncio.Semaphore(heavy_concurrency)
+        self.request_semaphore = asyncio.Semaphore(max_parallel)
+        # App-wide "stop sending" deadline (monotonic) after a rate-limit 403.
+        self.cooldown_until: float = 0.0
+        # Config entry ids currently routing requests through this budget.
+        self.consumers: set[str] = set()
+        self.requests_sent: int = 0
+        # Latest X-MinuteRate-Limit / -Remaining reading and when (monotonic)
+        # it arrived; None until the first response carrying them.
+        self.server_limit: int | None = None
+        self.server_remaining: int | None = None
+        self._server_observed_at: float = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        if elapsed > 0:
+            self._tokens = min(
+                self._capacity, self._tokens + elapsed * self._refill_per_second
+            )
+            self._refilled_at = now
+
+    @property
+    def tokens_available(self) -> float:
+        """Tokens in the bucket right now (fractional while refilling)."""
+        self._refill(time.monotonic())
+        return self._tokens
+
+    async def async_acquire(self) -> float:
+        """Wait for one request token; return the seconds spent waiting."""
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self.requests_sent += 1
+                    return now - started
+                await asyncio.sleep((1.0 - self._tokens) / self._refill_per_second)
+
+    @asynccontextmanager
+    async def async_slot(
+        self, heavy: bool = False, metered: bool = True
+    ) -> AsyncIterator[None]:
+        """Hold an in-flight slot (and a heavy slot when asked) for one request.
+
+        The token is taken last, once the request is actually about to go out,
+        so a request queued behind the heavy cap never burns budget while it
+        waits.  ``metered=False`` skips the token for the endpoints Sharesight
+        exempts from the minute budget (single sign-on).
+        """
+        async with self.request_semaphore:
+            if heavy:
+                async with self.heavy_semaphore:
+                    if metered:
+                        await self.async_acquire()
+                    yield
+                return
+            if metered:
+                await self.async_acquire()
+            yield
+
+    def observe_minute_rate(self, limit: int, remaining: int) -> None:
+        """Fold the API's own count of the minute budget into the bucket.
+
+        Requests from other clients of the same app (or ones sent just before
+        a restart) draw on the budget without passing through this bucket, so
+        the server's figure wins whenever it is the lower one.  Only ever
+        clamps down: responses land out of order, and a stale higher count
+        must not hand back tokens.
+        """
+        now = time.monotonic()
+        self.server_limit = limit
+        self.server_remaining = remaining
+        self._server_observed_at = now
+        self._refill(now)
+        self._tokens = min(
+            self._tokens, float(max(0, remaining - RATE_GOVERNOR_RESERVE))
+        )
+
+    @property
+    def rate_headroom(self) -> float | None:
+        """Share of the minute budget the API last reported left, if recent."""
+        if not self.server_limit or self.server_remaining is None:
+            return None
+        if time.monotonic() - self._server_observed_at > RATE_HEADER_TTL_SECONDS:
+            return None
+        return max(0.0, self.server_remaining / self.server_limit)
+
+    def governor_level(self) -> str:
+        """How hard polls on this app should back off right now."""
+        headroom = self.rate_headroom
+        if headroom is None:
+            return GOVERNOR_NORMAL
+        if headroom < RATE_GOVERNOR_THROTTLE_BELOW:
+            return GOVERNOR_THROTTLE
+        if headroom < RATE_GOVERNOR_SHED_BELOW:
+            return GOVERNOR_SHED
+        return GOVERNOR_NORMAL
+
+    def register_cooldown(self, duration: timedelta) -> None:
+        """Hold every coordinator on this app back for ``duration``."""
+        self.cooldown_until = max(
+            self.cooldown_until, time.monotonic() + duration.total_seconds()
+        )
+        # Sharesight has already counted us as over the minute budget, so
+        # don't resume with a full bucket either.
+        self._tokens = 0.0
+        self._refilled_at = time.monotonic()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Point-in-time state for diagnostics."""
+        return {
+            "tokens_available": round(self.tokens_available, 2),
+            "capacity": self._capacity,
+            "refill_per_second": round(self._refill_per_second, 3),
+            "heavy_slots_free": self.heavy_semaphore._value,
+            "request_slots_free": self.request_semaphore._value,
+            "cooldown_remaining_s": max(
+                0, int(self.cooldown_until - time.monotonic())
+            ),
+            "requests_sent": self.requests_sent,
+            "consumers": len(self.consumers),
+            "server_limit": self.server_limit,
+            "server_remaining": self.server_remaining,
+            "governor": self.governor_level(),
+        }
+
+
+DATA_REQUEST_BUDGETS: HassKey[dict[str, SharesightRequestBudget]] = HassKey(
+    f"{DOMAIN}_request_budgets"
+)
+
+
+def request_budget_key(account_type: str, implementation: Any) -> str:
+    """Identify the OAuth app an entry authenticates through.
+
+    Application-credential implementations expose their ``client_id``; the
+    implementation ``domain`` (the credential id) is the fallback.  The
+    account type is part of the key because standard and developer
+    deployments keep separate app registries and separate budgets.
+    """
+    app_id = getattr(implementation, "client_id", None) or getattr(
+        implementation, "domain", DOMAIN
+    )
+    return f"{account_type}:{app_id}"
+
+
+@callback
+def async_get_request_budget(hass: HomeAssistant, key: str) -> SharesightRequestBudget:
+    """Return the process-wide budget for ``key``, creating it on first use.
+
+    Budgets outlive config entry reloads on purpose: reloading an entry must
+    not hand it a fresh minute's worth of tokens the API hasn't.
+    """
+    budgets = hass.data.setdefault(DATA_REQUEST_BUDGETS, {})
+    budget = budgets.get(key)
+    if budget is None:
+        budget = budgets[key] = SharesightRequestBudget()
+        _LOGGER.debug("Created Sharesight request budget for a new OAuth app")
+    return budget
@@ -0,0 +1,99 @@
+"""Per-endpoint refresh scheduling for the coordinator's poll.
+
+Tiered polling used to be one switch: every 12th poll re-fetched the
+financial-year / one-month / YTD windows and the value series, and everything
+else went out on every poll — including near-static endpoints like the user
+profile, market trading hours and the user's settings.
+
+Each endpoint now declares how stale it may get (``ENDPOINT_REFRESH_PERIODS``
+in const.py), optionally with a longer period for when every held market is
+shut (``ENDPOINT_CLOSED_MARKET_PERIODS``): price-driven reports then move
+every poll while trading and hardly at all overnight.  An endpoint with no
+data yet is always due, whatever its period, and a poll that skips one carries
+its last value forward the way the slow windows always were.
+
+Endpoints are identified by their extension key, or by the last path segment
+for the ones merged at the top level (``benchmark``).
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+# A poll landing this close before the due time counts as on time, so a
+# period that is an exact multiple of the poll interval doesn't slip a whole
+# extra poll to timer jitter.
+_DUE_SLACK = timedelta(seconds=30)
+
+
+def schedule_key(endpoint: list[Any]) -> str:
+    """The name an endpoint is scheduled (and carried forward) under."""
+    return endpoint[3] or str(endpoint[1]).rsplit("/", 1)[-1]
+
+
+class EndpointScheduler:
+    """Next-due times per endpoint, from each endpoint's refresh period."""
+
+    def __init__(
+        self,
+        periods: Mapping[str, timedelta],
+        closed_market_periods: Mapping[str, timedelta] | None = None,
+    ) -> None:
+        """``periods`` apply always, or while markets trade when the key also
+        has a ``closed_market_periods`` entry; unlisted endpoints go every poll."""
+        self._periods = periods
+        self._closed_market_periods = closed_market_periods or {}
+        # Runtime floors set by the coordinator (see set_min_period).
+        self._min_periods: dict[str, timedelta] = {}
+        self._next_due: dict[str, datetime] = {}
+
+    def is_scheduled(self, key: str) -> bool:
+        """Whether ``key`` refreshes on its own period rather than every poll."""
+        return (
+            key in self._periods
+            or key in self._closed_market_periods
+            or key in self._min_periods
+        )
+
+    def keys(self) -> set[str]:
+        """Every endpoint key with a refresh period."""
+        return (
+            set(self._periods) | set(self._closed_market_periods) | set(self._min_periods)
+        )
+
+    def is_due(self, key: str, now: datetime, have_data: bool) -> bool:
+        """Whether ``key`` should be fetched this poll."""
+        if not have_data:
+            return True
+        due = self._next_due.get(key)
+        return due is None or now + _DUE_SLACK >= due
+
+    def mark_fetched(self, key: str, now: datetime, markets_open: bool | None) -> None:
+        """Record a successful fetch; ``markets_open`` None counts as open."""
+        period = self._periods.get(key, timedelta(0))
+        if markets_open is False:
+            period = self._closed_market_periods.get(key, period)
+        self._next_due[key] = now + max(period, self._min_periods.get(key, period))
+
+    def set_min_period(self, key: str, period: timedelta | None) -> None:
+        """Stretch ``key`` to at least ``period`` (e.g. a window computed
+        locally in between); None lifts the floor and makes it due at once."""
+        if period is not None:
+            self._min_periods[key] = period
+        elif self._min_periods.pop(key, None) is not None:
+            self._next_due.pop(key, None)
+
+    def force(self, *keys: str) -> None:
+        """Make ``keys`` due on the next poll (e.g. a financial-year rollover)."""
+        for key in keys:
+            self._next_due.pop(key, None)
+
+    def as_dict(self) -> dict[str, str]:
+        """Next due time per scheduled endpoint (UTC ISO), for diagnostics."""
+        return {
+            key: dt_util.as_utc(due).isoformat()
+            for key, due in sorted(self._next_due.items())
+        }
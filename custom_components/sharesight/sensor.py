@@ -1176,7 +1176,12 @@ class SharesightSensor(SharesightBaseEntity, SensorEntity):
                 else:
                     self._state = None
                 self._unique_id = f"{self._portfolio_id}_holding_{local_name}_{self._sub_key}_{self._key}_{APP_VERSION}"
-            elif self._key in ("holding_fundamental", "holding_income", "holding_trade"):
+            elif self._key in (
+                "holding_fundamental",
+                "holding_income",
+                "holding_trade",
+                "holding_official_cost",
+            ):
                 # Per-holding derived sensor — state computed in native_value.
                 self._state = None
                 self._unique_id = f"{self._portfolio_id}_holding_{local_name}_{self._sub_key}_{self._key}_{APP_VERSION}"
@@ -1852,15 +1857,14 @@ class SharesightSensor(SharesightBaseEntity, SensorEntity):
                     except (ValueError, TypeError, ZeroDivisionError):
                         return None
                 elif self._key == "upcoming_dividends_count":
-                    # Historic payouts (inception→today) plus the dedicated
-                    # forward window (today→+1y) the coordinator fetches.
+                    # Paid payouts plus the announced ones of the year ahead;
+                    # the coordinator puts each payout in exactly one list.
                     payouts = (income_data.get('payouts', []) or []) + (
                         income_data.get('upcoming_payouts', []) or []
                     )
                     if not payouts:
                         return 0
                     today_iso = dt_util.now().date().isoformat()
-                    seen: set[tuple] = set()
                     count = 0
                     for p in payouts:
                         if not isinstance(p, dict):
@@ -1870,13 +1874,8 @@ class SharesightSensor(SharesightBaseEntity, SensorEntity):
                             or p.get('ex_date')
                             or p.get('paid_on')
                         )
-                        if not ex or str(ex)[:10] < today_iso:
-                            continue
-                        dedupe_key = (p.get('id'), str(ex)[:10], p.get('amount'))
-                        if dedupe_key in seen:
-                            continue
-                        seen.add(dedupe_key)
-                        count += 1
+                        if ex and str(ex)[:10] >= today_iso:
+                            count += 1
                     return count
                 elif self._key == "dividends_received_cash":
                     cash_tx_data = self._coordinator.data.get('cash_account_transactions', {})
@@ -2381,6 +2380,16 @@ class SharesightSensor(SharesightBaseEntity, SensorEntity):
                     "net_shares": "net_shares",
                 }
                 return entry.get(trade_field_map.get(self._sub_key, self._sub_key))
+            # Per-holding official costs (prefetched, see official_costs.py)
+            elif self._key == "holding_official_cost":
+                holdings_list = self._coordinator.data.get('holdings', {}).get('holdings', [])
+                holding = _find_holding_by_symbol(holdings_list, self._local_name)
+                if holding is None or holding.get("id") is None:
+                    return None
+                costs = self._coordinator.official_costs.get(holding["id"]) or {}
+                if self._sub_key == "official_average_price":
+                    return (costs.get("average_purchase_price") or {}).get("value")
+                return (costs.get("cost_base") or {}).get("total_value")
             # Portfolio sector / industry allocation
             elif self._sub_key in ("sector_allocation", "industry_allocation"):
                 alloc = self._coordinator.data.get(self._sub_key, {})
@@ -2584,19 +2593,25 @@ class SharesightSensor(SharesightBaseEntity, SensorEntity):
                     except AttributeError:
                         return None
                 if self._key == "optional_endpoints_on_cooldown":
-                    cooldown = getattr(self._coordinator, '_optional_endpoint_cooldowns', None)
                     cash_cooldown = getattr(self._coordinator, '_cash_tx_account_cooldowns', None)
                     now = monotonic()
-                    active = 0
-                    if isinstance(cooldown, dict):
-                        for info in cooldown.values():
-                            if isinstance(info, dict) and info.get("next_retry", 0) > now:
-                                active += 1
+                    active = len(self._coordinator.breakers.open_remaining())
                     if isinstance(cash_cooldown, dict):
                         for info in cash_cooldown.values():
                             if isinstance(info, dict) and info.get("next_retry", 0) > now:
                                 active += 1
                     return active
+                if self._key == "minute_rate_remaining":
+                    # X-MinuteRate-Remaining from the latest response on this
+                    # OAuth app — shared by every portfolio on it.
+                    return self._coordinator._request_budget.server_remaining
+                if self._key == "holding_limit":
+                    # Only set while the plan caps a holdings report.
+                    holding_limit = self._coordinator.holding_limit
+                    return holding_limit.get("limit") if holding_limit else None
+                if self._key in ("poll_duration", "poll_requests", "slowest_endpoint"):
+                    # Totals of the last finished poll (see metrics.py).
+                    return (self._coordinator.metrics.last_poll or {}).get(self._key)
                 return None
             else:
                 return self._coordinator.data[self._sub_key][0][self._key]
@@ -2809,6 +2824,35 @@ class SharesightSensor(SharesightBaseEntity, SensorEntity):
                     ],
                 }
 
+            # Rate governor state behind API Requests Remaining.
+            if self._sub_key == "_integration" and self._key == "minute_rate_remaining":
+                budget = self._coordinator._request_budget
+                return {
+                    "limit": budget.server_limit,
+                    "governor": self._coordinator.governor_level,
+                    "shed_endpoints": list(self._coordinator.shed_endpoints),
+                }
+
+            # Holding Limit — the plan cap headers of the latest capped report.
+            if self._sub_key == "_integration" and self._key == "holding_limit":
+                holding_limit = self._coordinator.holding_limit
+                if not holding_limit:
+                    return None
+                return {
+                    "holdings_total": holding_limit.get("total"),
+                    "reason": holding_limit.get("reason"),
+                }
+
+            # Slowest Endpoint — how long it took, and the poll's payload.
+            if self._sub_key == "_integration" and self._key == "slowest_endpoint":
+                last_poll = self._coordinator.metrics.last_poll
+                if not last_poll:
+                    return None
+                return {
+                    "latency_seconds": last_poll.get("slowest_latency"),
+                    "poll_bytes": last_poll.get("poll_bytes"),
+                }
+
             # Value Change 30d — the value-trend sparkline series (W6).
             if self._sub_key == "value_trend" and self._key == "change_30d_percent":
                 trend = data.get("value_trend", {})
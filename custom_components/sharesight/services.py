@@ -1,16 +1,21 @@
 """Response services for the Sharesight integration.
 
-Six SupportsResponse.ONLY services that mine the data the coordinator already
-holds (or, for the last three, make a single on-demand call) and return it as a
-structured response for scripts/templates:
+Eight SupportsResponse.ONLY services that mine the data the coordinator already
+holds (or, for generate_performance_report through get_login_link, make
+on-demand calls) and return it as a structured response for scripts/templates:
 
 - get_portfolio_summary   — headline value / period gains / movers / income.
 - get_holdings            — sortable, limitable holdings list.
 - get_income              — trailing / YTD / forward dividend income.
-- generate_performance_report — arbitrary date-range performance report.
+- generate_performance_report — arbitrary date-range performance report,
+  computed locally when the held value series covers it.
 - get_instrument_fundamentals — per-instrument sharechecker + official cost
   figures for one held symbol (one-shot mobile/V3 calls).
+- get_holdings_fundamentals — the same for a list of held symbols, or every
+  holding, in one response.
 - get_login_link          — a one-minute single-sign-on URL for the portfolio.
+- export_poll_trace       — writes the recent polls' phase traces (tracing.py)
+  to a Chrome trace-event JSON file in the config directory.
 
 Each service selects the portfolio via an optional config_entry_id or
 device_id, falling back to the sole configured portfolio and raising a clear
@@ -22,6 +27,7 @@ coordinator method it calls) at any level.
 """
 from __future__ import annotations
 
+import asyncio
 import functools
 import logging
 from datetime import datetime
@@ -39,10 +45,16 @@ from homeassistant.core import (
 )
 from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.json import save_json
 
 from . import analytics
-from .const import DOMAIN
+from .const import DOMAIN, FUNDAMENTALS_BATCH_CONCURRENCY
 from .data import SharesightConfigEntry
+from .official_costs import (
+    currency_code,
+    extract_average_purchase_price,
+    extract_cost_base,
+)
 from .sensor import (
     _get_holding_gain,
     _get_holding_gain_percent,
@@ -59,7 +71,9 @@ SERVICE_GET_HOLDINGS = "get_holdings"
 SERVICE_GET_INCOME = "get_income"
 SERVICE_GENERATE_PERFORMANCE_REPORT = "generate_performance_report"
 SERVICE_GET_INSTRUMENT_FUNDAMENTALS = "get_instrument_fundamentals"
+SERVICE_GET_HOLDINGS_FUNDAMENTALS = "get_holdings_fundamentals"
 SERVICE_GET_LOGIN_LINK = "get_login_link"
+SERVICE_EXPORT_POLL_TRACE = "export_poll_trace"
 
 _SERVICES = (
     SERVICE_GET_PORTFOLIO_SUMMARY,
@@ -67,7 +81,9 @@ _SERVICES = (
     SERVICE_GET_INCOME,
     SERVICE_GENERATE_PERFORMANCE_REPORT,
     SERVICE_GET_INSTRUMENT_FUNDAMENTALS,
+    SERVICE_GET_HOLDINGS_FUNDAMENTALS,
     SERVICE_GET_LOGIN_LINK,
+    SERVICE_EXPORT_POLL_TRACE,
 )
 
 CONF_CONFIG_ENTRY_ID = "config_entry_id"
@@ -79,6 +95,7 @@ CONF_GROUPING = "grouping"
 CONF_CONSOLIDATED = "consolidated"
 CONF_INCLUDE_SALES = "include_sales"
 CONF_SYMBOL = "symbol"
+CONF_SYMBOLS = "symbols"
 
 # Holdings sort keys map onto the response dict keys, so a single name both
 # selects the sort field and matches the returned column.
@@ -114,7 +131,14 @@ GET_INSTRUMENT_FUNDAMENTALS_SCHEMA = vol.Schema(
         vol.Required(CONF_SYMBOL): cv.string,
     }
 )
+GET_HOLDINGS_FUNDAMENTALS_SCHEMA = vol.Schema(
+    {
+        **_TARGET_FIELDS,
+        vol.Optional(CONF_SYMBOLS): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
 GET_LOGIN_LINK_SCHEMA = vol.Schema({**_TARGET_FIELDS})
+EXPORT_POLL_TRACE_SCHEMA = vol.Schema({**_TARGET_FIELDS})
 
 
 def _loaded_entries(hass: HomeAssistant) -> list[SharesightConfigEntry]:
@@ -247,39 +271,42 @@ def _total_cash(report: dict[str, Any]) -> float:
     return round(total, 2)
 
 
-def _resolve_instrument(
-    coordinator: Any, symbol: str
-) -> tuple[Any, Any, str | None]:
-    """Resolve a symbol to its (instrument_id, holding_id, symbol) in-portfolio.
+def _held_instruments(coordinator: Any) -> dict[str, tuple[Any, Any, str]]:
+    """Every held symbol (upper-cased) -> its (instrument_id, holding_id, symbol).
 
-    Matches case-insensitively against the coordinator's current holdings.  The
-    instrument id drives the sharechecker call and the holding id the official
-    cost calls; either can be None when the match lacks it (a holding always
-    has an id, so cost figures are available for any held symbol).  Returns
-    ``(None, None, None)`` when the symbol is not held.
+    The instrument id drives the sharechecker call and the holding id the
+    official cost calls; either can be None when the holding lacks it (a
+    holding always has an id, so cost figures are available for any held
+    symbol).  The first holding of a symbol wins.
     """
     data: dict[str, Any] = coordinator.data or {}
     holdings_data = data.get("holdings", {}) if isinstance(data.get("holdings"), dict) else {}
-    target = (symbol or "").strip().upper()
-    if not target:
-        return None, None, None
+    held: dict[str, tuple[Any, Any, str]] = {}
     for holding in holdings_data.get("holdings", []) or []:
         if not isinstance(holding, dict):
             continue
-        hsym = (_get_holding_symbol(holding) or "").upper()
-        if hsym and hsym == target:
-            instrument = holding.get("instrument") or {}
-            instrument_id = instrument.get("id") or holding.get("instrument_id")
-            holding_id = holding.get("id") or holding.get("holding_id")
-            return instrument_id, holding_id, _get_holding_symbol(holding)
-    return None, None, None
+        hsym = _get_holding_symbol(holding)
+        if not hsym or hsym.upper() in held:
+            continue
+        instrument = holding.get("instrument") or {}
+        instrument_id = instrument.get("id") or holding.get("instrument_id")
+        holding_id = holding.get("id") or holding.get("holding_id")
+        held[hsym.upper()] = (instrument_id, holding_id, hsym)
+    return held
+
 
+def _resolve_instrument(
+    coordinator: Any, symbol: str
+) -> tuple[Any, Any, str | None]:
+    """Resolve a symbol to its (instrument_id, holding_id, symbol) in-portfolio.
 
-def _currency_code(obj: Any) -> Any:
-    """3-letter code from a Sharesight currency object (or a bare string)."""
-    if isinstance(obj, dict):
-        return obj.get("code")
-    return obj
+    Matches case-insensitively against the coordinator's current holdings.
+    Returns ``(None, None, None)`` when the symbol is not held.
+    """
+    target = (symbol or "").strip().upper()
+    if not target:
+        return None, None, None
+    return _held_instruments(coordinator).get(target, (None, None, None))
 
 
 def _extract_sharechecker(resp: Any) -> dict[str, Any]:
@@ -325,42 +352,11 @@ def _extract_sharechecker(resp: Any) -> dict[str, Any]:
         "price": {
             "value": price.get("value"),
             "timestamp": price.get("timestamp"),
-            "currency": _currency_code(price.get("currency")),
+            "currency": currency_code(price.get("currency")),
         },
     }
 
 
-def _extract_average_purchase_price(resp: Any) -> Any:
-    """Curate the V3 average-purchase-price payload; pass errors through."""
-    if not isinstance(resp, dict):
-        return None
-    if "error" in resp:
-        return resp
-    inner = resp.get("average_purchase_price")
-    if not isinstance(inner, dict):
-        return None
-    return {
-        "value": inner.get("value"),
-        "currency": _currency_code(inner.get("currency")),
-    }
-
-
-def _extract_cost_base(resp: Any) -> Any:
-    """Curate the V3 cost-base payload; pass errors through."""
-    if not isinstance(resp, dict):
-        return None
-    if "error" in resp:
-        return resp
-    inner = resp.get("cost_base")
-    if not isinstance(inner, dict):
-        return None
-    return {
-        "total_value": inner.get("total_value"),
-        "value_per_share": inner.get("value_per_share"),
-        "currency": _currency_code(inner.get("currency")),
-    }
-
-
 async def _get_portfolio_summary(
     hass: HomeAssistant, call: ServiceCall
 ) -> ServiceResponse:
@@ -533,23 +529,42 @@ async def _get_instrument_fundamentals(
             translation_placeholders={"symbol": str(symbol)},
         )
 
-    # Sharechecker fundamentals + the two official cost figures.  Each
-    # coordinator call tolerates a gated/absent (mobile-scoped) endpoint and
-    # returns an {"error": ...} envelope rather than raising, so surface
-    # whichever succeeded.
-    sharechecker = await coordinator.async_get_sharechecker(instrument_id)
+    return await _async_fundamentals(
+        coordinator, instrument_id, holding_id, resolved_symbol or symbol
+    )
+
+
+async def _async_fundamentals(
+    coordinator: Any, instrument_id: Any, holding_id: Any, symbol: str
+) -> dict[str, Any]:
+    """Sharechecker fundamentals + the two official cost figures of one holding.
+
+    Official costs the background prefetch still holds fresh are served
+    without a request; the rest go out together.  Each coordinator call
+    tolerates a gated/absent (mobile-scoped) endpoint and returns an
+    {"error": ...} envelope rather than raising, so surface whichever
+    succeeded.
+    """
+    prefetched = (
+        coordinator.fresh_official_costs(holding_id) if holding_id is not None else None
+    )
+    calls = [coordinator.async_get_sharechecker(instrument_id)]
+    if holding_id is not None and prefetched is None:
+        calls.append(coordinator.async_get_official_costs(holding_id))
+    sharechecker, *rest = await asyncio.gather(*calls)
     average_purchase_price: Any = None
     cost_base: Any = None
-    if holding_id is not None:
-        costs = await coordinator.async_get_official_costs(holding_id)
-        if isinstance(costs, dict):
-            average_purchase_price = _extract_average_purchase_price(
-                costs.get("average_purchase_price")
-            )
-            cost_base = _extract_cost_base(costs.get("cost_base"))
+    if prefetched is not None:
+        average_purchase_price = prefetched.get("average_purchase_price")
+        cost_base = prefetched.get("cost_base")
+    elif rest and isinstance(rest[0], dict):
+        average_purchase_price = extract_average_purchase_price(
+            rest[0].get("average_purchase_price")
+        )
+        cost_base = extract_cost_base(rest[0].get("cost_base"))
 
     return {
-        "symbol": resolved_symbol or symbol,
+        "symbol": symbol,
         "instrument_id": instrument_id,
         "holding_id": holding_id,
         "sharechecker": _extract_sharechecker(sharechecker),
@@ -558,6 +573,43 @@ async def _get_instrument_fundamentals(
     }
 
 
+async def _get_holdings_fundamentals(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    coordinator = _resolve_coordinator(hass, call)
+    held = _held_instruments(coordinator)
+    requested = call.data.get(CONF_SYMBOLS)
+    if requested:
+        symbols = list(dict.fromkeys(s.strip() for s in requested if s.strip()))
+    else:
+        symbols = [resolved for _, _, resolved in held.values()]
+    not_held = [symbol for symbol in symbols if symbol.upper() not in held]
+
+    # Fan out a few holdings at a time: every request still queues on the
+    # app's request budget, so the batch runs as fast as the budget allows
+    # without flooding it, and repeats come from the service cache.
+    semaphore = asyncio.Semaphore(FUNDAMENTALS_BATCH_CONCURRENCY)
+
+    async def _one(symbol: str) -> dict[str, Any]:
+        instrument_id, holding_id, resolved = held[symbol.upper()]
+        async with semaphore:
+            try:
+                return await _async_fundamentals(
+                    coordinator, instrument_id, holding_id, resolved
+                )
+            except Exception as err:  # noqa: BLE001 — one symbol must not sink the batch
+                return {"symbol": resolved, "error": str(err)}
+
+    instruments = await asyncio.gather(
+        *(_one(symbol) for symbol in symbols if symbol.upper() in held)
+    )
+    return {
+        "instruments": list(instruments),
+        "count": len(instruments),
+        "not_held": not_held,
+    }
+
+
 async def _get_login_link(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
     coordinator = _resolve_coordinator(hass, call)
     # SECURITY: async_get_sso_link never logs the URL/response, and neither
@@ -574,6 +626,18 @@ async def _get_login_link(hass: HomeAssistant, call: ServiceCall) -> ServiceResp
     return {"login_url": None, "error": "Single sign-on link unavailable"}
 
 
+async def _export_poll_trace(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    coordinator = _resolve_coordinator(hass, call)
+    trace = coordinator.tracer.chrome_trace()
+    path = hass.config.path(f"{DOMAIN}_trace_{coordinator.entry.entry_id}.json")
+    await hass.async_add_executor_job(save_json, path, trace)
+    return {
+        "path": path,
+        "polls": len(coordinator.tracer.polls),
+        "events": len(trace["traceEvents"]),
+    }
+
+
 def async_setup_services(hass: HomeAssistant) -> None:
     """Register the Sharesight response services (idempotent, domain-global)."""
     definitions = (
@@ -590,7 +654,13 @@ def async_setup_services(hass: HomeAssistant) -> None:
             _get_instrument_fundamentals,
             GET_INSTRUMENT_FUNDAMENTALS_SCHEMA,
         ),
+        (
+            SERVICE_GET_HOLDINGS_FUNDAMENTALS,
+            _get_holdings_fundamentals,
+            GET_HOLDINGS_FUNDAMENTALS_SCHEMA,
+        ),
         (SERVICE_GET_LOGIN_LINK, _get_login_link, GET_LOGIN_LINK_SCHEMA),
+        (SERVICE_EXPORT_POLL_TRACE, _export_poll_trace, EXPORT_POLL_TRACE_SCHEMA),
     )
     for name, handler, schema in definitions:
         if hass.services.has_service(DOMAIN, name):
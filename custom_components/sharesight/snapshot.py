@@ -0,0 +1,96 @@
+"""Persisted snapshot of a portfolio's last good coordinator data.
+
+Setup used to block on ``async_config_entry_first_refresh``: the full
+required, optional and cash-transaction fan-out ran before a single entity
+existed, so after every restart the dashboards sat blank for 10–40 s — longer
+when a heavy report was slow.
+
+After each successful poll the coordinator now saves a compact copy of its
+data here.  At setup a snapshot no older than the configured maximum age is
+restored instead, the entities come up on it at once, and the first live poll
+runs in the background.  An older snapshot is treated as stale and ignored;
+setup then waits for the live fetch exactly as before.
+
+"Compact" means nothing that can be rebuilt is written twice: the trade,
+payout and cash transaction histories already live in the ledgers (see
+ledger.py) and are re-attached on restore, and the activity event batch is
+dropped so a restart never replays it.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY, SNAPSHOT_STORAGE_VERSION
+
+# Top-level data keys never written to the snapshot.
+_EXCLUDED_KEYS = frozenset(
+    {
+        "activity_events",
+        "activity_events_seq",
+        "cash_account_transactions",
+        "payouts",
+        "trades",
+    }
+)
+
+
+def compact_data(data: dict[str, Any]) -> dict[str, Any]:
+    """Coordinator data minus the ledger-backed lists and the event batch."""
+    compact = {key: value for key, value in data.items() if key not in _EXCLUDED_KEYS}
+    income_report = compact.get("income_report")
+    if isinstance(income_report, dict):
+        compact["income_report"] = {**income_report, "payouts": []}
+    return compact
+
+
+class SharesightSnapshot:
+    """The Store holding one config entry's snapshot."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Bind to the entry's snapshot file."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass,
+            SNAPSHOT_STORAGE_VERSION,
+            f"{DOMAIN}.{entry_id}.snapshot",
+            private=True,
+        )
+
+    async def async_load(
+        self, portfolio_id: Any
+    ) -> tuple[datetime, dict[str, Any]] | None:
+        """``(saved_at, compact data)`` of the saved snapshot, if usable."""
+        stored = await self._store.async_load()
+        if not isinstance(stored, dict):
+            return None
+        if str(stored.get("portfolio_id")) != str(portfolio_id):
+            return None
+        saved_at = dt_util.parse_datetime(str(stored.get("saved_at") or ""))
+        data = stored.get("data")
+        if saved_at is None or not isinstance(data, dict) or not data:
+            return None
+        return saved_at, data
+
+    @callback
+    def async_schedule_save(
+        self, portfolio_id: Any, data_func: Callable[[], dict[str, Any]]
+    ) -> None:
+        """Save the snapshot shortly; ``data_func`` is only run at write time."""
+        saved_at = dt_util.utcnow().isoformat()
+        self._store.async_delay_save(
+            lambda: {
+                "portfolio_id": portfolio_id,
+                "saved_at": saved_at,
+                "data": data_func(),
+            },
+            SNAPSHOT_SAVE_DELAY,
+        )
+
+    async def async_remove(self) -> None:
+        """Delete the snapshot (the entry is being removed)."""
+        await self._store.async_remove()
@@ -0,0 +1,141 @@
+"""Staggered poll slots and coalesced on-demand refreshes across entries.
+
+Every config entry started its ``update_interval`` clock at boot, so the
+portfolios on one OAuth app polled on the same second, interval after
+interval, and their heavy reports all queued for the app's three heavy slots
+at once.  Pressing Refresh on several portfolios (or an automation pressing
+them all) did the same on demand.
+
+``poll_delay`` now gives each entry its own slot of the interval: the entries
+on an app are ordered by entry id and spread evenly across it, and a few
+seconds of jitter keep them (and other apps) off exact seconds.  Slots are
+reckoned on the wall clock, so they hold however long each poll takes.
+
+On-demand refreshes go through the app's ``SharesightRefreshQueue``: presses
+landing within ``MANUAL_REFRESH_COALESCE_WINDOW`` of each other are gathered,
+repeat presses of a portfolio already waiting fold into one, and the queued
+portfolios refresh one after another rather than all at once — the later
+ones then mostly find the account-level responses in the app's cache.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from collections.abc import Callable, Coroutine, Iterable
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    DOMAIN,
+    MANUAL_REFRESH_COALESCE_WINDOW,
+    POLL_JITTER_SECONDS,
+    POLL_JITTER_SHARE,
+    POLL_STAGGER_ANCHORED_SPREAD,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def poll_delay(
+    entry_id: str,
+    peers: Iterable[str],
+    interval: float,
+    now: float,
+    *,
+    anchored: bool = False,
+) -> float:
+    """Seconds from ``now`` (wall clock) until ``entry_id``'s next poll.
+
+    The interval is cut into one slot per peer, and the poll goes to the
+    entry's slot nearest one interval from now: between half an interval and
+    one and a half away, one interval on average.  An ``anchored`` interval
+    (aimed just past a market open or close) is never shortened; the peers
+    spread over ``POLL_STAGGER_ANCHORED_SPREAD`` after it instead.
+    """
+    ordered = sorted(peers)
+    jitter = random.uniform(0.0, min(POLL_JITTER_SECONDS, interval * POLL_JITTER_SHARE))
+    if len(ordered) < 2 or entry_id not in ordered:
+        return interval + jitter
+    share = ordered.index(entry_id) / len(ordered)
+    if anchored:
+        return interval + share * min(interval, POLL_STAGGER_ANCHORED_SPREAD) + jitter
+    # How far the entry's slot lies past the point one interval from now,
+    # folded into [-interval / 2, interval / 2).
+    offset = (share * interval - (now + interval)) % interval
+    if offset >= interval / 2:
+        offset -= interval
+    return interval + offset + jitter
+
+
+class SharesightRefreshQueue:
+    """On-demand refreshes of one OAuth app's portfolios, run one at a time."""
+
+    def __init__(self) -> None:
+        """Start with nothing queued."""
+        # entry id -> its coordinator's refresh, in press order.
+        self._pending: dict[str, Callable[[], Coroutine[Any, Any, None]]] = {}
+        self._task: asyncio.Task[None] | None = None
+        self.requested: int = 0
+        self.coalesced: int = 0
+
+    @callback
+    def async_request(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        refresh: Callable[[], Coroutine[Any, Any, None]],
+    ) -> None:
+        """Queue a refresh of ``entry_id`` (once, however often it's asked)."""
+        self.requested += 1
+        if entry_id in self._pending:
+            self.coalesced += 1
+            return
+        self._pending[entry_id] = refresh
+        if self._task is None or self._task.done():
+            self._task = hass.async_create_background_task(
+                self._async_drain(), "sharesight_refresh_queue"
+            )
+
+    @callback
+    def async_discard(self, entry_id: str) -> None:
+        """Drop a queued refresh (the entry is unloading)."""
+        self._pending.pop(entry_id, None)
+
+    async def _async_drain(self) -> None:
+        await asyncio.sleep(MANUAL_REFRESH_COALESCE_WINDOW)
+        while self._pending:
+            entry_id = next(iter(self._pending))
+            refresh = self._pending.pop(entry_id)
+            try:
+                await refresh()
+            except Exception:  # noqa: BLE001 - one portfolio mustn't stall the rest
+                _LOGGER.exception("Queued Sharesight refresh failed")
+
+    def as_dict(self) -> dict[str, Any]:
+        """Counts and what is waiting, for diagnostics."""
+        return {
+            "requested": self.requested,
+            "coalesced": self.coalesced,
+            "pending": len(self._pending),
+        }
+
+
+DATA_REFRESH_QUEUES: HassKey[dict[str, SharesightRefreshQueue]] = HassKey(
+    f"{DOMAIN}_refresh_queues"
+)
+
+
+@callback
+def async_get_refresh_queue(hass: HomeAssistant, key: str) -> SharesightRefreshQueue:
+    """Return the process-wide refresh queue for the OAuth app ``key``.
+
+    ``key`` is the same ``request_budget_key`` the app's budget uses.
+    """
+    queues = hass.data.setdefault(DATA_REFRESH_QUEUES, {})
+    queue = queues.get(key)
+    if queue is None:
+        queue = queues[key] = SharesightRefreshQueue()
+    return queue
@@ -0,0 +1,197 @@
+"""Phase tracing of the coordinator's polls.
+
+The request metrics (metrics.py) say which endpoint was slow, but a poll also
+spends time outside the network: the token check, merging the responses, the
+de-duplication passes, the activity diff, the derived analytics and finally
+the listener fan-out that re-renders every entity.  Each poll is now cut into
+consecutive phases (``SharesightTracer.phase`` closes the running phase and
+opens the next, so the poll's code needs no extra nesting), and every request
+it makes is recorded as a span of its own.  The last ``TRACE_MAX_POLLS`` polls
+are kept in memory for diagnostics, with each poll's time split into waiting
+(the token and the awaits on requests) and working (everything else, which runs
+on the event loop), and can be exported in Chrome's trace-event format for
+``chrome://tracing`` or Perfetto.
+
+The running poll travels in a context variable, so the request tasks it
+spawns record into it and service calls made meanwhile don't.
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import TRACE_MAX_POLLS
+
+# Phases spent waiting on the network rather than running on the event loop.
+WAIT_PHASES = frozenset(
+    {"setup", "token", "await_required", "await_optional", "await_cash_transactions"}
+)
+
+
+@dataclass
+class _PollTrace:
+    started_at: str
+    started: float
+    # (name, start, end), monotonic seconds.
+    phases: list[tuple[str, float, float]] = field(default_factory=list)
+    # (endpoint, start, end, status or None), monotonic seconds.
+    requests: list[tuple[str, float, float, int | None]] = field(
+        default_factory=list
+    )
+    open_phase: tuple[str, float] | None = None
+    ended: float | None = None
+
+    @property
+    def duration(self) -> float:
+        return (self.ended or self.started) - self.started
+
+    def close_phase(self, now: float) -> None:
+        if self.open_phase is not None:
+            name, start = self.open_phase
+            self.phases.append((name, start, now))
+            self.open_phase = None
+
+
+_current_trace: ContextVar[_PollTrace | None] = ContextVar(
+    "sharesight_current_trace", default=None
+)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+class SharesightTracer:
+    """Phase traces of one config entry's most recent polls."""
+
+    def __init__(self) -> None:
+        """Start with no traces."""
+        self.polls: deque[_PollTrace] = deque(maxlen=TRACE_MAX_POLLS)
+        self._open: _PollTrace | None = None
+
+    def begin_poll(self) -> None:
+        """Start tracing a poll in the calling task (and the tasks it spawns).
+
+        A previous poll that never reached ``end_poll`` is filed as it stands.
+        """
+        self.end_poll()
+        trace = _PollTrace(
+            started_at=dt_util.utcnow().isoformat(), started=time.monotonic()
+        )
+        self._open = trace
+        _current_trace.set(trace)
+
+    def phase(self, name: str) -> None:
+        """End the running phase of the current poll and start ``name``."""
+        trace = _current_trace.get()
+        if trace is None or trace.ended is not None:
+            return
+        now = time.monotonic()
+        trace.close_phase(now)
+        trace.open_phase = (name, now)
+
+    def record_request(
+        self, endpoint: str, start: float, end: float, status: int | None
+    ) -> None:
+        """File one request of the current poll (status None: no answer)."""
+        trace = _current_trace.get()
+        if trace is not None and trace.ended is None:
+            trace.requests.append((endpoint, start, end, status))
+
+    def in_poll(self) -> bool:
+        """Whether the caller runs in the poll being traced."""
+        return self._open is not None and _current_trace.get() is self._open
+
+    def end_poll(self) -> None:
+        """File the poll being traced, if any."""
+        trace, self._open = self._open, None
+        if trace is None:
+            return
+        trace.ended = time.monotonic()
+        trace.close_phase(trace.ended)
+        self.polls.append(trace)
+        if _current_trace.get() is trace:
+            _current_trace.set(None)
+
+    def as_dict(self) -> list[dict[str, Any]]:
+        """Per poll: total, waiting and working time and each phase (ms)."""
+        summaries = []
+        for trace in self.polls:
+            waiting = working = 0.0
+            for name, start, end in trace.phases:
+                if name in WAIT_PHASES:
+                    waiting += end - start
+                else:
+                    working += end - start
+            summaries.append(
+                {
+                    "started_at": trace.started_at,
+                    "total_ms": _ms(trace.duration),
+                    "waiting_ms": _ms(waiting),
+                    "working_ms": _ms(working),
+                    "requests": len(trace.requests),
+                    "phases": [
+                        [name, _ms(start - trace.started), _ms(end - start)]
+                        for name, start, end in trace.phases
+                    ],
+                }
+            )
+        return summaries
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """The kept polls as Chrome trace events (``ph: "X"``, microseconds).
+
+        Phases run on thread 1; requests overlap, so each goes on the first
+        thread from 2 up that is free at its start.
+        """
+        events: list[dict[str, Any]] = []
+        if not self.polls:
+            return {"traceEvents": events, "displayTimeUnit": "ms"}
+        origin = self.polls[0].started
+
+        def _event(
+            name: str, cat: str, start: float, end: float, tid: int, **args: Any
+        ) -> None:
+            events.append(
+                {
+                    "name": name,
+                    "cat": cat,
+                    "ph": "X",
+                    "ts": round((start - origin) * 1e6),
+                    "dur": round((end - start) * 1e6),
+                    "pid": 1,
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+
+        for trace in self.polls:
+            _event(
+                "poll",
+                "poll",
+                trace.started,
+                trace.started + trace.duration,
+                1,
+                started_at=trace.started_at,
+            )
+            for name, start, end in trace.phases:
+                _event(name, "wait" if name in WAIT_PHASES else "work", start, end, 1)
+            # End time of the last request on each request thread.
+            lanes: list[float] = []
+            for endpoint, start, end, status in sorted(
+                trace.requests, key=lambda request: request[1]
+            ):
+                lane = next(
+                    (i for i, free in enumerate(lanes) if free <= start), len(lanes)
+                )
+                if lane == len(lanes):
+                    lanes.append(end)
+                else:
+                    lanes[lane] = end
+                _event(endpoint, "request", start, end, lane + 2, status=status)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
@@ -0,0 +1,198 @@
+"""HTTP transport for Sharesight API requests.
+
+``SharesightAPI.get_api_request`` handed back only the decoded body: the
+status, the payload size and the response headers — what Sharesight has left
+of the minute budget (``X-MinuteRate-Limit`` / ``X-MinuteRate-Remaining``) and
+the plan cap on holding reports (``X-HoldingLimit-*``) — were dropped, and the
+requests went out with no say in compression or connection reuse.
+
+Requests now go through ``SharesightTransport`` on a session of the
+integration's own: a keep-alive connection pool with a long DNS cache, gzip
+asked for, and bodies decoded with Home Assistant's orjson-backed
+``json_loads``.  Each call returns a ``SharesightResponse`` carrying the
+status, headers, body size and elapsed time next to the decoded data, which
+keeps the library's shape — the JSON body on success, a dict with ``error``
+otherwise — so everything downstream reads it as before.
+
+Each call is a single attempt.  Transient failures (429 and 5xx answers,
+connection errors) are retried by the coordinator, one budget slot and token
+per attempt, with ``retry_delay`` between them: retrying in here would send
+several requests on one token and hold a heavy slot through the backoff.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+import aiohttp
+from aiohttp import hdrs
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util.hass_dict import HassKey
+from homeassistant.util.json import json_loads
+from homeassistant.util.ssl import get_default_context
+
+from .const import (
+    DOMAIN,
+    TRANSPORT_DNS_CACHE_TTL,
+    TRANSPORT_KEEPALIVE_TIMEOUT,
+    TRANSPORT_MAX_RETRY_AFTER,
+    TRANSPORT_POOL_SIZE,
+    TRANSPORT_RETRY_BACKOFF,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_API_SESSION: HassKey[aiohttp.ClientSession] = HassKey(f"{DOMAIN}_api_session")
+
+# Answers worth another attempt: rate limited, or the server having a moment.
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503})
+
+
+@dataclass(slots=True)
+class SharesightResponse:
+    """One API answer: the decoded body plus what the library dropped."""
+
+    # The JSON body on success; a dict with "error" and "status_code" otherwise.
+    data: Any
+    status: int
+    headers: Mapping[str, str]
+    # Bytes of (decompressed) body.
+    size: int
+    # Seconds from sending the request to the body read.
+    elapsed: float
+
+
+def _decode(body: bytes, status: int) -> Any:
+    """The library's envelope: the JSON body, or an ``error`` dict."""
+    ok = 200 <= status < 300
+    if not body and ok:
+        return None
+    try:
+        data = json_loads(body)
+    except ValueError:
+        return {"error": body.decode(errors="replace"), "status_code": status}
+    if ok:
+        return data
+    if not isinstance(data, dict):
+        return {"error": data, "status_code": status}
+    # The status makes auth, lockout and rate-limit answers recognisable
+    # even when Sharesight's error body doesn't repeat it.
+    data.setdefault("status_code", status)
+    data.setdefault("error", data.get("message") or f"HTTP {status}")
+    return data
+
+
+def retry_delay(
+    status: int | None, headers: Mapping[str, str], attempt: int
+) -> float:
+    """Exponential backoff, or Retry-After (capped) on a 429 that sends one.
+
+    ``status`` None: the attempt got no answer (a connection error).
+    """
+    delay = TRANSPORT_RETRY_BACKOFF * 2**attempt
+    if status == 429:
+        try:
+            delay = float(headers[hdrs.RETRY_AFTER])
+        except (KeyError, TypeError, ValueError):
+            # Missing, or an HTTP-date rather than seconds.
+            pass
+    return min(delay, TRANSPORT_MAX_RETRY_AFTER)
+
+
+class SharesightTransport:
+    """GET requests against one Sharesight deployment's API."""
+
+    def __init__(self, session: aiohttp.ClientSession, api_url_base: str) -> None:
+        """``api_url_base`` is the deployment's ``…/api/`` root (API_URL_BASE)."""
+        self._session = session
+        self._api_url_base = api_url_base
+
+    async def async_get(
+        self, endpoint: list[Any], access_token: str
+    ) -> SharesightResponse:
+        """GET ``[version, path, params, …]`` with the given bearer token.
+
+        One attempt; connection errors are raised.
+        """
+        version, path, params = endpoint[0], endpoint[1], endpoint[2]
+        url = f"{self._api_url_base}{version}/{path}"
+        headers = {
+            hdrs.AUTHORIZATION: f"Bearer {access_token}",
+            hdrs.ACCEPT: "application/json",
+        }
+        started = time.monotonic()
+        async with self._session.get(url, params=params, headers=headers) as response:
+            body = await response.read()
+        return SharesightResponse(
+            data=_decode(body, response.status),
+            status=response.status,
+            headers=response.headers,
+            size=len(body),
+            elapsed=time.monotonic() - started,
+        )
+
+
+@callback
+def async_get_api_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the process-wide Sharesight session, creating it once.
+
+    Its own connector keeps connections to the API host alive between polls
+    and caches the host's address (TRANSPORT_DNS_CACHE_TTL) instead of
+    sharing Home Assistant's pool.  One session serves every entry, so reloads
+    don't leak sessions; it is closed when Home Assistant stops.
+    """
+    session = hass.data.get(DATA_API_SESSION)
+    if session is None:
+        connector = aiohttp.TCPConnector(
+            limit=TRANSPORT_POOL_SIZE,
+            ttl_dns_cache=TRANSPORT_DNS_CACHE_TTL,
+            keepalive_timeout=TRANSPORT_KEEPALIVE_TIMEOUT,
+            ssl=get_default_context(),
+        )
+        session = hass.data[DATA_API_SESSION] = aiohttp.ClientSession(
+            connector=connector,
+            headers={
+                hdrs.USER_AGENT: SERVER_SOFTWARE,
+                hdrs.ACCEPT_ENCODING: "gzip, deflate",
+            },
+        )
+
+        async def _async_close(_event: Event) -> None:
+            await session.close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close)
+    return session
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> int | None:
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def parse_minute_rate(headers: Mapping[str, str]) -> tuple[int, int] | None:
+    """``(limit, remaining)`` from the X-MinuteRate-* pair, when both are sent."""
+    limit = _int_header(headers, "x-minuterate-limit")
+    remaining = _int_header(headers, "x-minuterate-remaining")
+    if limit is None or remaining is None:
+        return None
+    return limit, remaining
+
+
+def parse_holding_limit(headers: Mapping[str, str]) -> dict[str, Any] | None:
+    """The X-HoldingLimit-* set, present only when a report was plan-capped."""
+    limit = _int_header(headers, "x-holdinglimit-limit")
+    if limit is None:
+        return None
+    return {
+        "limit": limit,
+        "total": _int_header(headers, "x-holdinglimit-total"),
+        "reason": headers.get("x-holdinglimit-reason"),
+    }